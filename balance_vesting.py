@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Отчет Wallet,Vesting Balance,Spendable Balance (замена gonka-balance-vesting.sh).
+
+Для каждого адреса баланс bank и остаток streamvesting запрашиваются
+параллельно через общий клиент; вместо паузы после каждого кошелька
+действует лимит запросов в секунду к ноде, который сам снижается при
+ответах 429/5xx и таймаутах и растет до --max-rate, пока нода отвечает
+нормально; такие ошибки повторяются. Суммы считаются в целых ngonka
+и выводятся как у bc со scale=4 (усечение до 4 знаков, ".5000", "0").
+Строки CSV выводятся в порядке входного файла по мере готовности.
+
+С --incremental значения сохраняются в снимок (snapshot_store.py), и
+следующий запуск запрашивает только кошельки с переводами после снимка
+и кошельки с ненулевым vesting; изменения печатаются в stderr.
+
+С --height H (или --height latest) все запросы читают состояние на одной
+высоте, ответы сохраняются в chain_cache, и повторный отчет на той же
+высоте не обращается к ноде.
+
+Использование: ./balance_vesting.py <wallets_file> [output_file.csv] [--rate 20] [--incremental]
+"""
+
+import argparse
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from chain_cache import ChainCache
+from gonka_client import GonkaClient, ChainQueryError, NGONKA_PER_GONKA, parse_height
+from snapshot_store import (SnapshotStore, SPENDABLE, VESTING, DEFAULT_MAX_AGE_HOURS, plan_refresh, save_refresh,
+                            diff_amounts, print_plan)
+
+NODE_URL = "http://net2.gonka.top:8000"
+ADDRESS_RE = re.compile(r"^gonka1[a-z0-9]{38,}$")
+
+BC_SCALE = 4
+ERROR = "ERROR"
+
+
+def format_bc(amount_ngonka, scale=BC_SCALE):
+    """
+    Сумма в GONKA так, как ее печатает bc: scale=4; amount / 1000000000
+
+    >>> format_bc(289148597685)
+    '289.1485'
+    >>> format_bc(500000000)
+    '.5000'
+    >>> format_bc(0)
+    '0'
+    >>> format_bc(99999)
+    '0'
+    """
+    units = amount_ngonka * 10 ** scale // NGONKA_PER_GONKA
+    if units == 0:
+        return "0"
+    whole, frac = divmod(units, 10 ** scale)
+    return f"{whole or ''}.{frac:0{scale}d}"
+
+
+def read_wallets(path):
+    """Адреса без пробелов; пустые строки и комментарии пропускаются"""
+    wallets = []
+    with open(path, "r") as f:
+        for line in f:
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            wallets.append("".join(line.split()))
+    return wallets
+
+
+def print_changes(previous, amounts, file=sys.stderr):
+    """Изменения vesting и spendable с прошлого запуска"""
+    for kind, title in ((VESTING, "Vesting"), (SPENDABLE, "Spendable")):
+        changes = diff_amounts(previous[kind], amounts[kind])
+        print(f"{title}: изменилось {len(changes)}", file=file)
+        for address, before, after in changes:
+            before_str = format_bc(before) if before is not None else "new"
+            print(f"  {address},{before_str},{format_bc(after)}", file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vesting и spendable балансы кошельков в CSV")
+    parser.add_argument("wallets_file", help="файл с адресами, по одному на строку")
+    parser.add_argument("output_file", nargs="?", help="CSV-файл (по умолчанию stdout)")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="параллельных запросов")
+    parser.add_argument("--rate", type=float, default=20, help="начальная частота запросов к ноде, в секунду")
+    parser.add_argument("--max-rate", type=float, default=200, help="верхний предел частоты запросов к ноде")
+    parser.add_argument("--incremental", action="store_true",
+                        help="запрашивать только кошельки с переводами с прошлого запуска (снимок в SQLite)")
+    parser.add_argument("--full", action="store_true", help="с --incremental: запросить все и обновить снимок")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE_HOURS, metavar="HOURS",
+                        help="с --incremental: перезапрашивать кошелек не реже, чем раз в HOURS часов")
+    parser.add_argument("--snapshot-path", help="файл снимков (по умолчанию $GONKA_CACHE_DIR или ~/.cache/gonka)")
+    parser.add_argument("--height", type=parse_height, metavar="H",
+                        help="все запросы на высоте H (номер блока или latest); ответы кешируются по высоте")
+    parser.add_argument("--no-cache", action="store_true", help="с --height: не использовать кеш на диске")
+    parser.add_argument("--cache-path", help="файл кеша (по умолчанию $GONKA_CACHE_DIR или ~/.cache/gonka)")
+    args = parser.parse_args()
+    if args.incremental and args.height is not None:
+        parser.error("--incremental несовместим с --height")
+
+    try:
+        wallets = read_wallets(args.wallets_file)
+    except FileNotFoundError:
+        print(f"Error: File '{args.wallets_file}' not found!")
+        return 1
+
+    if args.node:
+        client = GonkaClient(args.node, pool_size=args.workers, rate=args.rate, max_rate=args.max_rate)
+    else:
+        client = GonkaClient.from_config(NODE_URL, pool_size=args.workers, rate=args.rate, max_rate=args.max_rate)
+    cache = None
+    if args.height is not None:
+        if not args.no_cache:
+            cache = ChainCache(args.cache_path)
+        try:
+            height = client.pin_height(args.height, cache)
+        except ChainQueryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Height: {height}", file=sys.stderr)
+
+    def query(method, address):
+        try:
+            return method(address)
+        except ChainQueryError as e:
+            print(f"{address}: {e}", file=sys.stderr)
+            return None
+
+    out = open(args.output_file, "w") if args.output_file else sys.stdout
+    try:
+        print("Wallet,Vesting Balance,Spendable Balance", file=out, flush=True)
+
+        valid = []
+        for address in wallets:
+            if ADDRESS_RE.match(address):
+                valid.append(address)
+            else:
+                print(f"{address},{ERROR},{ERROR}", file=sys.stderr)
+
+        store = plan = None
+        to_query = valid
+        if args.incremental:
+            store = SnapshotStore(args.snapshot_path)
+            try:
+                plan = plan_refresh(store, client, valid, (VESTING, SPENDABLE), args.max_age, args.full,
+                                    args.workers)
+            except ChainQueryError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+            print_plan(plan, len(valid))
+            # Суммы читаются на высоте снимка: переводы после нее найдет следующий запуск
+            client.pin_height(plan.height)
+            to_query = set(plan.query)
+
+        amounts = {VESTING: {}, SPENDABLE: {}}
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            # Оба запроса адреса уходят сразу, вывод - в порядке файла
+            pending = [
+                (address,
+                 executor.submit(query, client.get_total_vesting, address) if address in to_query else None,
+                 executor.submit(query, client.get_balance, address) if address in to_query else None)
+                for address in valid
+            ]
+            for number, (address, vesting, spendable) in enumerate(pending, 1):
+                if vesting is None:
+                    vesting_amount = plan.previous[VESTING][address].amount
+                    spendable_amount = plan.previous[SPENDABLE][address].amount
+                else:
+                    vesting_amount, spendable_amount = vesting.result(), spendable.result()
+                amounts[VESTING][address] = vesting_amount
+                amounts[SPENDABLE][address] = spendable_amount
+                vesting_str = format_bc(vesting_amount) if vesting_amount is not None else ERROR
+                spendable_str = format_bc(spendable_amount) if spendable_amount is not None else ERROR
+                print(f"{address},{vesting_str},{spendable_str}", file=out, flush=True)
+                if args.output_file:
+                    print(f"Processing: {number}/{len(valid)} - {address}", end="\r", file=sys.stderr)
+    finally:
+        if args.output_file:
+            out.close()
+        if cache is not None:
+            cache.close()
+
+    if store is not None:
+        for kind in (VESTING, SPENDABLE):
+            fetched = {a: amounts[kind][a] for a in plan.query if amounts[kind].get(a) is not None}
+            save_refresh(store, plan, kind, fetched, valid)
+        store.close()
+        if args.output_file:
+            print("", file=sys.stderr)
+        print_changes(plan.previous, amounts)
+
+    if args.output_file:
+        print(f"\nDone! Results saved to: {args.output_file}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
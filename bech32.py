@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Кодирование и декодирование адресов bech32 (BIP-173).
+
+Нужно для перевода адресов между префиксами одной цепочки, например
+gonkavaloper1... <-> gonka1..., без обращения к ноде.
+"""
+
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+GENERATOR = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+
+
+class Bech32Error(ValueError):
+    """Неверная строка bech32"""
+
+
+def _polymod(values):
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            if (top >> i) & 1:
+                chk ^= GENERATOR[i]
+    return chk
+
+
+def _hrp_expand(hrp):
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def _convert_bits(data, from_bits, to_bits, pad):
+    acc = 0
+    bits = 0
+    result = []
+    maxv = (1 << to_bits) - 1
+    for value in data:
+        if value < 0 or value >> from_bits:
+            raise Bech32Error("значение вне диапазона")
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            result.append((acc >> bits) & maxv)
+    if pad:
+        if bits:
+            result.append((acc << (to_bits - bits)) & maxv)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & maxv):
+        raise Bech32Error("неверное дополнение")
+    return result
+
+
+def decode(address):
+    """
+    Разбор адреса bech32
+
+    Returns:
+        (hrp, bytes) - префикс и данные адреса
+    """
+    if address.lower() != address and address.upper() != address:
+        raise Bech32Error("смешанный регистр")
+    address = address.lower()
+    pos = address.rfind("1")
+    if pos < 1 or pos + 7 > len(address):
+        raise Bech32Error("нет разделителя или слишком короткие данные")
+    hrp = address[:pos]
+    try:
+        data = [CHARSET.index(c) for c in address[pos + 1:]]
+    except ValueError:
+        raise Bech32Error("недопустимый символ") from None
+    if _polymod(_hrp_expand(hrp) + data) != 1:
+        raise Bech32Error("неверная контрольная сумма")
+    return hrp, bytes(_convert_bits(data[:-6], 5, 8, False))
+
+
+def encode(hrp, data):
+    """Адрес bech32 из префикса и байтов"""
+    values = _convert_bits(data, 8, 5, True)
+    polymod = _polymod(_hrp_expand(hrp) + values + [0] * 6) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + "1" + "".join(CHARSET[v] for v in values + checksum)
+
+
+def convert_prefix(address, hrp):
+    """Тот же адрес с другим префиксом (gonkavaloper1... -> gonka1...)"""
+    _, data = decode(address)
+    return encode(hrp, data)
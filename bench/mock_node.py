@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Локальная имитация ноды Gonka для тестов и бенчмарков.
+
+Отдает те эндпоинты, которыми пользуются скрипты репозитория:
+
+    /chain-api  bank balances, collateral, streamvesting, staking
+                (validators, delegators), auth accounts, gov votes,
+                tx по хешу, поиск tx и отправка tx (POST)
+    /chain-rpc  status, block, block_results, blockchain, tx, tx_search
+                (с событиями transfer, как у CometBFT 0.38)
+    /v1/epochs/{id|current}/participants
+    /admin/v1/setup/report
+
+Данные детерминированы: балансы, залог и т.п. выводятся из хеша адреса,
+блоки появляются раз в --block-time секунд. Транзакции, отправленные
+через POST /chain-api/cosmos/tx/v1beta1/txs (signer.py) или через
+POST /mock/broadcast (bench/inferenced), включаются в следующий блок.
+Подпись транзакций из POST /chain-api/cosmos/tx/v1beta1/txs проверяется
+(SIGN_MODE_DIRECT, CHAIN_ID), неверная отвечает code 4 unauthorized.
+Неизвестный хеш транзакции отвечает синтетическим переводом
+synthetic_transfer(хеш) - так проверку можно гонять без отправки.
+
+Задержка и ошибки: --latency, --jitter, --tail-rate/--tail-latency
+(редкие медленные ответы), --error-rate (ответ 503), --mempool-size
+(сколько транзакций помещается в блок, сверх - code 20, ErrMempoolIsFull).
+
+Использование: bench/mock_node.py --port 18600 [--latency 5 --error-rate 0.01]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bech32 import encode as bech32_encode  # noqa: E402
+
+DENOM = "ngonka"
+CHAIN_ID = "gonka-mainnet"
+EPOCH_BLOCKS = 100
+GENESIS = datetime(2025, 1, 1, tzinfo=timezone.utc)
+MSG_SEND_TYPE = "/cosmos.bank.v1beta1.MsgSend"
+MSG_VOTE_TYPE = "/cosmos.gov.v1.MsgVote"
+
+
+def seed(value):
+    """Детерминированное число из строки"""
+    return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+
+def make_address(value, prefix="gonka"):
+    """Адрес, однозначно выведенный из строки"""
+    return bech32_encode(prefix, hashlib.sha256(value.encode()).digest()[:20])
+
+
+def synthetic_transfer(txhash):
+    """Получатель и сумма (ngonka) синтетической транзакции с этим хешем"""
+    txhash = txhash.upper()
+    return make_address(txhash), 1_000_000_000 + seed(txhash) % 10 ** 12
+
+
+def block_time_str(height, block_time):
+    dt = GENESIS + timedelta(seconds=height * block_time)
+    return f"{dt:%Y-%m-%dT%H:%M:%S}.{dt.microsecond * 1000 + height % 1000:09d}Z"
+
+
+class ChainState:
+    """Высота, транзакции и sequence аккаунтов"""
+
+    def __init__(self, block_time=1.0, current_epoch=20000, participants=50, validators=100, mempool_size=0):
+        self.block_time = block_time
+        self.mempool_size = mempool_size
+        self.current_epoch = current_epoch
+        self.start_height = current_epoch * EPOCH_BLOCKS + EPOCH_BLOCKS // 2
+        self.started = time.monotonic()
+        self.participants = [make_address(f"participant-{i}") for i in range(participants)]
+        self.validators = [make_address(f"validator-{i}", "gonkavaloper") for i in range(validators)]
+        self.txs = {}
+        self.blocks = {}
+        self.sequences = {}
+        self.deltas = {}  # адрес -> изменение баланса отправленными транзакциями
+        self.lock = threading.Lock()
+
+    def height(self):
+        return self.start_height + int((time.monotonic() - self.started) / self.block_time)
+
+    def balance(self, address, height=None):
+        """Баланс после последнего блока или на высоте height (заголовок x-cosmos-block-height)"""
+        with self.lock:
+            if height is None:
+                return seed(address) % 10 ** 12 + self.deltas.get(address, 0)
+            delta = 0
+            for tx in self.txs.values():
+                if tx["height"] > height:
+                    continue
+                for to, amount in tx["transfers"]:
+                    delta += (amount if to == address else 0) - (amount if tx["sender"] == address else 0)
+            return seed(address) % 10 ** 12 + delta
+
+    def account(self, address):
+        with self.lock:
+            return seed(address) % 100000, self.sequences.get(address, 0)
+
+    def add_tx(self, sender, transfers, sequence=None, raw=None):
+        """
+        Прием транзакции в mempool; включается в следующий блок
+
+        Returns:
+            (txhash, code, raw_log); при переполненном mempool code 20 (sdk
+            ErrMempoolIsFull) с пустым raw_log, как его отдают некоторые ноды,
+            чтобы клиент распознавал ошибку по коду, а не по тексту
+        """
+        raw = raw or json.dumps([sender, transfers, sequence, time.time()]).encode()
+        txhash = hashlib.sha256(raw).hexdigest().upper()
+        with self.lock:
+            expected = self.sequences.get(sender, 0)
+            if sequence is not None and sequence != expected:
+                log = f"account sequence mismatch, expected {expected}, got {sequence}: incorrect account sequence"
+                return txhash, 32, log
+            height = self.height() + 1
+            if self.mempool_size and len(self.blocks.get(height, [])) >= self.mempool_size:
+                return txhash, 20, ""
+            self.sequences[sender] = expected + 1
+            for to, amount in transfers:
+                self.deltas[sender] = self.deltas.get(sender, 0) - amount
+                self.deltas[to] = self.deltas.get(to, 0) + amount
+            self.txs[txhash] = {"height": height, "sender": sender, "transfers": transfers,
+                                "raw": base64.b64encode(raw).decode()}
+            self.blocks.setdefault(height, []).append(txhash)
+        return txhash, 0, ""
+
+    def get_tx(self, txhash):
+        """Сохраненная или синтетическая транзакция"""
+        txhash = txhash.upper()
+        with self.lock:
+            tx = self.txs.get(txhash)
+        if tx is not None:
+            return txhash, tx
+        address, amount = synthetic_transfer(txhash)
+        return txhash, {"height": self.start_height - 1 - seed(txhash) % 1000, "sender": make_address("synthetic"),
+                        "transfers": [(address, amount)], "raw": None}
+
+
+def tx_field(tx, field):
+    """Значения события field (как в индексе CometBFT) у сохраненной транзакции"""
+    if field == "tx.height":
+        return [tx["height"]]
+    if field in ("message.sender", "transfer.sender"):
+        return [tx["sender"]] if tx["transfers"] or field == "message.sender" else []
+    if field == "transfer.recipient":
+        return [to for to, _ in tx["transfers"]]
+    return []
+
+
+def match_value(actual, op, value):
+    if op == "EXISTS":
+        return True
+    if op == "=":
+        return str(actual) == value
+    actual, value = int(actual), int(value)
+    return {">": actual > value, ">=": actual >= value, "<": actual < value, "<=": actual <= value}[op]
+
+
+def tx_events(tx):
+    """События tx_result: message и transfer на каждый перевод (формат CometBFT 0.38)"""
+    events = [{"type": "message", "attributes": [{"key": "sender", "value": tx["sender"], "index": True}]}]
+    for to, amount in tx["transfers"]:
+        events.append({"type": "transfer", "attributes": [
+            {"key": "recipient", "value": to, "index": True},
+            {"key": "sender", "value": tx["sender"], "index": True},
+            {"key": "amount", "value": f"{amount}{DENOM}", "index": True},
+        ]})
+    return events
+
+
+def tx_json(txhash, tx):
+    messages = [
+        {"@type": MSG_SEND_TYPE, "from_address": tx["sender"], "to_address": to,
+         "amount": [{"denom": DENOM, "amount": str(amount)}]}
+        for to, amount in tx["transfers"]
+    ]
+    return {"body": {"messages": messages}}, {
+        "txhash": txhash, "height": str(tx["height"]), "code": 0, "raw_log": "",
+    }
+
+
+def decode_tx_raw(raw):
+    """Отправитель (или голосующий), переводы, sequence и признак unordered из TxRaw (signer.py)"""
+    from signer import parse_proto
+
+    tx = parse_proto(raw)
+    body = parse_proto(tx[1][0])
+    auth_info = parse_proto(tx[2][0])
+    signer_info = parse_proto(auth_info[1][0])
+    sequence = signer_info.get(3, [0])[0]
+    sender = None
+    transfers = []
+    for any_bytes in body.get(1, []):
+        msg_any = parse_proto(any_bytes)
+        msg = parse_proto(msg_any[2][0])
+        if msg_any[1][0].decode() == MSG_VOTE_TYPE:
+            sender = sender or msg[2][0].decode()
+            continue
+        if msg_any[1][0].decode() != MSG_SEND_TYPE:
+            sender = sender or ""
+            continue
+        sender = msg[1][0].decode()
+        for coin_bytes in msg.get(3, []):
+            coin = parse_proto(coin_bytes)
+            transfers.append((msg[2][0].decode(), int(coin[2][0])))
+    return sender or "", transfers, sequence, bool(body.get(4))
+
+
+def verify_tx_raw(raw, sender, account_number):
+    """
+    Проверка подписи TxRaw, как в ante handler ноды
+
+    Публичный ключ берется из AuthInfo и должен давать адрес отправителя,
+    подпись проверяется по SignDoc с CHAIN_ID и account_number.
+
+    Returns:
+        текст ошибки для raw_log или None, если подпись верна
+    """
+    from signer import build_sign_doc, parse_proto, pubkey_address, verify_signature
+
+    tx = parse_proto(raw)
+    body_bytes, auth_info_bytes = tx[1][0], tx[2][0]
+    signatures = tx.get(3, [])
+    signer_info = parse_proto(parse_proto(auth_info_bytes)[1][0])
+    pubkey_any = parse_proto(signer_info[1][0]) if 1 in signer_info else {}
+    if not pubkey_any or not signatures:
+        return "no signatures supplied: unauthorized"
+    pubkey = parse_proto(pubkey_any[2][0])[1][0]
+    if pubkey_address(pubkey) != sender:
+        return f"pubkey does not match signer address {sender}: invalid pubkey"
+    sign_doc = build_sign_doc(body_bytes, auth_info_bytes, CHAIN_ID, account_number)
+    if not verify_signature(pubkey, sign_doc, signatures[0]):
+        return (f"signature verification failed; please verify account number ({account_number}) "
+                f"and chain-id ({CHAIN_ID}): unauthorized")
+    return None
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело пишутся отдельно; без этого keep-alive ждет delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+    state = None
+    options = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- Ответы ---
+
+    def _send_json(self, body, status=200):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self, message="not found"):
+        self._send_json({"code": 5, "message": message, "details": []}, 404)
+
+    def _inject(self):
+        """Задержка и ошибки; True если уже ответили ошибкой"""
+        opts = self.options
+        delay = opts.latency + random.uniform(0, opts.jitter)
+        if opts.tail_rate and random.random() < opts.tail_rate:
+            delay += opts.tail_latency
+        if delay > 0:
+            time.sleep(delay)
+        if opts.error_rate and random.random() < opts.error_rate:
+            self._send_json({"error": "injected"}, 503)
+            return True
+        return False
+
+    # --- Маршруты ---
+
+    def do_GET(self):
+        if self._inject():
+            return
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path
+        if path.startswith("/chain-api/"):
+            self._rest(path[len("/chain-api"):], query)
+        elif path.startswith("/chain-rpc/"):
+            self._rpc(path[len("/chain-rpc/"):], query)
+        elif path.startswith("/v1/epochs/"):
+            self._epoch(path)
+        elif path == "/admin/v1/setup/report":
+            self._send_json({"checks": [
+                {"id": "active_in_epoch", "status": "PASS", "details": {"weight": seed(self.headers.get("Host", "")) % 5000}},
+            ]})
+        else:
+            self._not_found()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self._inject():
+            return
+        state = self.state
+        if self.path == "/chain-api/cosmos/tx/v1beta1/txs":
+            raw = base64.b64decode(payload["tx_bytes"])
+            sender, transfers, sequence, unordered = decode_tx_raw(raw)
+            error = verify_tx_raw(raw, sender, state.account(sender)[0])
+            if error:
+                txhash, code, log = hashlib.sha256(raw).hexdigest().upper(), 4, error
+            else:
+                txhash, code, log = state.add_tx(sender, transfers, None if unordered else sequence, raw)
+            self._send_json({"tx_response": {"txhash": txhash, "code": code, "codespace": "sdk" if code else "",
+                                             "raw_log": log, "height": "0"}})
+        elif self.path == "/mock/broadcast":
+            transfers = [(t["to"], int(t["amount"])) for t in payload.get("transfers", [])]
+            txhash, code, log = state.add_tx(payload["from"], transfers, payload.get("sequence"))
+            self._send_json({"txhash": txhash, "code": code, "codespace": "sdk" if code else "", "raw_log": log})
+        else:
+            self._not_found()
+
+    def _rest(self, path, query):
+        state = self.state
+        height = self.headers.get("x-cosmos-block-height")
+        if height and int(height) > state.height():
+            # Как baseapp: состояние на высоте, до которой нода еще не дошла, недоступно
+            return self._send_json({"code": 2, "message": "cannot query with height in the future; "
+                                    "please provide a valid height: invalid height", "details": []}, 500)
+        parts = path.strip("/").split("/")
+        address = parts[-1]
+        if path.startswith("/cosmos/bank/v1beta1/balances/"):
+            amount = state.balance(address, int(height) if height else None)
+            self._send_json({"balances": [{"denom": DENOM, "amount": str(amount)}]})
+        elif path.startswith("/productscience/inference/collateral/collateral/"):
+            if seed(address) % 20 == 0:
+                return self._not_found("collateral not found")
+            self._send_json({"amount": {"denom": DENOM, "amount": str(seed(address) % 2_000_000)}})
+        elif path.startswith("/productscience/inference/streamvesting/total_vesting/"):
+            self._send_json({"total_amount": [{"denom": DENOM, "amount": str(seed(address + "v") % 10 ** 11)}]})
+        elif path.startswith("/cosmos/auth/v1beta1/accounts/"):
+            number, sequence = state.account(address)
+            self._send_json({"account": {"@type": "/cosmos.auth.v1beta1.BaseAccount", "address": address,
+                                         "account_number": str(number), "sequence": str(sequence)}})
+        elif path.startswith("/cosmos/staking/v1beta1/delegators/"):
+            operator = make_address(parts[-2], "gonkavaloper")
+            self._send_json({"validators": [self._validator(operator)]})
+        elif path == "/cosmos/staking/v1beta1/validators":
+            self._paginated("validators", [self._validator(v) for v in state.validators], query)
+        elif path.startswith("/cosmos/gov/v1/proposals/") and path.endswith("/votes"):
+            votes = [{"voter": p, "options": [{"option": "VOTE_OPTION_YES", "weight": "1"}]}
+                     for p in state.participants[::3]]
+            self._paginated("votes", votes, query)
+        elif path.startswith("/cosmos/tx/v1beta1/txs/"):
+            tx, tx_response = tx_json(*state.get_tx(address))
+            self._send_json({"tx": tx, "tx_response": tx_response})
+        elif path == "/cosmos/tx/v1beta1/txs":
+            txs = self._search(query.get("query", ""))
+            page, limit = int(query.get("page", 1)), int(query.get("limit", 100))
+            chunk = txs[(page - 1) * limit:page * limit]
+            pairs = [tx_json(h, tx) for h, tx in chunk]
+            self._send_json({"txs": [p[0] for p in pairs], "tx_responses": [p[1] for p in pairs],
+                             "total": str(len(txs))})
+        else:
+            self._not_found()
+
+    def _validator(self, operator):
+        s = seed(operator)
+        return {"operator_address": operator, "jailed": s % 10 == 0,
+                "status": "BOND_STATUS_UNBONDING" if s % 10 == 0 else "BOND_STATUS_BONDED",
+                "description": {"moniker": f"mock-{s % 1000}"}}
+
+    def _paginated(self, field, items, query):
+        limit = int(query.get("pagination.limit", 100))
+        start = int(base64.b64decode(query["pagination.key"])) if query.get("pagination.key") else 0
+        end = start + limit
+        next_key = base64.b64encode(str(end).encode()).decode() if end < len(items) else None
+        self._send_json({field: items[start:end], "pagination": {"next_key": next_key, "total": str(len(items))}})
+
+    def _search(self, query):
+        """Отправленные транзакции по условиям tx_search (AND, =, >, >=, <, <=, EXISTS)"""
+        with self.state.lock:
+            txs = sorted(self.state.txs.items(), key=lambda item: item[1]["height"])
+        for condition in (c.strip() for c in query.split(" AND ")):
+            match = re.match(r"^([\w.]+)\s*(EXISTS|>=|<=|=|>|<)\s*'?([^']*)'?$", condition)
+            if not match:
+                continue
+            field, op, value = match.groups()
+            txs = [(h, tx) for h, tx in txs if any(match_value(v, op, value) for v in tx_field(tx, field))]
+        return txs
+
+    def _rpc(self, method, query):
+        state = self.state
+        latest = state.height()
+        if method == "status":
+            return self._send_json({"result": {"sync_info": {"latest_block_height": str(latest),
+                                                             "catching_up": False}}})
+        if method in ("block", "block_results"):
+            height = int(query.get("height", latest))
+            if height > latest:
+                return self._send_json({"error": {"data": f"height {height} must be less than or equal "
+                                                          f"to the current blockchain height {latest}"}}, 500)
+            with state.lock:
+                hashes = list(state.blocks.get(height, []))
+                raws = [state.txs[h]["raw"] for h in hashes]
+                events = [tx_events(state.txs[h]) for h in hashes]
+            if method == "block":
+                return self._send_json({"result": {"block": {
+                    "header": {"height": str(height), "time": block_time_str(height, state.block_time)},
+                    "data": {"txs": raws}}}})
+            return self._send_json({"result": {"height": str(height),
+                                               "txs_results": [{"code": 0, "log": "", "events": e} for e in events]}})
+        if method == "blockchain":
+            low, high = int(query["minHeight"]), min(int(query["maxHeight"]), latest)
+            metas = [{"header": {"height": str(h), "time": block_time_str(h, state.block_time)}}
+                     for h in range(high, max(low, high - 19) - 1, -1)]
+            return self._send_json({"result": {"last_height": str(latest), "block_metas": metas}})
+        if method == "tx":
+            txhash = query.get("hash", "").strip('"')
+            txhash = txhash[2:] if txhash.lower().startswith("0x") else txhash
+            with state.lock:
+                tx = state.txs.get(txhash.upper())
+            if tx is None:
+                return self._send_json({"error": {"code": -32603, "data": f"tx ({txhash}) not found"}}, 500)
+            return self._send_json({"result": {"hash": txhash.upper(), "height": str(tx["height"]),
+                                               "tx_result": {"code": 0, "log": ""}}})
+        if method == "tx_search":
+            txs = self._search(query.get("query", "").strip('"'))
+            page, per_page = int(query.get("page", 1)), min(100, int(query.get("per_page", 30)))
+            return self._send_json({"result": {"txs": [
+                {"hash": h, "height": str(tx["height"]), "tx_result": {"code": 0, "events": tx_events(tx)}}
+                for h, tx in txs[(page - 1) * per_page:page * per_page]
+            ], "total_count": str(len(txs))}})
+        self._not_found()
+
+    def _epoch(self, path):
+        state = self.state
+        parts = path.strip("/").split("/")
+        if len(parts) != 4 or parts[3] != "participants":
+            return self._not_found()
+        epoch = state.current_epoch if parts[2] == "current" else int(parts[2])
+        if epoch > state.current_epoch or epoch < 1:
+            return self._not_found("epoch not found")
+        participants = [{"index": p, "weight": seed(f"{p}-{epoch}") % 5000, "models": []}
+                        for p in state.participants if seed(f"{p}-{epoch}") % 10]
+        self._send_json({"active_participants": {"epoch_id": epoch, "poc_start_block_height": epoch * EPOCH_BLOCKS,
+                                                 "participants": participants}})
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, tail_rate=0.0, tail_latency=0.0,
+                error_rate=0.0, block_time=1.0, current_epoch=20000, participants=50, validators=100,
+                mempool_size=0):
+    """HTTP-сервер имитации (для запуска в своем процессе или потоке)"""
+    options = argparse.Namespace(latency=latency, jitter=jitter, tail_rate=tail_rate,
+                                 tail_latency=tail_latency, error_rate=error_rate)
+    state = ChainState(block_time, current_epoch, participants, validators, mempool_size)
+    handler = type("Handler", (MockHandler,), {"state": state, "options": options})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Имитация ноды Gonka для тестов и бенчмарков")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18600)
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа, мс")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, мс")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="доля медленных ответов")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="добавка для медленных ответов, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--block-time", type=float, default=1.0, help="секунд на блок")
+    parser.add_argument("--current-epoch", type=int, default=20000)
+    parser.add_argument("--participants", type=int, default=50)
+    parser.add_argument("--validators", type=int, default=100)
+    parser.add_argument("--mempool-size", type=int, default=0, help="транзакций на блок (0 - без предела)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.latency / 1000, args.jitter / 1000, args.tail_rate,
+                         args.tail_latency / 1000, args.error_rate, args.block_time, args.current_epoch,
+                         args.participants, args.validators, args.mempool_size)
+    print(f"mock node: http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
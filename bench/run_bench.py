@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк скриптов репозитория на локальной имитации ноды (bench/mock_node.py).
+
+Сценарии вызывают те же функции, что и main() скриптов, с теми же
+настройками параллельности:
+
+    balances        get_balances.fetch_balances
+    collateral      check_collateral.get_collateral по строкам файла (как main)
+    epochs          get_epochs.process_epochs на N эпох
+    send            mass_send_gonka.process_file --pipeline через bench/inferenced
+    send-inprocess  mass_send_gonka.process_file с подписью в памяти (signer.py)
+    verify          verify_transactions.fetch_txs + check_payout
+
+Для каждого размера (число кошельков, эпох, выплат) печатается общее
+время, пропускная способность (элементов/с), p50/p99 задержки одного
+элемента и число ошибок. --json сохраняет результаты, --compare сверяет
+с сохраненными и завершается с кодом 1, если что-то стало хуже порога.
+
+Использование:
+    bench/run_bench.py [--sizes 10,100,1000,10000] [--scenarios balances,verify]
+                       [--latency 20 --error-rate 0.01] [--json out.json] [--compare base.json]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from mock_node import make_address, synthetic_transfer  # noqa: E402
+
+SIZES = [10, 100, 1000, 10000]
+SCENARIOS = ["balances", "collateral", "epochs", "send", "send-inprocess", "verify"]
+SUBPROCESS_SCENARIOS = ("send",)
+REGRESSION_THRESHOLD = 0.2  # доля ухудшения, после которой --compare сообщает о регрессии
+# Одноразовый ключ file-keyring для send-inprocess (только для имитации ноды)
+KEYRING_DIR = os.path.join(BENCH_DIR, "keyring")
+KEYRING_KEY = "bench-sender"
+KEYRING_PASSWORD = "bench-password"
+
+
+def percentile(values, fraction):
+    """Значение по рангу (nearest-rank), 0 для пустого списка"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class Timings:
+    """Задержки отдельных элементов сценария, собираемые из разных потоков"""
+
+    def __init__(self):
+        self.samples = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def wrap(self, func, failed=lambda result: False):
+        """func, который замеряет каждый вызов; failed(результат) считает ошибки"""
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.samples.append(time.perf_counter() - started)
+                    self.errors += 1
+                raise
+            with self._lock:
+                self.samples.append(time.perf_counter() - started)
+                if failed(result):
+                    self.errors += 1
+            return result
+        return timed
+
+
+@contextlib.contextmanager
+def patched(module, name, value):
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Вывод скриптов не мешает таблице результатов"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        yield
+
+
+# --- Имитация ноды ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_mock(args):
+    """Запуск bench/mock_node.py в отдельном процессе, возвращает (процесс, адрес)"""
+    port = free_port()
+    cmd = [sys.executable, os.path.join(BENCH_DIR, "mock_node.py"), "--port", str(port),
+           "--latency", str(args.latency), "--jitter", str(args.jitter),
+           "--tail-rate", str(args.tail_rate), "--tail-latency", str(args.tail_latency),
+           "--error-rate", str(args.error_rate), "--block-time", str(args.block_time),
+           "--mempool-size", str(args.mempool_size)]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/chain-rpc/status", timeout=1).read()
+            return process, url
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("имитация ноды не запустилась")
+
+
+# --- Сценарии: (size, context) -> Timings ---
+
+def wallets(size):
+    return [make_address(f"bench-wallet-{i}") for i in range(size)]
+
+
+def payouts(size):
+    return [(make_address(f"bench-payee-{i}"), f"{1 + i % 7}.{i % 1000:03d}") for i in range(size)]
+
+
+def bench_balances(size, ctx):
+    import get_balances
+    from gonka_client import GonkaClient
+
+    timings = Timings()
+    client = GonkaClient(ctx.url, pool_size=ctx.workers)
+    try:
+        with patched(get_balances, "get_balance", timings.wrap(get_balances.get_balance, lambda r: r is None)):
+            get_balances.fetch_balances(wallets(size), client, workers=ctx.workers)
+    finally:
+        client.close()
+    return timings
+
+
+def bench_collateral(size, ctx):
+    import check_collateral
+    from gonka_client import GonkaClient
+
+    timings = Timings()
+    get_collateral = timings.wrap(check_collateral.get_collateral,
+                                  lambda r: r.startswith("ERROR") or r == "TIMEOUT")
+    client = GonkaClient(ctx.url, timeout=30)
+    try:
+        for address in wallets(size):
+            get_collateral(address, client)
+    finally:
+        client.close()
+    return timings
+
+
+def bench_epochs(size, ctx):
+    import get_epochs
+
+    timings = Timings()
+    fetch = timings.wrap(get_epochs.fetch_epoch_start, lambda r: r is None)
+    with patched(get_epochs, "fetch_epoch_start", fetch):
+        get_epochs.process_epochs(size, ctx.workers, cache=None)
+    return timings
+
+
+def write_payouts(size, directory):
+    path = os.path.join(directory, f"payouts_{size}.txt")
+    with open(path, "w") as f:
+        for address, amount in payouts(size):
+            f.write(f"{address} {amount}\n")
+    return path
+
+
+def bench_send(size, ctx, inprocess=False):
+    import mass_send_gonka
+    from gonka_client import GonkaClient
+
+    timings = Timings()
+    sender = f"bench-sender-{size}-{time.monotonic_ns()}"
+    client = GonkaClient(ctx.url)
+    signer = None
+    if inprocess:
+        sender = KEYRING_KEY
+        signer = mass_send_gonka.make_signer(sender, KEYRING_PASSWORD, KEYRING_DIR)
+        address = signer.address
+    else:
+        address = make_address(sender)
+    tracker = mass_send_gonka.SequenceTracker(client, address)
+    path = write_payouts(size, ctx.tmpdir)
+    try:
+        with patched(mass_send_gonka, "NODE", ctx.url + "/chain-rpc/"), \
+                patched(mass_send_gonka, "INFERENCED", os.path.join(BENCH_DIR, "inferenced")), \
+                patched(mass_send_gonka, "send_gonka",
+                        timings.wrap(mass_send_gonka.send_gonka, lambda r: not r[0])), \
+                patched(mass_send_gonka, "send_gonka_signed",
+                        timings.wrap(mass_send_gonka.send_gonka_signed, lambda r: not r[0])):
+            mass_send_gonka.process_file(path, sender, "", 0, tracker, signer, pipeline=True)
+    finally:
+        client.close()
+    return timings
+
+
+def bench_verify(size, ctx):
+    import verify_transactions
+    from gonka_client import GonkaClient
+
+    hashes = [hashlib.sha256(f"bench-tx-{i}".encode()).hexdigest().upper() for i in range(size)]
+    timings = Timings()
+    client = GonkaClient(ctx.url, pool_size=ctx.workers)
+    client.get_tx = timings.wrap(client.get_tx)
+    try:
+        txs = verify_transactions.fetch_txs(client, hashes, ctx.workers)
+    finally:
+        client.close()
+    for txhash in hashes:
+        address, amount = synthetic_transfer(txhash)
+        result, _, _ = verify_transactions.check_payout(
+            address, verify_transactions.format_gonka(amount), txs.get(txhash)
+        )
+        if result != verify_transactions.OK:
+            timings.errors += 1
+    return timings
+
+
+BENCHMARKS = {
+    "balances": bench_balances,
+    "collateral": bench_collateral,
+    "epochs": bench_epochs,
+    "send": bench_send,
+    "send-inprocess": lambda size, ctx: bench_send(size, ctx, inprocess=True),
+    "verify": bench_verify,
+}
+
+
+def run_one(name, size, ctx):
+    started = time.perf_counter()
+    with quiet():
+        timings = BENCHMARKS[name](size, ctx)
+    total = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "size": size,
+        "total_s": round(total, 4),
+        "items_per_s": round(size / total, 2) if total > 0 else 0.0,
+        "p50_ms": round(percentile(timings.samples, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(timings.samples, 0.99) * 1000, 3),
+        "errors": timings.errors,
+    }
+
+
+def print_header():
+    print(f"{'Сценарий':<16} {'Размер':>7} {'Всего, с':>10} {'эл/с':>10} {'p50, мс':>9} {'p99, мс':>9} {'Ошибок':>7}")
+    print("-" * 74)
+
+
+def print_row(r):
+    print(f"{r['scenario']:<16} {r['size']:>7} {r['total_s']:>10.3f} {r['items_per_s']:>10.1f} "
+          f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}", flush=True)
+
+
+def compare(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """
+    Сверка с сохраненным прогоном
+
+    Returns:
+        число регрессий (пропускная способность ниже или p99 выше порога)
+    """
+    with open(baseline_path, "r") as f:
+        baseline = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    regressions = 0
+    print("")
+    print(f"Сравнение с {baseline_path} (порог {threshold:.0%}):")
+    for r in results:
+        base = baseline.get((r["scenario"], r["size"]))
+        if base is None:
+            continue
+        throughput = r["items_per_s"] / base["items_per_s"] - 1 if base["items_per_s"] else 0.0
+        p99 = r["p99_ms"] / base["p99_ms"] - 1 if base["p99_ms"] else 0.0
+        worse = throughput < -threshold or p99 > threshold or r["errors"] > base["errors"]
+        regressions += worse
+        mark = "РЕГРЕССИЯ" if worse else "ok"
+        print(f"  {r['scenario']:<16} {r['size']:>7}  эл/с {throughput:+.0%}  p99 {p99:+.0%}  "
+              f"ошибок {base['errors']}->{r['errors']}  {mark}")
+    return regressions
+
+
+def parse_list(value, allowed=None):
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    if allowed is not None:
+        unknown = [v for v in items if v not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"неизвестные сценарии: {', '.join(unknown)}")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк скриптов на имитации ноды")
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in parse_list(v)], default=SIZES,
+                        help="размеры через запятую (по умолчанию 10,100,1000,10000)")
+    parser.add_argument("--scenarios", type=lambda v: parse_list(v, BENCHMARKS), default=SCENARIOS,
+                        help=f"сценарии через запятую ({','.join(SCENARIOS)})")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="параллельность, как -j у скриптов")
+    parser.add_argument("--latency", type=float, default=0.0, help="задержка ответа ноды, мс")
+    parser.add_argument("--jitter", type=float, default=0.0, help="случайная добавка к задержке, мс")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="доля медленных ответов")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="добавка для медленных ответов, мс")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 503")
+    parser.add_argument("--block-time", type=float, default=1.0, help="секунд на блок у имитации")
+    parser.add_argument("--mempool-size", type=int, default=0, help="транзакций на блок у имитации (0 - без предела)")
+    parser.add_argument("--subprocess-max", type=int, default=1000,
+                        help="наибольший размер для сценариев с запуском inferenced на каждый элемент")
+    parser.add_argument("--json", dest="json_path", help="сохранить результаты в JSON")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="gonka_bench_")
+    process, url = start_mock(args)
+    # Скрипты, берущие ноды из конфигурации (get_epochs, mass_send), тоже ходят в имитацию
+    nodes_file = os.path.join(tmpdir, "gonka_nodes.txt")
+    with open(nodes_file, "w") as f:
+        f.write(url + "\n")
+    os.environ["GONKA_NODES_FILE"] = nodes_file
+    os.environ["GONKA_CACHE_DIR"] = tmpdir
+    # Замеряются запросы к ноде, а не кеш ответов (повторные прогоны одних и тех же адресов)
+    os.environ["GONKA_QUERY_CACHE"] = "0"
+    ctx = argparse.Namespace(url=url, workers=args.workers, tmpdir=tmpdir)
+
+    print(f"Имитация ноды: {url} (задержка {args.latency} мс, ошибок {args.error_rate:.1%}), -j {args.workers}")
+    print_header()
+    results = []
+    try:
+        for name in args.scenarios:
+            for size in args.sizes:
+                if name in SUBPROCESS_SCENARIOS and size > args.subprocess_max:
+                    print(f"{name} {size}: пропущено (--subprocess-max {args.subprocess_max})", file=sys.stderr)
+                    continue
+                results.append(run_one(name, size, ctx))
+                print_row(results[-1])
+    finally:
+        process.terminate()
+        process.wait()
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"options": {k: v for k, v in vars(args).items() if k not in ("json_path", "compare")},
+                       "results": results}, f, indent=2)
+    if args.compare:
+        return 1 if compare(results, args.compare) else 0
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Локальный кеш неизменяемых данных цепочки в SQLite.
+
+Высота начала эпохи (poc_start_block_height), список участников
+завершенной эпохи, время закоммиченного блока и ответы запросов на
+закрепленной высоте (--height) после финализации не меняются, поэтому
+их можно хранить между запусками.
+По умолчанию база лежит в ~/.cache/gonka/chain_cache.sqlite
+(каталог задается переменной окружения GONKA_CACHE_DIR).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gonka")
+CACHE_FILENAME = "chain_cache.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS epochs (
+    epoch_id INTEGER PRIMARY KEY,
+    start_height INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    epoch_id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT NOT NULL,
+    address TEXT NOT NULL,
+    height INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, address, height)
+);
+CREATE TABLE IF NOT EXISTS blocks (
+    height INTEGER PRIMARY KEY,
+    time TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Таблицы, которые чистит prune()
+PRUNABLE_TABLES = ("epochs", "participants", "queries", "blocks")
+
+
+def default_cache_path():
+    cache_dir = os.environ.get("GONKA_CACHE_DIR") or DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir, CACHE_FILENAME)
+
+
+class ChainCache:
+    """
+    Кеш эпох, участников эпох, запросов на высоте и блоков
+
+    Одно соединение SQLite на объект, доступ из пула потоков
+    сериализуется блокировкой.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fetch_one(self, sql, params):
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return row[0] if row else None
+
+    def _write(self, sql, params):
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    # --- Эпохи ---
+
+    def get_epoch_start(self, epoch_id):
+        """Высота начала эпохи или None, если ее нет в кеше"""
+        return self._fetch_one("SELECT start_height FROM epochs WHERE epoch_id = ?", (epoch_id,))
+
+    def put_epoch_start(self, epoch_id, start_height):
+        self._write(
+            "INSERT OR REPLACE INTO epochs (epoch_id, start_height, fetched_at) VALUES (?, ?, ?)",
+            (epoch_id, start_height, time.time()),
+        )
+
+    # --- Участники эпох ---
+
+    def get_epoch_participants(self, epoch_id):
+        """Ответ active_participants завершенной эпохи (dict) или None"""
+        payload = self._fetch_one("SELECT payload FROM participants WHERE epoch_id = ?", (epoch_id,))
+        return json.loads(payload) if payload is not None else None
+
+    def put_epoch_participants(self, epoch_id, data):
+        self._write(
+            "INSERT OR REPLACE INTO participants (epoch_id, payload, fetched_at) VALUES (?, ?, ?)",
+            (epoch_id, json.dumps(data, separators=(",", ":")), time.time()),
+        )
+
+    # --- Запросы на закрепленной высоте ---
+
+    def get_query(self, query, address, height):
+        """Ответ запроса (JSON-строка, "null" - не найдено) или None, если его нет в кеше"""
+        return self._fetch_one(
+            "SELECT payload FROM queries WHERE query = ? AND address = ? AND height = ?", (query, address, height)
+        )
+
+    def put_query(self, query, address, height, payload):
+        self._write(
+            "INSERT OR REPLACE INTO queries (query, address, height, payload, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (query, address, height, payload, time.time()),
+        )
+
+    # --- Блоки ---
+
+    def get_block_time(self, height):
+        """Время блока (строка из заголовка) или None"""
+        return self._fetch_one("SELECT time FROM blocks WHERE height = ?", (height,))
+
+    def put_block_time(self, height, time_str):
+        self._write(
+            "INSERT OR REPLACE INTO blocks (height, time, fetched_at) VALUES (?, ?, ?)",
+            (height, time_str, time.time()),
+        )
+
+    # --- Обслуживание ---
+
+    def prune(self, max_age_days=None, max_rows=None):
+        """
+        Удаляет старые записи
+
+        Args:
+            max_age_days: удалить записи, загруженные раньше этого срока
+            max_rows: оставить в каждой таблице не больше max_rows самых свежих записей
+        """
+        with self._lock:
+            for table in PRUNABLE_TABLES:
+                if max_age_days is not None:
+                    cutoff = time.time() - max_age_days * 86400
+                    self._conn.execute(f"DELETE FROM {table} WHERE fetched_at < ?", (cutoff,))
+                if max_rows is not None:
+                    self._conn.execute(
+                        f"DELETE FROM {table} WHERE rowid NOT IN "
+                        f"(SELECT rowid FROM {table} ORDER BY fetched_at DESC LIMIT ?)",
+                        (max_rows,),
+                    )
+            self._conn.commit()
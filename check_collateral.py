@@ -5,17 +5,37 @@ import sys
 import os
 import re
 
+import instrument
+from chain_cache import ChainCache
+from gonka_client import (GonkaClient, ChainQueryError, ChainTimeoutError, LATEST, cli_fallback_requested,
+                          height_requested)
+
 RED = "\033[91m"
 RESET = "\033[0m"
 
-def get_collateral(address, node_url):
+def get_collateral(address, client):
+    """Залог через REST ноды. Возвращает строку как и get_collateral_cli"""
+    try:
+        coin = client.get_collateral(address)
+        if coin is None:
+            return "NOT_FOUND"
+        return str(coin.amount)
+    except ChainTimeoutError:
+        return "TIMEOUT"
+    except ChainQueryError as e:
+        return f"ERROR:{e}"
+
+def get_collateral_cli(address, node_url, height=None):
+    """Старый способ через inferenced (включается флагом --cli)"""
     cmd = [
         "./inferenced", "query", "collateral", "show-collateral",
         address,
         "--node", f"{node_url}/chain-rpc/"
     ]
+    if height is not None:
+        cmd += ["--height", str(height)]
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = instrument.run(cmd, capture_output=True, text=True, timeout=30)
         output = result.stdout + result.stderr
         # Parse amount from output like:
         # amount:
@@ -31,18 +51,48 @@ def get_collateral(address, node_url):
         return f"ERROR:{e}"
 
 def main():
+    use_cli = cli_fallback_requested(sys.argv)
+    try:
+        # --height H: все залоги на одном блоке, ответы кешируются по высоте
+        height = height_requested(sys.argv)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
     if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <input_file> [NODE_URL]")
+        print(f"Usage: {sys.argv[0]} <input_file> [NODE_URL] [--cli] [--height H|latest]")
+        sys.exit(1)
+    if use_cli and height == LATEST:
+        print("Error: with --cli the height must be a block number")
         sys.exit(1)
 
     input_file = sys.argv[1]
-    node_url = sys.argv[2] if len(sys.argv) > 2 else os.environ.get("NODE_URL", "http://node1.gonka.ai:8000")
+    explicit_node = sys.argv[2] if len(sys.argv) > 2 else os.environ.get("NODE_URL")
+    node_url = explicit_node or "http://node1.gonka.ai:8000"
 
     if not node_url:
         print("Error: NODE_URL not set. Pass as 2nd argument or set NODE_URL env var.")
         print("Default: http://node1.gonka.ai:8000")
         sys.exit(1)
 
+    # Без явной ноды используется пул из gonka_nodes.txt
+    if use_cli:
+        client = None
+    elif explicit_node:
+        client = GonkaClient(node_url, timeout=30)
+    else:
+        client = GonkaClient.from_config(node_url, timeout=30)
+
+    cache = None
+    if client is not None and height is not None:
+        cache = ChainCache()
+        try:
+            height = client.pin_height(height, cache)
+        except ChainQueryError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Height: {height}", file=sys.stderr)
+
     with open(input_file, "r") as f:
         for line in f:
             line = line.strip()
@@ -54,7 +104,10 @@ def main():
             address = parts[0]
             expected = parts[1]
 
-            actual = get_collateral(address, node_url)
+            if use_cli:
+                actual = get_collateral_cli(address, node_url, height)
+            else:
+                actual = get_collateral(address, client)
 
             output = f"{address} {expected} {actual}"
             if expected != actual:
@@ -62,5 +115,8 @@ def main():
             else:
                 print(output)
 
+    if cache is not None:
+        cache.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Проверка веса в эпохе на всех GPU-хостах (замена check_weight.sh).
+
+Читает тот же hosts.txt (строки ИМЯ:ХОСТ), опрашивает хосты скользящим
+окном: новый хост берется, как только освободилось место, а не после
+завершения всей группы. SSH-соединения мультиплексируются (ControlMaster),
+поэтому повторные опросы с --interval не делают новый handshake.
+Ответ /admin/v1/setup/report разбирается локально, jq на хостах не нужен.
+
+Результат пишется в results.txt в порядке hosts.txt: ИМЯ:вес,
+ИМЯ:not in epoch или ИМЯ:ERROR.
+
+Использование: ./check_weight.py [hosts.txt] [-j 64] [--interval 300]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import instrument
+
+HOSTS_FILE = "hosts.txt"
+OUTPUT_FILE = "results.txt"
+MAX_PARALLEL = 64
+
+REPORT_URL = "http://localhost:9200/admin/v1/setup/report"
+CONTROL_PATH = os.path.join(os.path.expanduser("~"), ".ssh", "gonka-cm-%C")
+
+ERROR = "ERROR"
+NOT_IN_EPOCH = "not in epoch"
+
+
+def read_hosts(path):
+    """Список (имя, хост) из файла ИМЯ:ХОСТ"""
+    hosts = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, host = line.partition(":")
+            hosts.append((name, host))
+    return hosts
+
+
+def ssh_command(host, persist):
+    """ssh с мультиплексированием: соединение живет persist секунд после опроса"""
+    return [
+        "ssh",
+        "-o", "StrictHostKeyChecking=accept-new",
+        "-o", "ConnectTimeout=10",
+        "-o", "BatchMode=yes",
+        "-o", "ControlMaster=auto",
+        "-o", f"ControlPath={CONTROL_PATH}",
+        "-o", f"ControlPersist={persist}",
+        host,
+        f"curl -s {REPORT_URL}",
+    ]
+
+
+def parse_report(text):
+    """
+    Вес из отчета setup/report, как в jq из check_weight.sh
+
+    Returns:
+        вес (как записан в JSON), "not in epoch" или None, если проверки нет
+    """
+    try:
+        # Числа оставляем строками, чтобы вес выводился без изменений
+        report = json.loads(text, parse_float=str, parse_int=str)
+    except ValueError:
+        return None
+    if not isinstance(report, dict):
+        return None
+
+    results = []
+    for check in report.get("checks") or []:
+        if check.get("id") != "active_in_epoch":
+            continue
+        if check.get("status") == "PASS":
+            weight = (check.get("details") or {}).get("weight")
+            results.append("null" if weight is None else str(weight))
+        else:
+            results.append(NOT_IN_EPOCH)
+    return "\n".join(results) or None
+
+
+def check_host(name, host, timeout, persist):
+    """Вес одного хоста или ERROR"""
+    print(f"Проверка {name} ({host})...", flush=True)
+    try:
+        result = instrument.run(
+            ssh_command(host, persist),
+            node=host,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return ERROR
+    if result.returncode != 0:
+        return ERROR
+    return parse_report(result.stdout) or ERROR
+
+
+def poll(hosts, workers, timeout, persist):
+    """Опрос всех хостов скользящим окном; результаты в порядке hosts"""
+    results = [None] * len(hosts)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {}
+        for i, (name, host) in enumerate(hosts):
+            futures[executor.submit(check_host, name, host, timeout, persist)] = i
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            print(f"{hosts[i][0]}:{results[i]}", flush=True)
+    return results
+
+
+def write_results(path, hosts, results):
+    # Через временный файл, чтобы читатель не увидел половину списка
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        for (name, _), result in zip(hosts, results):
+            f.write(f"{name}:{result}\n")
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Вес в эпохе по всем хостам из hosts.txt")
+    parser.add_argument("hosts_file", nargs="?", default=HOSTS_FILE, help="файл ИМЯ:ХОСТ")
+    parser.add_argument("-o", "--output", default=OUTPUT_FILE, help="файл результатов")
+    parser.add_argument("-j", "--parallel", type=int, default=MAX_PARALLEL, help="одновременных SSH-сессий")
+    parser.add_argument("--timeout", type=int, default=30, help="таймаут опроса одного хоста, сек")
+    parser.add_argument("--interval", type=int, help="повторять опрос каждые N секунд")
+    args = parser.parse_args()
+
+    try:
+        hosts = read_hosts(args.hosts_file)
+    except FileNotFoundError:
+        print(f"Ошибка: файл {args.hosts_file} не найден", file=sys.stderr)
+        return 1
+
+    # Мастер-соединение держим дольше интервала, чтобы следующий опрос его застал
+    persist = max(60, (args.interval or 0) * 2)
+    os.makedirs(os.path.dirname(CONTROL_PATH), mode=0o700, exist_ok=True)
+
+    while True:
+        started = time.monotonic()
+        results = poll(hosts, args.parallel, args.timeout, persist)
+        write_results(args.output, hosts, results)
+        print("Готово!")
+        if not args.interval:
+            return 0
+        time.sleep(max(0, args.interval - (time.monotonic() - started)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
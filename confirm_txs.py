@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Подтверждение транзакций по мере появления новых блоков.
+
+Читает файл результатов mass_send_gonka.py (адрес сумма ok txhash: ХЕШ),
+следит за новыми блоками через /chain-rpc/block и /chain-rpc/block_results
+и помечает каждую транзакцию как подтвержденную или ошибочную сразу после
+коммита ее блока. С --follow файл дочитывается по мере записи, поэтому
+ранние выплаты подтверждаются, пока поздние еще отправляются.
+
+Использование: ./confirm_txs.py <файл_с_транзакциями> [--follow] [--wait-pid PID]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from gonka_client import GonkaClient, ChainQueryError
+
+NODE_URL = "http://net2.gonka.top:8000"
+
+# Цвета для вывода
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+def parse_tx_line(line):
+    """
+    Хеш транзакции и ошибка отправки из строки результата или None
+
+    Строка "адрес сумма ok txhash: ХЕШ" дает (ХЕШ, None). Строка
+    "адрес сумма Error: текст txhash: ХЕШ" - транзакция, отвергнутая при
+    CheckTx: в блок она не попадет, поэтому ошибка возвращается сразу.
+
+    >>> parse_tx_line("gonka1abc 1.5 ok txhash: ab12")
+    ('AB12', None)
+    >>> parse_tx_line("gonka1abc 1.5 Error: insufficient funds txhash: ab12")
+    ('AB12', 'insufficient funds')
+    >>> parse_tx_line("gonka1abc 1.5 Error: таймаут выполнения") is None
+    True
+    """
+    parts = line.split()
+    if "txhash:" not in parts or len(parts) < 3:
+        return None
+    i = parts.index("txhash:")
+    if i + 1 >= len(parts):
+        return None
+    txhash = parts[i + 1].upper()
+    if parts[2] == "ok":
+        return txhash, None
+    if parts[2] == "Error:":
+        return txhash, " ".join(parts[3:i]) or "ошибка отправки"
+    return None
+
+
+class TxFileFollower:
+    """Дочитывает новые полные строки файла, который еще пишется"""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.buffer = ""
+
+    def read_new_lines(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+                self.offset = f.tell()
+        except FileNotFoundError:
+            return []
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split("\n")
+        return lines
+
+    def flush(self):
+        """Последняя строка без перевода строки"""
+        rest, self.buffer = self.buffer, ""
+        return [rest] if rest.strip() else []
+
+
+class TxConfirmer:
+    """
+    Статусы транзакций по хешам
+
+    Новые блоки сканируются по высоте начиная с start_height; для каждой
+    транзакции блока берется code из block_results.
+    """
+
+    def __init__(self, client, start_height):
+        self.client = client
+        self.next_height = start_height
+        self.status = {}
+        self.heights = {}
+        self.order = []
+
+    def add(self, txhash):
+        if txhash not in self.status:
+            self.status[txhash] = PENDING
+            self.order.append(txhash)
+
+    def pending(self):
+        return [h for h in self.order if self.status[h] == PENDING]
+
+    def reject(self, txhash):
+        """Транзакция отвергнута при отправке и в блок не попадет"""
+        if txhash not in self.status:
+            self.status[txhash] = FAILED
+            self.order.append(txhash)
+
+    def _mark(self, txhash, height, result):
+        self.status[txhash] = CONFIRMED if result.code == 0 else FAILED
+        self.heights[txhash] = height
+        return txhash, height, result
+
+    def poll(self):
+        """
+        Сканирует блоки, закоммиченные с прошлого вызова
+
+        Результаты отдаются по мере сканирования: если запрос к ноде падает
+        на очередном блоке, транзакции из уже просмотренных блоков успевают
+        дойти до вызывающего, а сканирование продолжится с этого блока.
+
+        Yields:
+            (txhash, height, TxResult) для наших транзакций
+        """
+        latest = self.client.latest_height()
+        while self.next_height <= latest:
+            height = self.next_height
+            hashes = self.client.get_block_tx_hashes(height)
+            resolved = []
+            if hashes and any(self.status.get(h) == PENDING for h in hashes):
+                results = self.client.get_block_results(height)
+                for txhash, result in zip(hashes, results):
+                    if self.status.get(txhash) == PENDING:
+                        resolved.append(self._mark(txhash, height, result))
+            self.next_height += 1
+            yield from resolved
+
+    def lookup_pending(self):
+        """Точечная проверка оставшихся хешей через /tx (для блоков до start_height)"""
+        resolved = []
+        for txhash in self.pending():
+            try:
+                found = self.client.get_tx_result(txhash)
+            except ChainQueryError:
+                continue
+            if found is not None:
+                height, result = found
+                resolved.append(self._mark(txhash, height, result))
+        return resolved
+
+
+def report(resolved, numbers):
+    for txhash, height, result in resolved:
+        prefix = f"#{numbers[txhash]} Tx: {txhash[:10]}..."
+        if result.code == 0:
+            print(f"{prefix} {GREEN}подтверждена в блоке {height}{NC}", flush=True)
+        else:
+            log = result.log.split(":")[0][:100]
+            print(f"{prefix} {RED}ОШИБКА: code={result.code} {log}{NC}", flush=True)
+
+
+def process_alive(pid):
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подтверждение транзакций по новым блокам")
+    parser.add_argument("tx_file", help="файл результатов mass_send_gonka.py")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("--follow", action="store_true",
+                        help="дочитывать файл, пока он пишется (см. --wait-pid)")
+    parser.add_argument("--wait-pid", type=int, help="PID процесса отправки; файл читается до его завершения")
+    parser.add_argument("--from-height", type=int,
+                        help="с какого блока сканировать (по умолчанию текущий минус --lookback)")
+    parser.add_argument("--lookback", type=int, default=5, help="сколько блоков назад просмотреть при старте")
+    parser.add_argument("--timeout", type=int, default=120,
+                        help="сколько секунд ждать оставшиеся транзакции после конца файла")
+    parser.add_argument("--interval", type=float, default=1.0, help="период опроса новых блоков, сек")
+    args = parser.parse_args()
+    if args.follow and args.wait_pid is None:
+        parser.error("--follow требует --wait-pid")
+
+    client = GonkaClient(args.node) if args.node else GonkaClient.from_config(NODE_URL)
+    try:
+        start_height = args.from_height or max(1, client.latest_height() - args.lookback)
+    except ChainQueryError as e:
+        print(f"{RED}Ошибка: не удалось получить высоту блока: {e}{NC}")
+        return 1
+
+    follower = TxFileFollower(args.tx_file)
+    confirmer = TxConfirmer(client, start_height)
+    numbers = {}
+
+    print("Подтверждение транзакций в gonka.ai")
+    print("======================================")
+
+    def add_lines(lines):
+        for line in lines:
+            parsed = parse_tx_line(line)
+            if parsed is None or parsed[0] in numbers:
+                continue
+            txhash, error = parsed
+            numbers[txhash] = len(numbers) + 1
+            if error is None:
+                confirmer.add(txhash)
+            else:
+                confirmer.reject(txhash)
+                print(f"#{numbers[txhash]} Tx: {txhash[:10]}... {RED}ОШИБКА при отправке: {error[:100]}{NC}",
+                      flush=True)
+
+    writer_done = not args.follow
+    deadline = None
+
+    if writer_done:
+        # Файл уже полный: часть транзакций могла попасть в блоки до start_height
+        add_lines(follower.read_new_lines() + follower.flush())
+        report(confirmer.lookup_pending(), numbers)
+
+    while True:
+        lines = follower.read_new_lines()
+        if writer_done:
+            lines += follower.flush()
+        add_lines(lines)
+
+        try:
+            report(confirmer.poll(), numbers)
+        except ChainQueryError as e:
+            print(f"{YELLOW}Предупреждение: {e}{NC}", file=sys.stderr)
+
+        if writer_done:
+            if not confirmer.pending():
+                break
+            if deadline is None:
+                deadline = time.monotonic() + args.timeout
+            elif time.monotonic() > deadline:
+                break
+        elif not process_alive(args.wait_pid):
+            # Процесс отправки завершился - дочитываем файл последний раз
+            writer_done = True
+            continue
+
+        time.sleep(args.interval)
+
+    report(confirmer.lookup_pending(), numbers)
+
+    pending = confirmer.pending()
+    for txhash in pending:
+        print(f"#{numbers[txhash]} Tx: {txhash[:10]}... {YELLOW}не найдена в блоках (pending){NC}")
+
+    statuses = list(confirmer.status.values())
+    confirmed = statuses.count(CONFIRMED)
+    failed = statuses.count(FAILED)
+
+    print("")
+    print("======================================")
+    print(f"Всего: {len(statuses)} | Подтверждено: {confirmed} | Ошибки: {failed} | Ожидают: {len(pending)}")
+    print("======================================")
+
+    return 0 if confirmed == len(statuses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,40 @@
 #!/usr/bin/env python3
-import subprocess
+import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def get_balance(wallet_address, node_url="http://net2.gonka.top:8000/chain-rpc/"):
-    """Получает баланс кошелька в GONKA"""
+import instrument
+from chain_cache import ChainCache
+from gonka_client import GonkaClient, ChainQueryError, NGONKA_PER_GONKA, LATEST, cli_fallback_env, parse_height
+from node_pool import normalize_node_url
+from snapshot_store import (SnapshotStore, SPENDABLE, DEFAULT_MAX_AGE_HOURS, plan_refresh, save_refresh,
+                            diff_amounts, print_plan)
+
+NODE_URL = "http://net2.gonka.top:8000"
+
+def get_balance_ngonka(wallet_address, client):
+    """Получает баланс кошелька в ngonka (целое число) через REST ноды"""
+    try:
+        return client.get_balance(wallet_address)
+    except ChainQueryError as e:
+        print(f"Ошибка при получении баланса {wallet_address}: {e}", file=sys.stderr)
+        return None
+
+def get_balance(wallet_address, client):
+    """Получает баланс кошелька в GONKA через REST ноды"""
+    amount = get_balance_ngonka(wallet_address, client)
+    return amount / NGONKA_PER_GONKA if amount is not None else None
+
+def get_balance_cli(wallet_address, node_url=f"{NODE_URL}/chain-rpc/", height=None):
+    """Получает баланс кошелька в GONKA через inferenced (флаг --cli)"""
     try:
         cmd = [
             "/home/mitch/Crypto/gonka.ai/inferenced", "query", "bank", "balances", 
             wallet_address, "--node", node_url
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        if height is not None:
+            cmd += ["--height", str(height)]
+        result = instrument.run(cmd, capture_output=True, text=True, timeout=10)
         
         if result.returncode != 0:
             return None
@@ -29,12 +54,102 @@ def get_balance(wallet_address, node_url="http://net2.gonka.top:8000/chain-rpc/"
         print(f"Ошибка при получении баланса {wallet_address}: {e}", file=sys.stderr)
         return None
 
+def fetch_balances(wallets, client, use_cli=False, workers=16, height=None, ngonka=False, node_url=None):
+    """
+    Параллельно запрашивает балансы кошельков.
+
+    Ход выполнения печатается в stderr по мере получения ответов,
+    результат возвращается в порядке входного списка. height и node_url
+    нужны только для --cli (клиент закрепляет высоту сам, см.
+    GonkaClient.pin_height); без node_url inferenced идет на NODE_URL.
+    С ngonka=True (только REST) балансы возвращаются целыми ngonka.
+    """
+    results = [None] * len(wallets)
+
+    def fetch(wallet):
+        if use_cli:
+            return get_balance_cli(wallet, node_url or f"{NODE_URL}/chain-rpc/", height)
+        if ngonka:
+            return get_balance_ngonka(wallet, client)
+        return get_balance(wallet, client)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(fetch, wallet): i for i, wallet in enumerate(wallets)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            results[i] = future.result()
+            scale = NGONKA_PER_GONKA if ngonka else 1
+            shown = f"{results[i] / scale:.2f}" if results[i] is not None else "ОШИБКА"
+            print(f"[{done}/{len(wallets)}] {wallets[i]} {shown}", file=sys.stderr)
+
+    return results
+
+def fetch_balances_incremental(wallets, client, store, workers=16, max_age_hours=DEFAULT_MAX_AGE_HOURS, full=False):
+    """
+    Балансы с запросом только кошельков, у которых были переводы (snapshot_store)
+
+    Returns:
+        (балансы в GONKA в порядке wallets, изменения [(адрес, было, стало)] в ngonka)
+    """
+    plan = plan_refresh(store, client, wallets, (SPENDABLE,), max_age_hours, full, workers)
+    print_plan(plan, len(wallets))
+    # Балансы читаются на высоте снимка: переводы после нее найдет следующий запуск
+    client.pin_height(plan.height)
+    # Снимок хранит точные ngonka, в GONKA переводится только для вывода
+    fetched = dict(zip(plan.query, fetch_balances(plan.query, client, workers=workers, ngonka=True)))
+
+    amounts = {}
+    for wallet in wallets:
+        if wallet in fetched:
+            amounts[wallet] = fetched[wallet]
+        else:
+            amounts[wallet] = plan.previous[SPENDABLE][wallet].amount
+    save_refresh(store, plan, SPENDABLE, {w: amounts[w] for w in fetched if amounts[w] is not None}, wallets)
+
+    balances = [amounts[w] / NGONKA_PER_GONKA if amounts[w] is not None else None for w in wallets]
+    return balances, diff_amounts(plan.previous[SPENDABLE], amounts)
+
+def print_changes(changes):
+    """Раздел "изменения с прошлого запуска" после таблицы"""
+    print(f"\nИзменения с прошлого запуска: {len(changes)}")
+    if not changes:
+        return
+    print(f"{'Кошелек':<50} {'Было':>14} {'Стало':>14} {'Разница':>14}")
+    for wallet, before, after in changes:
+        before_str = f"{before / NGONKA_PER_GONKA:>14.2f}" if before is not None else f"{'новый':>14}"
+        delta = (after - (before or 0)) / NGONKA_PER_GONKA
+        print(f"{wallet:<50} {before_str} {after / NGONKA_PER_GONKA:>14.2f} {delta:>+14.2f}")
+
 def main():
-    if len(sys.argv) < 2:
-        print("Использование: python3 check_balances.py wallets.txt")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Балансы кошельков GONKA")
+    parser.add_argument("wallet_file", help="файл со списком адресов")
+    parser.add_argument("-j", "--workers", type=int, default=16,
+                        help="число параллельных запросов (1 - последовательно)")
+    parser.add_argument("--per-host", type=int, default=8,
+                        help="максимум одновременных запросов к одной ноде")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("--cli", action="store_true", default=cli_fallback_env(),
+                        help="запрашивать через inferenced (также GONKA_USE_CLI=1)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="запрашивать только кошельки с переводами с прошлого запуска (снимок в SQLite)")
+    parser.add_argument("--full", action="store_true", help="с --incremental: запросить все и обновить снимок")
+    parser.add_argument("--max-age", type=float, default=DEFAULT_MAX_AGE_HOURS, metavar="HOURS",
+                        help="с --incremental: перезапрашивать кошелек не реже, чем раз в HOURS часов")
+    parser.add_argument("--snapshot-path", help="файл снимков (по умолчанию $GONKA_CACHE_DIR или ~/.cache/gonka)")
+    parser.add_argument("--height", type=parse_height, metavar="H",
+                        help="все запросы на высоте H (номер блока или latest); ответы кешируются по высоте")
+    parser.add_argument("--no-cache", action="store_true", help="с --height: не использовать кеш на диске")
+    parser.add_argument("--cache-path", help="файл кеша (по умолчанию $GONKA_CACHE_DIR или ~/.cache/gonka)")
+    args = parser.parse_args()
+    use_cli = args.cli
+    if args.incremental and use_cli:
+        parser.error("--incremental несовместим с --cli")
+    if args.incremental and args.height is not None:
+        parser.error("--incremental несовместим с --height")
+    if use_cli and args.height == LATEST:
+        parser.error("с --cli высота задается номером блока")
     
-    wallet_file = sys.argv[1]
+    wallet_file = args.wallet_file
     
     try:
         with open(wallet_file, 'r') as f:
@@ -43,14 +158,44 @@ def main():
         print(f"Файл {wallet_file} не найден!")
         sys.exit(1)
     
+    client = None
+    if not use_cli:
+        if args.node:
+            client = GonkaClient(args.node, pool_size=args.workers, max_per_host=args.per_host)
+        else:
+            client = GonkaClient.from_config(NODE_URL, pool_size=args.workers, max_per_host=args.per_host)
+    cache = None
+    if client is not None and args.height is not None:
+        if not args.no_cache:
+            cache = ChainCache(args.cache_path)
+        try:
+            height = client.pin_height(args.height, cache)
+        except ChainQueryError as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+        print(f"Высота: {height}", file=sys.stderr)
+    changes = None
+    if args.incremental:
+        with SnapshotStore(args.snapshot_path) as store:
+            try:
+                balances, changes = fetch_balances_incremental(wallets, client, store, args.workers,
+                                                               args.max_age, args.full)
+            except ChainQueryError as e:
+                print(f"Ошибка: {e}")
+                sys.exit(1)
+    else:
+        node_url = f"{normalize_node_url(args.node)}/chain-rpc/" if args.node else None
+        balances = fetch_balances(wallets, client, use_cli, args.workers, args.height, node_url=node_url)
+    if cache is not None:
+        cache.close()
+
     print(f"{'Кошелек':<50} {'Баланс (GONKA)':<15}")
     print("-" * 65)
     
     total_balance = 0.0
     successful_queries = 0
     
-    for wallet in wallets:
-        balance = get_balance(wallet)
+    for wallet, balance in zip(wallets, balances):
         if balance is not None:
             print(f"{wallet:<50} {balance:>14.2f}")
             total_balance += balance
@@ -61,6 +206,8 @@ def main():
     print("=" * 65)
     print(f"{'ИТОГО:':<50} {total_balance:>14.2f}")
     print(f"\nОбработано кошельков: {successful_queries} из {len(wallets)}")
+    if changes is not None:
+        print_changes(changes)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -2,25 +2,47 @@
 """
 Script to fetch epoch data from Gonka.ai API and generate a CSV report.
 Gets the current epoch and processes the last N epochs with their start/end times.
+
+With --weights NODES_FILE it instead builds the participant weight history
+of our nodes over the same epochs (weight series, epoch-over-epoch deltas,
+missed epochs) and writes it as CSV.
 """
 
-import json
+import argparse
 import csv
 import requests
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
+
+from chain_cache import ChainCache
+from gonka_client import parse_block_time
+from node_pool import NodePool
 
 # Configuration
-AMOUNT_EPOCH = 35  # Number of recent epochs to process
-API_BASE_URL = "http://tower.gonka.top/:8000"
-BLOCKCHAIN_API_URL = "http://tower.gonka.top:26657"
+AMOUNT_EPOCH = 35  # Number of recent epochs to process (override with --amount)
+MAX_WORKERS = 16  # Concurrent epoch fetches (override with --workers)
+DEFAULT_NODE_URL = "http://tower.gonka.top:8000"  # Used when gonka_nodes.txt is missing
+API_PATH = ""  # Epoch API (/v1/...) lives at the node root
+BLOCKCHAIN_API_PATH = "/chain-rpc"  # CometBFT RPC behind the node proxy
+
+# Shared node pool: one keep-alive session, best node by latency, failover
+pool = NodePool.from_config(DEFAULT_NODE_URL, pool_size=MAX_WORKERS)
+
+
+def configure_pool(workers: int):
+    """Size the connection pool so each worker keeps its own connection."""
+    global pool
+    pool.close()
+    pool = NodePool.from_config(DEFAULT_NODE_URL, pool_size=max(workers, 1))
 
 
 def get_current_epoch() -> int:
     """Get the current epoch ID from the API."""
-    url = f"{API_BASE_URL}/v1/epochs/current/participants"
+    url = f"{API_PATH}/v1/epochs/current/participants"
     try:
-        response = requests.get(url, timeout=10)
+        response = pool.get(url)
         response.raise_for_status()
         data = response.json()
         # epoch_id is inside active_participants
@@ -37,18 +59,14 @@ def get_current_epoch() -> int:
         raise
 
 
-def get_epoch_start_block(epoch_id: int) -> Optional[int]:
-    """Get the start block height for a specific epoch."""
-    url = f"{API_BASE_URL}/v1/epochs/{epoch_id}/participants"
+def get_epoch_payload(epoch_id: int) -> Optional[Dict]:
+    """Get the active_participants object (start block, participant list) of an epoch."""
+    url = f"{API_PATH}/v1/epochs/{epoch_id}/participants"
     try:
-        response = requests.get(url, timeout=10)
+        response = pool.get(url)
         response.raise_for_status()
         data = response.json()
-        block_height = data.get("active_participants", {}).get("poc_start_block_height")
-        if block_height is None:
-            print(f"Warning: Could not find start block for epoch {epoch_id}")
-            return None
-        return block_height
+        return data["active_participants"]
     except requests.RequestException as e:
         print(f"Error fetching epoch {epoch_id} data: {e}")
         return None
@@ -57,41 +75,30 @@ def get_epoch_start_block(epoch_id: int) -> Optional[int]:
         return None
 
 
-def get_block_timestamp(block_height: int) -> Optional[datetime]:
-    """Get the timestamp for a specific block height."""
-    url = f"{BLOCKCHAIN_API_URL}/block?height={block_height}"
+def get_epoch_start_block(epoch_id: int) -> Optional[int]:
+    """Get the start block height for a specific epoch."""
+    data = get_epoch_payload(epoch_id)
+    if data is None:
+        return None
+    block_height = data.get("poc_start_block_height")
+    if block_height is None:
+        print(f"Warning: Could not find start block for epoch {epoch_id}")
+        return None
+    return block_height
+
+
+def get_block_time_str(block_height: int) -> Optional[str]:
+    """Get the raw header time string for a specific block height."""
+    url = f"{BLOCKCHAIN_API_PATH}/block?height={block_height}"
     try:
-        response = requests.get(url, timeout=10)
+        response = pool.get(url)
         response.raise_for_status()
         data = response.json()
         time_str = data.get("result", {}).get("block", {}).get("header", {}).get("time")
         if time_str is None:
             print(f"Warning: Could not find timestamp for block {block_height}")
             return None
-        # Parse ISO format timestamp: "2025-11-24T03:42:11.812952356Z" or "2025-11-14T14:31:23.908096665+00:00"
-        # Handle nanoseconds by truncating to microseconds (6 digits)
-        if "." in time_str:
-            # Split on decimal point
-            parts = time_str.split(".")
-            if len(parts) == 2:
-                # Truncate nanoseconds to microseconds
-                decimal_part = parts[1]
-                # Remove timezone suffix if present
-                if "+" in decimal_part:
-                    decimal_part, tz = decimal_part.split("+", 1)
-                    time_str = f"{parts[0]}.{decimal_part[:6]}+{tz}"
-                elif "Z" in decimal_part:
-                    decimal_part = decimal_part.replace("Z", "")
-                    time_str = f"{parts[0]}.{decimal_part[:6]}Z"
-                else:
-                    time_str = f"{parts[0]}.{decimal_part[:6]}"
-        
-        # Replace Z with +00:00 for fromisoformat
-        if time_str.endswith("Z"):
-            time_str = time_str[:-1] + "+00:00"
-        
-        dt = datetime.fromisoformat(time_str)
-        return dt
+        return time_str
     except requests.RequestException as e:
         print(f"Error fetching block {block_height} data: {e}")
         return None
@@ -100,6 +107,114 @@ def get_block_timestamp(block_height: int) -> Optional[datetime]:
         return None
 
 
+def get_block_header_time(block_height: int) -> Optional[str]:
+    """
+    Get a block's header time via /blockchain (header only).
+
+    /blockchain?minHeight=h&maxHeight=h returns just the block meta, without
+    the transactions /block carries. Epoch start heights are thousands of
+    blocks apart, so each height is its own request.
+    """
+    url = f"{BLOCKCHAIN_API_PATH}/blockchain"
+    params = {"minHeight": block_height, "maxHeight": block_height}
+    try:
+        response = pool.get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        metas = data.get("result", {}).get("block_metas") or []
+        for meta in metas:
+            if int(meta["header"]["height"]) == block_height:
+                return meta["header"]["time"]
+        return None
+    except requests.RequestException as e:
+        print(f"Error fetching header {block_height}: {e}")
+        return None
+    except (ValueError, KeyError) as e:
+        print(f"Error parsing header {block_height}: {e}")
+        return None
+
+
+def fetch_epoch_start(epoch_id: int, cache: Optional[ChainCache] = None,
+                      final: bool = False, refresh: bool = False) -> Optional[int]:
+    """
+    Get the start block for one epoch.
+
+    Start heights of finished epochs (final=True) are read from / written
+    to the cache; refresh=True ignores cached values.
+    """
+    if cache is not None and final and not refresh:
+        block_height = cache.get_epoch_start(epoch_id)
+        if block_height is not None:
+            return block_height
+
+    block_height = get_epoch_start_block(epoch_id)
+    if block_height is not None and cache is not None and final:
+        cache.put_epoch_start(epoch_id, block_height)
+    return block_height
+
+
+def fetch_epoch_payload(epoch_id: int, cache: Optional[ChainCache] = None,
+                        final: bool = False, refresh: bool = False) -> Optional[Dict]:
+    """
+    Get the participants payload for one epoch.
+
+    Works like fetch_epoch_start: payloads of finished epochs are cached
+    (together with their start block), the current epoch is always fetched.
+    """
+    if cache is not None and final and not refresh:
+        data = cache.get_epoch_participants(epoch_id)
+        if data is not None:
+            return data
+
+    data = get_epoch_payload(epoch_id)
+    if data is not None and cache is not None and final:
+        cache.put_epoch_participants(epoch_id, data)
+        if data.get("poc_start_block_height") is not None:
+            cache.put_epoch_start(epoch_id, data["poc_start_block_height"])
+    return data
+
+
+def fetch_block_times(heights: List[int], workers: int = MAX_WORKERS,
+                      cache: Optional[ChainCache] = None, refresh: bool = False,
+                      header_only: bool = True) -> Dict[int, datetime]:
+    """
+    Get timestamps for many block heights.
+
+    Cached heights are not requested. The rest are resolved with one
+    header-only /blockchain request per height (header_only=True) or one
+    /block per height; heights missing from a /blockchain answer fall back
+    to /block.
+    """
+    time_strs = {}
+    if cache is not None and not refresh:
+        for height in heights:
+            time_str = cache.get_block_time(height)
+            if time_str is not None:
+                time_strs[height] = time_str
+
+    cached = set(time_strs)
+    missing = [h for h in heights if h not in cached]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        if header_only and missing:
+            for height, time_str in zip(missing, executor.map(get_block_header_time, missing)):
+                if time_str is not None:
+                    time_strs[height] = time_str
+            missing = [h for h in missing if h not in time_strs]
+        for height, time_str in zip(missing, executor.map(get_block_time_str, missing)):
+            if time_str is not None:
+                time_strs[height] = time_str
+
+    timestamps = {}
+    for height, time_str in time_strs.items():
+        if cache is not None and height not in cached:
+            cache.put_block_time(height, time_str)
+        try:
+            timestamps[height] = parse_block_time(time_str)
+        except ValueError as e:
+            print(f"Error parsing block {height} timestamp: {e}")
+    return timestamps
+
+
 def format_datetime(dt: datetime) -> str:
     """Format datetime as YYYY-MM-DD HH:MM."""
     return dt.strftime("%Y-%m-%d %H:%M")
@@ -115,7 +230,9 @@ def format_duration(start: datetime, end: datetime) -> str:
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
 
-def process_epochs(amount_epoch: int) -> List[Dict]:
+def process_epochs(amount_epoch: int, workers: int = MAX_WORKERS,
+                   cache: Optional[ChainCache] = None, refresh: bool = False,
+                   header_only: bool = True) -> List[Dict]:
     """Process the last N epochs and return their data."""
     current_epoch = get_current_epoch()
     
@@ -127,20 +244,23 @@ def process_epochs(amount_epoch: int) -> List[Dict]:
     
     epochs_data = []
     
-    # Get start blocks and timestamps for all epochs in range
+    # Get start blocks and timestamps for all epochs in range concurrently
+    epoch_ids = list(range(first_epoch, last_epoch + 1))
+    configure_pool(workers)
+    print(f"Fetching data for {len(epoch_ids)} epochs with {workers} workers...")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        start_blocks = executor.map(
+            lambda epoch_id: fetch_epoch_start(epoch_id, cache, epoch_id < current_epoch, refresh),
+            epoch_ids
+        )
+    start_blocks = {e: h for e, h in zip(epoch_ids, start_blocks) if h is not None}
+    block_times = fetch_block_times(list(start_blocks.values()), workers, cache, refresh, header_only)
+    
     epoch_timestamps = {}
-    for epoch_id in range(first_epoch, last_epoch + 1):
-        print(f"Fetching data for epoch {epoch_id}...")
-        block_height = get_epoch_start_block(epoch_id)
-        if block_height is None:
-            continue
-        
-        timestamp = get_block_timestamp(block_height)
-        if timestamp is None:
-            continue
-        
-        epoch_timestamps[epoch_id] = timestamp
-        print(f"  Epoch {epoch_id}: block {block_height}, timestamp {timestamp}")
+    for epoch_id, block_height in start_blocks.items():
+        if block_height in block_times:
+            epoch_timestamps[epoch_id] = block_times[block_height]
+            print(f"  Epoch {epoch_id}: block {block_height}, timestamp {block_times[block_height]}")
     
     # Build the data list
     for epoch_id in range(first_epoch, last_epoch + 1):
@@ -195,18 +315,199 @@ def write_csv(data: List[Dict], first_epoch: int, last_epoch: int):
     print(f"Total epochs processed: {len(data)}")
 
 
+# --- Participant weight history (--weights) ---
+
+MISSING = -1  # weight of a node that is not an active participant of the epoch
+UNKNOWN = 0  # status code: epoch payload could not be loaded
+ABSENT = 1  # status code: epoch loaded, node not in the participant list
+
+
+def read_nodes(path: str) -> List[Tuple[str, str]]:
+    """Read (participant address, label) pairs; the label defaults to the address."""
+    nodes = []
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            nodes.append((parts[0], parts[1] if len(parts) > 1 else parts[0]))
+    return nodes
+
+
+class WeightHistory:
+    """
+    Weights and statuses of selected nodes across a range of epochs.
+
+    Columnar: every node has one array('q') of weights and one array('B')
+    of status codes, both aligned with `epochs`. Status codes index
+    `status_names` ("unknown", "missed", then participant statuses as seen).
+    """
+
+    def __init__(self, epochs: List[int], nodes: List[str]):
+        self.epochs = list(epochs)
+        self.nodes = list(nodes)
+        self.status_names = ["unknown", "missed"]
+        self._status_codes = {}
+        self.weights = {node: array("q", [MISSING] * len(self.epochs)) for node in self.nodes}
+        self.statuses = {node: array("B", [UNKNOWN] * len(self.epochs)) for node in self.nodes}
+
+    def _status_code(self, name: str) -> int:
+        code = self._status_codes.get(name)
+        if code is None:
+            code = self._status_codes[name] = len(self.status_names)
+            self.status_names.append(name)
+        return code
+
+    def add_epoch(self, position: int, participants: List[Dict]):
+        """Fill column `position` from an epoch's participant list."""
+        by_address = {p.get("index"): p for p in participants}
+        for node in self.nodes:
+            participant = by_address.get(node)
+            if participant is None:
+                self.statuses[node][position] = ABSENT
+                continue
+            self.weights[node][position] = int(participant.get("weight") or 0)
+            self.statuses[node][position] = self._status_code(str(participant.get("status") or "active"))
+
+    def status(self, node: str, position: int) -> str:
+        return self.status_names[self.statuses[node][position]]
+
+    def deltas(self, node: str) -> List[Optional[int]]:
+        """Epoch-over-epoch weight change; None if this or the previous epoch has no weight."""
+        weights = self.weights[node]
+        result = [None]
+        for previous, current in zip(weights, weights[1:]):
+            result.append(current - previous if MISSING not in (previous, current) else None)
+        return result
+
+    def missed(self, node: str) -> int:
+        """Loaded epochs in which the node was not an active participant."""
+        return self.statuses[node].count(ABSENT)
+
+    def summary(self, node: str) -> Dict:
+        present = [w for w in self.weights[node] if w != MISSING]
+        deltas = [d for d in self.deltas(node) if d is not None]
+        first = present[0] if present else None
+        last = present[-1] if present else None
+        change = last - first if present else None
+        return {
+            "epochs": len(present),
+            "missed": self.missed(node),
+            "first_weight": first,
+            "last_weight": last,
+            "change": change,
+            "change_pct": round(100.0 * change / first, 1) if first else None,
+            "max_drop": min(min(deltas), 0) if deltas else None,
+        }
+
+
+def process_weights(amount_epoch: int, nodes: List[Tuple[str, str]], workers: int = MAX_WORKERS,
+                    cache: Optional[ChainCache] = None, refresh: bool = False):
+    """Fetch participant payloads of the last N epochs and build a WeightHistory."""
+    current_epoch = get_current_epoch()
+    first_epoch = max(1, current_epoch - amount_epoch + 1)
+    epoch_ids = list(range(first_epoch, current_epoch + 1))
+    print(f"Processing participant weights of {len(nodes)} nodes, epochs {first_epoch} to {current_epoch}")
+
+    configure_pool(workers)
+    history = WeightHistory(epoch_ids, [address for address, _ in nodes])
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        payloads = executor.map(
+            lambda epoch_id: fetch_epoch_payload(epoch_id, cache, epoch_id < current_epoch, refresh),
+            epoch_ids
+        )
+        # Columns are filled as payloads arrive, the raw lists are not kept
+        loaded = 0
+        for position, data in enumerate(payloads):
+            if data is not None:
+                history.add_epoch(position, data.get("participants") or [])
+                loaded += 1
+    print(f"Loaded {loaded} of {len(epoch_ids)} epochs")
+    return history, first_epoch, current_epoch
+
+
+def write_weights_csv(history: WeightHistory, labels: Dict[str, str], first_epoch: int, last_epoch: int):
+    """Write the per-epoch series and the per-node summary as two CSV files."""
+    series_file = f"weights_{first_epoch}-{last_epoch}.csv"
+    with open(series_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['epoch', 'node', 'address', 'weight', 'delta', 'status'])
+        for node in history.nodes:
+            weights = history.weights[node]
+            for position, (epoch_id, delta) in enumerate(zip(history.epochs, history.deltas(node))):
+                weight = weights[position]
+                writer.writerow([epoch_id, labels[node], node, "" if weight == MISSING else weight,
+                                 "" if delta is None else delta, history.status(node, position)])
+
+    summary_fields = ['epochs', 'missed', 'first_weight', 'last_weight', 'change', 'change_pct', 'max_drop']
+    summary_file = f"weights_summary_{first_epoch}-{last_epoch}.csv"
+    summaries = {node: history.summary(node) for node in history.nodes}
+    with open(summary_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['node', 'address'] + summary_fields)
+        for node in history.nodes:
+            writer.writerow([labels[node], node] + ["" if summaries[node][f] is None else summaries[node][f]
+                                                    for f in summary_fields])
+
+    # Largest relative losses first: the hosts worth looking at
+    worst = sorted((n for n in history.nodes if summaries[n]["change_pct"] is not None),
+                   key=lambda n: summaries[n]["change_pct"])[:10]
+    if worst:
+        print("\nLargest weight changes:")
+        for node in worst:
+            item = summaries[node]
+            print(f"  {labels[node]}: {item['first_weight']} -> {item['last_weight']} "
+                  f"({item['change_pct']:+.1f}%), missed {item['missed']}")
+    print(f"\nData written to {series_file} and {summary_file}")
+
+
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Fetch Gonka.ai epoch start/end times into a CSV report.")
+    parser.add_argument("-n", "--amount", type=int, default=AMOUNT_EPOCH,
+                        help=f"number of recent epochs to process (default: {AMOUNT_EPOCH})")
+    parser.add_argument("-j", "--workers", type=int, default=MAX_WORKERS,
+                        help=f"concurrent epoch fetches (default: {MAX_WORKERS})")
+    parser.add_argument("--weights", metavar="NODES_FILE",
+                        help="build the weight history of the participant addresses in NODES_FILE "
+                             "(lines 'ADDRESS [LABEL]') instead of the epoch time report")
+    parser.add_argument("--full-blocks", action="store_true",
+                        help="read block times via /block instead of header-only /blockchain")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ignore cached epochs/blocks and refetch them (cache is rewritten)")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the on-disk cache")
+    parser.add_argument("--cache-path", help="cache file (default: $GONKA_CACHE_DIR or ~/.cache/gonka)")
+    parser.add_argument("--cache-max-age", type=float, metavar="DAYS",
+                        help="drop cache entries fetched more than DAYS ago")
+    parser.add_argument("--cache-max-rows", type=int, metavar="N",
+                        help="keep at most N newest entries per cache table")
+    args = parser.parse_args()
+
     print("Gonka.ai Epoch Data Fetcher")
     print("=" * 40)
     
+    cache = None
     try:
-        data, first_epoch, last_epoch = process_epochs(AMOUNT_EPOCH)
-        write_csv(data, first_epoch, last_epoch)
+        if not args.no_cache:
+            cache = ChainCache(args.cache_path)
+            if args.cache_max_age is not None or args.cache_max_rows is not None:
+                cache.prune(args.cache_max_age, args.cache_max_rows)
+        if args.weights:
+            nodes = read_nodes(args.weights)
+            history, first_epoch, last_epoch = process_weights(args.amount, nodes, args.workers, cache,
+                                                               args.refresh)
+            write_weights_csv(history, dict(nodes), first_epoch, last_epoch)
+        else:
+            data, first_epoch, last_epoch = process_epochs(args.amount, args.workers, cache, args.refresh,
+                                                        not args.full_blocks)
+            write_csv(data, first_epoch, last_epoch)
         print("\nDone!")
     except Exception as e:
         print(f"Error: {e}")
         return 1
+    finally:
+        if cache is not None:
+            cache.close()
     
     return 0
 
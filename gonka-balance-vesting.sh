@@ -16,8 +16,14 @@ fi
 
 INPUT_FILE="$1"
 OUTPUT_FILE="${2:-}"
-NODE="http://net2.gonka.top:8000"
+# Лучшая нода из gonka_nodes.txt, при ошибке - net2
+NODE=$(python3 "$(dirname "$0")/node_pool.py" --best 2>/dev/null || echo "http://net2.gonka.top:8000")
 DENOM="ngonka"
+# GONKA_HEIGHT=<блок>: все запросы на одной высоте (заголовок x-cosmos-block-height)
+HEIGHT_HEADER=()
+if [ -n "${GONKA_HEIGHT:-}" ]; then
+    HEIGHT_HEADER=(-H "x-cosmos-block-height: $GONKA_HEIGHT")
+fi
 
 # Проверка существования файла
 if [ ! -f "$INPUT_FILE" ]; then
@@ -30,11 +36,11 @@ get_balance() {
     local address=$1
     
     # Получаем spendable balance
-    local spendable=$(curl -s "$NODE/chain-api/cosmos/bank/v1beta1/balances/$address" 2>/dev/null | \
+    local spendable=$(curl -s "${HEIGHT_HEADER[@]}" "$NODE/chain-api/cosmos/bank/v1beta1/balances/$address" 2>/dev/null | \
         jq -r ".balances[]? | select(.denom==\"$DENOM\") | .amount" 2>/dev/null)
     
     # Получаем vesting balance
-    local vesting=$(curl -s "$NODE/chain-api/productscience/inference/streamvesting/total_vesting/$address" 2>/dev/null | \
+    local vesting=$(curl -s "${HEIGHT_HEADER[@]}" "$NODE/chain-api/productscience/inference/streamvesting/total_vesting/$address" 2>/dev/null | \
         jq -r ".total_amount[]? | select(.denom==\"$DENOM\") | .amount" 2>/dev/null)
     
     # Если пустые, устанавливаем 0
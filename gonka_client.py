@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+"""
+Клиент запросов к ноде Gonka без запуска inferenced.
+
+Ходит напрямую в REST (/chain-api) и RPC (/chain-rpc) ноды через одну
+keep-alive сессию с пулом соединений и возвращает типизированные результаты.
+Используется в check_collateral.py, get_balances.py и mass_test_status.py.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import requests
+
+import query_cache
+from node_pool import NodePool, HEIGHT_HEADER
+
+# Константы
+DEFAULT_NODE_URL = "http://node1.gonka.ai:8000"
+DENOM = "ngonka"
+NGONKA_PER_GONKA = 1_000_000_000
+
+# REST-пути модулей
+BANK_BALANCES_PATH = "/cosmos/bank/v1beta1/balances/{address}"
+COLLATERAL_PATH = "/productscience/inference/collateral/collateral/{address}"
+TOTAL_VESTING_PATH = "/productscience/inference/streamvesting/total_vesting/{address}"
+DELEGATOR_VALIDATORS_PATH = "/cosmos/staking/v1beta1/delegators/{address}/validators"
+VALIDATORS_PATH = "/cosmos/staking/v1beta1/validators"
+PROPOSAL_VOTES_PATH = "/cosmos/gov/v1/proposals/{proposal_id}/votes"
+ACCOUNT_PATH = "/cosmos/auth/v1beta1/accounts/{address}"
+TX_PATH = "/cosmos/tx/v1beta1/txs/{txhash}"
+TX_SEARCH_PATH = "/cosmos/tx/v1beta1/txs"
+EPOCH_PARTICIPANTS_PATH = "/v1/epochs/{epoch}/participants"
+BROADCAST_PATH = "/cosmos/tx/v1beta1/txs"
+
+LATEST = "latest"
+
+
+class ChainQueryError(Exception):
+    """
+    Ошибка запроса к ноде: сеть, HTTP-статус или неожиданный ответ
+
+    status - HTTP-статус ответа, если нода ответила
+    """
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class ChainTimeoutError(ChainQueryError):
+    """Нода не ответила за отведенное время"""
+
+
+@dataclass
+class Coin:
+    denom: str
+    amount: int
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(denom=data["denom"], amount=int(data["amount"]))
+
+
+@dataclass
+class ValidatorInfo:
+    operator_address: str
+    jailed: bool
+    status: str
+    moniker: str = ""
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            operator_address=data.get("operator_address", ""),
+            jailed=bool(data.get("jailed", False)),
+            status=data.get("status", ""),
+            moniker=data.get("description", {}).get("moniker", ""),
+        )
+
+
+@dataclass
+class AccountInfo:
+    address: str
+    account_number: int
+    sequence: int
+
+    @classmethod
+    def from_json(cls, data):
+        # У vesting-аккаунтов поля лежат в base_vesting_account.base_account
+        while "account_number" not in data:
+            nested = data.get("base_account") or data.get("base_vesting_account")
+            if nested is None:
+                raise KeyError("account_number")
+            data = nested
+        return cls(
+            address=data.get("address", ""),
+            account_number=int(data["account_number"]),
+            sequence=int(data.get("sequence", 0)),
+        )
+
+
+@dataclass
+class TxResult:
+    code: int
+    log: str = ""
+    codespace: str = ""
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(code=int(data.get("code") or 0), log=data.get("log") or "", codespace=data.get("codespace") or "")
+
+
+@dataclass
+class TxInfo:
+    txhash: str
+    height: int
+    code: int
+    raw_log: str
+    messages: list
+
+    @classmethod
+    def from_json(cls, tx, tx_response):
+        return cls(
+            txhash=tx_response.get("txhash", "").upper(),
+            height=int(tx_response.get("height") or 0),
+            code=int(tx_response.get("code") or 0),
+            raw_log=tx_response.get("raw_log") or "",
+            messages=(tx or {}).get("body", {}).get("messages") or [],
+        )
+
+    def transfers(self):
+        """
+        Переводы из MsgSend и MsgMultiSend
+
+        Returns:
+            список (получатель, сумма_в_ngonka) по всем сообщениям
+        """
+        result = []
+        for msg in self.messages:
+            msg_type = msg.get("@type", "")
+            if msg_type.endswith("MsgSend"):
+                outputs = [msg]
+                address_key = "to_address"
+            elif msg_type.endswith("MsgMultiSend"):
+                outputs = msg.get("outputs") or []
+                address_key = "address"
+            else:
+                continue
+            for output in outputs:
+                amount = sum(int(c["amount"]) for c in output.get("amount", []) if c.get("denom") == DENOM)
+                result.append((output.get(address_key, ""), amount))
+        return result
+
+
+@dataclass
+class Transfer:
+    """Перевод bank из события transfer транзакции"""
+    height: int
+    txhash: str
+    sender: str
+    recipient: str
+    amount: int  # ngonka
+
+
+_COIN_RE = re.compile(r"^(\d+)([a-zA-Z][a-zA-Z0-9/:._-]*)$")
+
+
+def parse_coins_amount(value, denom=DENOM):
+    """
+    Сумма монеты denom из строки вида "100ngonka,5ibc/..."
+
+    >>> parse_coins_amount("1500ngonka")
+    1500
+    >>> parse_coins_amount("7uatom,20ngonka")
+    20
+    """
+    total = 0
+    for part in (value or "").split(","):
+        match = _COIN_RE.match(part.strip())
+        if match and match.group(2) == denom:
+            total += int(match.group(1))
+    return total
+
+
+def _event_attributes(event):
+    """Атрибуты события как dict; CometBFT до 0.38 кодирует их в base64"""
+    attributes = {}
+    for attr in event.get("attributes") or []:
+        key, value = attr.get("key") or "", attr.get("value") or ""
+        if key and not key.replace("_", "").isalnum():
+            try:
+                key = base64.b64decode(key).decode()
+                value = base64.b64decode(value).decode()
+            except (ValueError, UnicodeDecodeError):
+                continue
+        attributes[key] = value
+    return attributes
+
+
+def transfers_from_events(events, height, txhash):
+    """Переводы ngonka из событий transfer одной транзакции"""
+    result = []
+    for event in events or []:
+        if event.get("type") != "transfer":
+            continue
+        attributes = _event_attributes(event)
+        amount = parse_coins_amount(attributes.get("amount"))
+        if amount:
+            result.append(Transfer(height, txhash, attributes.get("sender", ""),
+                                   attributes.get("recipient", ""), amount))
+    return result
+
+
+_BLOCK_TIME_RE = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d+))?(Z|[+-]\d\d:\d\d)?$"
+)
+
+
+def parse_block_time(time_str):
+    """
+    Разбор времени из заголовка блока CometBFT
+
+    Наносекунды обрезаются до микросекунд. Без суффикса зоны возвращается
+    наивный datetime, как и раньше в get_epochs.py.
+
+    >>> parse_block_time("2025-11-24T03:42:11.812952356Z")
+    datetime.datetime(2025, 11, 24, 3, 42, 11, 812952, tzinfo=datetime.timezone.utc)
+    >>> parse_block_time("2025-11-14T14:31:23.9+00:00").microsecond
+    900000
+    >>> parse_block_time("2025-11-14T14:31:23-05:00").utcoffset()
+    datetime.timedelta(days=-1, seconds=68400)
+    >>> parse_block_time("2025-11-14T14:31:23")
+    datetime.datetime(2025, 11, 14, 14, 31, 23)
+    """
+    match = _BLOCK_TIME_RE.match(time_str)
+    if not match:
+        raise ValueError(f"неверный формат времени блока: {time_str!r}")
+    year, month, day, hour, minute, second, fraction, zone = match.groups()
+
+    tzinfo = None
+    if zone == "Z":
+        tzinfo = timezone.utc
+    elif zone:
+        offset = timedelta(hours=int(zone[1:3]), minutes=int(zone[4:6]))
+        tzinfo = timezone(-offset if zone[0] == "-" else offset)
+
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second),
+        int((fraction or "")[:6].ljust(6, "0")), tzinfo,
+    )
+
+
+def parse_height(value):
+    """
+    Значение --height: номер блока или "latest" (последний блок на момент запуска)
+
+    >>> parse_height("1250000")
+    1250000
+    >>> parse_height("latest")
+    'latest'
+    """
+    if value == LATEST:
+        return value
+    try:
+        height = int(value)
+    except ValueError:
+        raise ValueError(f"высота должна быть числом или {LATEST}: {value!r}") from None
+    if height <= 0:
+        raise ValueError(f"высота должна быть положительной: {value!r}")
+    return height
+
+
+def height_requested(argv):
+    """
+    Значение --height H из argv (для скриптов без argparse) или None
+
+    Флаг и значение удаляются из argv, как в cli_fallback_requested.
+    """
+    if "--height" not in argv:
+        return None
+    i = argv.index("--height")
+    if i + 1 >= len(argv):
+        raise ValueError("--height требует значение")
+    value = argv[i + 1]
+    del argv[i:i + 2]
+    return parse_height(value)
+
+
+def cli_fallback_env():
+    """Старый режим через inferenced включен переменной окружения GONKA_USE_CLI=1"""
+    return os.environ.get("GONKA_USE_CLI", "") not in ("", "0")
+
+
+def cli_fallback_requested(argv):
+    """
+    Проверяет, запрошен ли старый режим через inferenced.
+
+    Флаг --cli удаляется из argv, чтобы не мешать позиционным аргументам.
+    Также включается переменной окружения GONKA_USE_CLI=1.
+    """
+    requested = cli_fallback_env()
+    if "--cli" in argv:
+        argv.remove("--cli")
+        requested = True
+    return requested
+
+
+class GonkaClient:
+    """
+    Клиент к ноде Gonka или пулу нод.
+
+    Запросы идут через NodePool с одной keep-alive сессией, поэтому объект
+    стоит создавать один раз на весь прогон скрипта. Объект потокобезопасен;
+    max_per_host ограничивает число одновременных запросов к одному хосту
+    при вызовах из пула потоков, rate - начальную частоту запросов к ноде
+    (дальше она подстраивается, см. NodePool).
+
+    GET-запросы идут через общий кеш процесса (query_cache.shared(), TTL по
+    эндпоинту, одинаковые одновременные запросы объединяются); атрибут
+    query_cache = None отключает его для этого клиента.
+
+    После pin_height() все запросы REST читают состояние на одной высоте,
+    а ответы запросов по адресу сохраняются в ChainCache и при повторе
+    на той же высоте берутся из него без обращения к ноде.
+    """
+
+    def __init__(self, node_url=DEFAULT_NODE_URL, timeout=10, pool_size=20, max_per_host=None, pool=None,
+                 rate=None, max_rate=None):
+        if pool is None:
+            pool = NodePool([node_url], timeout=timeout, pool_size=pool_size, max_per_host=max_per_host,
+                            rate=rate, max_rate=max_rate)
+        self.pool = pool
+        self.query_cache = query_cache.shared()
+        self.height = None
+        self.cache = None
+
+    @classmethod
+    def from_config(cls, default_url=DEFAULT_NODE_URL, timeout=10, pool_size=20, max_per_host=None,
+                    rate=None, max_rate=None):
+        """Клиент к нодам из gonka_nodes.txt, без файла - к одной default_url"""
+        pool = NodePool.from_config(default_url, timeout=timeout, pool_size=pool_size, max_per_host=max_per_host,
+                                    rate=rate, max_rate=max_rate)
+        return cls(pool=pool)
+
+    def pin_height(self, height, cache=None):
+        """
+        Закрепить высоту для всех запросов REST
+
+        Запросы на закрепленной высоте пул отправляет на ноды, дошедшие до
+        нее (см. NodePool.get).
+
+        Args:
+            height: номер блока или "latest" (берется последний блок сейчас)
+            cache: ChainCache для ответов на этой высоте (None - без кеша)
+
+        Returns:
+            закрепленная высота (int)
+        """
+        if height == LATEST:
+            height = self.latest_height()
+        self.height = int(height)
+        self.cache = cache
+        return self.height
+
+    @property
+    def node_url(self):
+        """Адрес лучшей ноды пула"""
+        return self.pool.best_url()
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Транспорт ---
+
+    def _get_json(self, path, params=None, allow_not_found=False, headers=None):
+        if self.query_cache is None:
+            return self._fetch_json(path, params, allow_not_found, headers)
+        return self.query_cache.get(path, lambda: self._fetch_json(path, params, allow_not_found, headers),
+                                    params, headers)
+
+    def _fetch_json(self, path, params=None, allow_not_found=False, headers=None):
+        try:
+            response = self.pool.get(path, params, headers=headers)
+        except requests.Timeout as e:
+            raise ChainTimeoutError(f"{path}: таймаут") from e
+        except requests.RequestException as e:
+            raise ChainQueryError(f"{path}: {e}") from e
+
+        if allow_not_found and response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise ChainQueryError(f"{response.url}: HTTP {response.status_code} {response.text[:200]}",
+                                  response.status_code)
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise ChainQueryError(f"{response.url}: ответ не JSON") from e
+
+        # grpc-gateway может вернуть ошибку с кодом 200 в теле
+        if isinstance(data, dict) and data.get("code") and "message" in data:
+            if allow_not_found and data["code"] == 5:
+                return None
+            raise ChainQueryError(f"{response.url}: code={data['code']} {data['message'][:200]}")
+        return data
+
+    def rest(self, path, params=None, allow_not_found=False):
+        """GET-запрос к REST API (/chain-api), на закрепленной высоте - с заголовком высоты"""
+        headers = {HEIGHT_HEADER: str(self.height)} if self.height is not None else None
+        return self._get_json(f"/chain-api{path}", params, allow_not_found, headers)
+
+    def _address_query(self, query, path, address, allow_not_found=False):
+        """
+        REST-запрос по адресу через кеш закрепленной высоты
+
+        Ключ кеша (query, address, height); без закрепленной высоты или
+        кеша - обычный запрос. Ответ "не найдено" кешируется как None.
+        """
+        cache, height = self.cache, self.height
+        if cache is not None and height is not None:
+            payload = cache.get_query(query, address, height)
+            if payload is not None:
+                return json.loads(payload)
+        data = self.rest(path.format(address=address), allow_not_found=allow_not_found)
+        if cache is not None and height is not None:
+            cache.put_query(query, address, height, json.dumps(data, separators=(",", ":")))
+        return data
+
+    def broadcast_tx(self, tx_bytes, mode="BROADCAST_MODE_SYNC"):
+        """
+        Отправка подписанной транзакции (TxRaw) через REST
+
+        Отправляется один раз на лучшую ноду, без повтора на других.
+
+        Returns:
+            (txhash, TxResult) - результат CheckTx для режима sync
+        """
+        path = f"/chain-api{BROADCAST_PATH}"
+        body = {"tx_bytes": base64.b64encode(tx_bytes).decode(), "mode": mode}
+        try:
+            response = self.pool.post(path, json=body)
+        except requests.Timeout as e:
+            raise ChainTimeoutError(f"{path}: таймаут") from e
+        except requests.RequestException as e:
+            raise ChainQueryError(f"{path}: {e}") from e
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise ChainQueryError(f"{response.url}: HTTP {response.status_code}, ответ не JSON",
+                                  response.status_code) from e
+        if "tx_response" not in data:
+            raise ChainQueryError(f"{response.url}: HTTP {response.status_code} {data.get('message', '')[:200]}",
+                                  response.status_code)
+        tx_response = data["tx_response"]
+        txhash = tx_response.get("txhash") or hashlib.sha256(tx_bytes).hexdigest().upper()
+        return txhash, TxResult(code=int(tx_response.get("code", 0)), log=tx_response.get("raw_log", ""),
+                                codespace=tx_response.get("codespace", ""))
+
+    def rest_paginated(self, path, field, page_limit=200):
+        """Все элементы списка field со всех страниц, по pagination.key"""
+        items = []
+        params = {"pagination.limit": str(page_limit)}
+        while True:
+            data = self.rest(path, params)
+            items.extend(data.get(field) or [])
+            next_key = (data.get("pagination") or {}).get("next_key")
+            if not next_key:
+                return items
+            params = {"pagination.limit": str(page_limit), "pagination.key": next_key}
+
+    def rpc(self, method, params=None):
+        """GET-запрос к CometBFT RPC (/chain-rpc), возвращает поле result"""
+        data = self._get_json(f"/chain-rpc/{method}", params)
+        if "error" in data:
+            raise ChainQueryError(f"{method}: {data['error']}")
+        return data.get("result", {})
+
+    def abci_query(self, path, data=b"", height=None):
+        """
+        Прямой ABCI-запрос через /chain-rpc/abci_query.
+
+        Args:
+            path: gRPC-путь, например "/cosmos.bank.v1beta1.Query/Balance"
+            data: закодированный protobuf-запрос
+            height: высота блока (None - последний)
+
+        Returns:
+            bytes: сырое значение ответа (protobuf)
+        """
+        params = {"path": f'"{path}"', "data": "0x" + data.hex()}
+        if height is not None:
+            params["height"] = str(height)
+        response = self.rpc("abci_query", params).get("response", {})
+        if response.get("code", 0) != 0:
+            raise ChainQueryError(f"abci_query {path}: code={response['code']} {response.get('log', '')}")
+        return base64.b64decode(response.get("value") or "")
+
+    def latest_height(self):
+        """Высота последнего блока по /chain-rpc/status"""
+        status = self.rpc("status")
+        return int(status["sync_info"]["latest_block_height"])
+
+    def get_block_tx_hashes(self, height) -> List[str]:
+        """Хеши транзакций блока в порядке включения (sha256 от tx bytes)"""
+        block = self.rpc("block", {"height": str(height)})
+        txs = block.get("block", {}).get("data", {}).get("txs") or []
+        return [hashlib.sha256(base64.b64decode(tx)).hexdigest().upper() for tx in txs]
+
+    def get_block_results(self, height) -> List[TxResult]:
+        """Результаты исполнения транзакций блока (code, log)"""
+        results = self.rpc("block_results", {"height": str(height)})
+        return [TxResult.from_json(r) for r in results.get("txs_results") or []]
+
+    def get_block_transfers(self, height) -> List[Transfer]:
+        """
+        Все переводы блока: из событий успешных транзакций и из событий
+        самого блока (выплаты модулей вне транзакций, txhash пустой)
+        """
+        hashes = self.get_block_tx_hashes(height)
+        results = self.rpc("block_results", {"height": str(height)})
+        transfers = []
+        for txhash, tx_result in zip(hashes, results.get("txs_results") or []):
+            if int(tx_result.get("code") or 0) == 0:
+                transfers.extend(transfers_from_events(tx_result.get("events"), height, txhash))
+        # CometBFT 0.38 отдает finalize_block_events, более ранние - begin/end_block_events
+        for field in ("finalize_block_events", "begin_block_events", "end_block_events"):
+            transfers.extend(transfers_from_events(results.get(field), height, ""))
+        return transfers
+
+    def get_tx_result(self, txhash):
+        """
+        Результат транзакции по хешу через /chain-rpc/tx
+
+        Returns:
+            (height, TxResult) или None, если транзакция не найдена
+        """
+        try:
+            result = self.rpc("tx", {"hash": "0x" + txhash})
+        except ChainTimeoutError:
+            raise
+        except ChainQueryError as e:
+            if "not found" in str(e):
+                return None
+            raise
+        return int(result["height"]), TxResult.from_json(result.get("tx_result", {}))
+
+    def get_tx(self, txhash) -> Optional[TxInfo]:
+        """Декодированная транзакция через REST, None если не найдена"""
+        data = self.rest(TX_PATH.format(txhash=txhash), allow_not_found=True)
+        if not data or "tx_response" not in data:
+            return None
+        return TxInfo.from_json(data.get("tx"), data["tx_response"])
+
+    def search_txs(self, query, limit=100, max_pages=100):
+        """
+        Поиск транзакций по событиям (tx_search через REST)
+
+        Args:
+            query: условие, например "message.sender='gonka1...' AND tx.height>=100"
+            limit: размер страницы
+
+        Yields:
+            TxInfo по всем страницам результата
+        """
+        for page in range(1, max_pages + 1):
+            params = {"query": query, "page": str(page), "limit": str(limit), "order_by": "ORDER_BY_ASC"}
+            data = self.rest(TX_SEARCH_PATH, params)
+            txs = data.get("txs") or []
+            responses = data.get("tx_responses") or []
+            for tx, tx_response in zip(txs, responses):
+                yield TxInfo.from_json(tx, tx_response)
+            total = int(data.get("total") or 0)
+            if not responses or page * limit >= total:
+                break
+
+    def rpc_tx_search(self, query, page=1, per_page=100):
+        """
+        Одна страница tx_search через RPC (с событиями транзакций)
+
+        Returns:
+            (список txs из ответа, total_count)
+        """
+        result = self.rpc("tx_search", {
+            "query": f'"{query}"', "page": str(page), "per_page": str(per_page), "order_by": '"asc"',
+        })
+        return result.get("txs") or [], int(result.get("total_count") or 0)
+
+    def count_txs(self, query):
+        """Число транзакций, подходящих под условие tx_search"""
+        return self.rpc_tx_search(query, per_page=1)[1]
+
+    def search_transfers(self, query, per_page=100, max_pages=100):
+        """
+        Переводы из событий transfer успешных транзакций, найденных tx_search
+
+        Yields:
+            Transfer по всем страницам результата
+        """
+        for page in range(1, max_pages + 1):
+            txs, total = self.rpc_tx_search(query, page, per_page)
+            for tx in txs:
+                tx_result = tx.get("tx_result") or {}
+                if int(tx_result.get("code") or 0) != 0:
+                    continue
+                yield from transfers_from_events(tx_result.get("events"), int(tx["height"]), tx["hash"].upper())
+            if not txs or page * per_page >= total:
+                break
+
+    # --- Типизированные запросы ---
+
+    def get_balances(self, address) -> List[Coin]:
+        """Все балансы кошелька (bank)"""
+        data = self._address_query("bank_balances", BANK_BALANCES_PATH, address)
+        return [Coin.from_json(c) for c in data.get("balances", [])]
+
+    def get_balance(self, address, denom=DENOM) -> int:
+        """Баланс кошелька в указанной монете (по умолчанию ngonka)"""
+        for coin in self.get_balances(address):
+            if coin.denom == denom:
+                return coin.amount
+        return 0
+
+    def get_account(self, address) -> Optional[AccountInfo]:
+        """Номер аккаунта и sequence по закоммиченному состоянию, None если аккаунта нет"""
+        data = self.rest(ACCOUNT_PATH.format(address=address), allow_not_found=True)
+        if not data or "account" not in data:
+            return None
+        try:
+            return AccountInfo.from_json(data["account"])
+        except (KeyError, ValueError) as e:
+            raise ChainQueryError(f"неожиданный формат аккаунта {address}: {e}") from e
+
+    def get_collateral(self, address) -> Optional[Coin]:
+        """Залог участника или None, если залога нет"""
+        data = self._address_query("collateral", COLLATERAL_PATH, address, allow_not_found=True)
+        if not data or not data.get("amount"):
+            return None
+        return Coin.from_json(data["amount"])
+
+    def get_total_vesting(self, address, denom=DENOM) -> int:
+        """Сумма, еще не выданная streamvesting (0, если записи нет)"""
+        data = self._address_query("total_vesting", TOTAL_VESTING_PATH, address, allow_not_found=True)
+        for coin in (data or {}).get("total_amount") or []:
+            if coin.get("denom") == denom:
+                return int(coin["amount"])
+        return 0
+
+    def get_epoch_participants(self, epoch="current"):
+        """Участники эпохи из API ноды (/v1/epochs), поле active_participants"""
+        data = self._get_json(EPOCH_PARTICIPANTS_PATH.format(epoch=epoch))
+        return data.get("active_participants") or {}
+
+    def get_delegator_validators(self, address) -> List[ValidatorInfo]:
+        """Валидаторы, которым делегирует кошелек"""
+        data = self.rest(DELEGATOR_VALIDATORS_PATH.format(address=address), allow_not_found=True)
+        if not data:
+            return []
+        return [ValidatorInfo.from_json(v) for v in data.get("validators") or []]
+
+    def get_validators(self, page_limit=200) -> List[ValidatorInfo]:
+        """Весь набор валидаторов (все статусы)"""
+        return [ValidatorInfo.from_json(v) for v in self.rest_paginated(VALIDATORS_PATH, "validators", page_limit)]
+
+    def get_proposal_votes(self, proposal_id, page_limit=500):
+        """
+        Все голоса по proposal (gov v1)
+
+        Returns:
+            {адрес голосующего: [варианты, например "VOTE_OPTION_NO"]}
+        """
+        votes = {}
+        path = PROPOSAL_VOTES_PATH.format(proposal_id=proposal_id)
+        for vote in self.rest_paginated(path, "votes", page_limit):
+            votes[vote.get("voter")] = [o.get("option") for o in vote.get("options") or []]
+        return votes
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Экспортер метрик Gonka в формате Prometheus.
+
+Фоновые потоки обновляют значения каждый со своим интервалом и кладут
+их в снимок в памяти; /metrics только отдает последний снимок и никогда
+не ходит в цепочку. Метрики:
+
+    gonka_balance_spendable_ngonka{address}   - баланс bank (как get_balances.py)
+    gonka_balance_vesting_ngonka{address}     - невыданный streamvesting
+    gonka_collateral_ngonka{address}          - залог (как check_collateral.py)
+    gonka_collateral_expected_ngonka{address} - ожидаемый залог из nodes.txt
+    gonka_validator_jailed{address}           - 1 если валидатор в тюрьме (как mass_test_status.py)
+    gonka_validator_bonded{address}           - 1 если статус BOND_STATUS_BONDED
+    gonka_epoch_weight{address}               - вес участника в текущей эпохе
+    gonka_exporter_address_up{collector,address} - 0, если запрос по адресу не удался
+
+Ошибка запроса по одному адресу не останавливает сборщик: остальные
+адреса обновляются, а для этого остаются прошлые значения и address_up=0.
+
+Использование: ./gonka_exporter.py --wallets wallets.txt --nodes nodes.txt [--port 9105]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from gonka_client import GonkaClient, ChainQueryError
+from mass_test_status import build_validator_index
+
+NODE_URL = "http://net2.gonka.top:8000"
+DEFAULT_PORT = 9105
+
+# Имя метрики -> (тип, описание)
+METRICS = {
+    "gonka_balance_spendable_ngonka": ("gauge", "Spendable bank balance, ngonka"),
+    "gonka_balance_vesting_ngonka": ("gauge", "Remaining streamvesting amount, ngonka"),
+    "gonka_collateral_ngonka": ("gauge", "Collateral on chain, ngonka"),
+    "gonka_collateral_expected_ngonka": ("gauge", "Expected collateral from nodes.txt, ngonka"),
+    "gonka_validator_jailed": ("gauge", "1 if the validator is jailed"),
+    "gonka_validator_bonded": ("gauge", "1 if the validator status is BOND_STATUS_BONDED"),
+    "gonka_epoch_weight": ("gauge", "Participant weight in the current epoch"),
+    "gonka_exporter_address_up": ("gauge", "1 if the last query for the address succeeded"),
+    "gonka_exporter_last_success_timestamp": ("gauge", "Unix time of the last successful refresh"),
+    "gonka_exporter_refresh_seconds": ("gauge", "Duration of the last refresh"),
+    "gonka_exporter_refresh_errors_total": ("counter", "Failed refreshes"),
+}
+
+
+def read_addresses(path):
+    """Адреса из файла (первое слово строки), пустые строки и # пропускаются"""
+    with open(path, "r") as f:
+        return [line.split()[0] for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def read_expected_collateral(path):
+    """nodes.txt: адрес ожидаемый_залог"""
+    expected = {}
+    with open(path, "r") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                expected[parts[0]] = int(parts[1])
+    return expected
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Snapshot:
+    """
+    Последние значения всех метрик
+
+    Каждый сборщик целиком заменяет свои значения, поэтому при чтении
+    видны либо старые, либо новые данные сборщика, но не их смесь. Для
+    адресов с address_up=0 сохраняются значения прошлого обновления.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}  # сборщик -> [(метрика, метки, значение)]
+        self._status = {}  # сборщик -> [последний успех, длительность, ошибки]
+
+    def update(self, collector, samples, duration):
+        failed = {labels["address"] for name, labels, value in samples
+                  if name == "gonka_exporter_address_up" and not value}
+        with self._lock:
+            if failed:
+                samples = samples + [
+                    (name, labels, value) for name, labels, value in self._samples.get(collector, [])
+                    if labels.get("address") in failed and name != "gonka_exporter_address_up"
+                ]
+            self._samples[collector] = samples
+            status = self._status.setdefault(collector, [0.0, 0.0, 0])
+            status[0] = time.time()
+            status[1] = duration
+
+    def record_error(self, collector):
+        with self._lock:
+            self._status.setdefault(collector, [0.0, 0.0, 0])[2] += 1
+
+    def render(self):
+        """Текст /metrics в формате Prometheus"""
+        with self._lock:
+            samples = [s for collector in sorted(self._samples) for s in self._samples[collector]]
+            for collector, (last, duration, errors) in sorted(self._status.items()):
+                labels = {"collector": collector}
+                samples.append(("gonka_exporter_last_success_timestamp", labels, last))
+                samples.append(("gonka_exporter_refresh_seconds", labels, duration))
+                samples.append(("gonka_exporter_refresh_errors_total", labels, errors))
+
+        by_metric = {}
+        for name, labels, value in samples:
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines = []
+        for name in METRICS:
+            if name not in by_metric:
+                continue
+            metric_type, help_text = METRICS[name]
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in by_metric[name]:
+                label_str = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_str}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# --- Сборщики: (client, config) -> [(метрика, метки, значение)] ---
+
+def address_up(collector, address, ok):
+    return ("gonka_exporter_address_up", {"collector": collector, "address": address}, int(ok))
+
+
+def per_address(collector, fetch, addresses, workers):
+    """
+    fetch(address) по всем адресам параллельно; ошибка запроса - только у своего адреса
+
+    Returns:
+        ([(адрес, результат fetch)] успешных, [address_up для всех адресов])
+    """
+    def safe_fetch(address):
+        try:
+            return address, fetch(address), None
+        except ChainQueryError as e:
+            return address, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(safe_fetch, addresses))
+    ok, up = [], []
+    for address, value, error in results:
+        if error is not None:
+            print(f"{collector}: {address}: {error}", file=sys.stderr)
+        else:
+            ok.append((address, value))
+        up.append(address_up(collector, address, error is None))
+    return ok, up
+
+
+def collect_balances(client, config):
+    results, samples = per_address(
+        "balances", lambda address: (client.get_balance(address), client.get_total_vesting(address)),
+        config.wallets, config.workers
+    )
+    for address, (spendable, vesting) in results:
+        samples.append(("gonka_balance_spendable_ngonka", {"address": address}, spendable))
+        samples.append(("gonka_balance_vesting_ngonka", {"address": address}, vesting))
+    return samples
+
+
+def collect_collateral(client, config):
+    def fetch(address):
+        coin = client.get_collateral(address)
+        return coin.amount if coin else 0
+
+    results, samples = per_address("collateral", fetch, list(config.expected_collateral), config.workers)
+    for address, amount in results:
+        samples.append(("gonka_collateral_ngonka", {"address": address}, amount))
+        samples.append(("gonka_collateral_expected_ngonka", {"address": address},
+                        config.expected_collateral[address]))
+    return samples
+
+
+def collect_status(client, config):
+    index = build_validator_index(client)
+
+    def fetch(address):
+        # Кошельки, не являющиеся операторами, запрашиваются по одному (как в mass_test_status.py)
+        if address in index:
+            return index[address]
+        validators = client.get_delegator_validators(address)
+        if not validators:
+            return None, None
+        return str(validators[0].jailed).lower(), validators[0].status
+
+    results, samples = per_address("status", fetch, config.wallets, config.workers)
+    for address, (jailed, status) in results:
+        if status is None:
+            continue
+        samples.append(("gonka_validator_jailed", {"address": address}, int(jailed == "true")))
+        samples.append(("gonka_validator_bonded", {"address": address}, int(status == "BOND_STATUS_BONDED")))
+    return samples
+
+
+def collect_weight(client, config):
+    participants = client.get_epoch_participants().get("participants") or []
+    weights = {p.get("index"): int(p.get("weight") or 0) for p in participants}
+    return [("gonka_epoch_weight", {"address": address}, weights.get(address, 0)) for address in config.wallets]
+
+
+def refresh_loop(name, collect, interval, client, config, snapshot, stop):
+    """Обновление метрик сборщика каждые interval секунд до stop"""
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            samples = collect(client, config)
+            snapshot.update(name, samples, time.monotonic() - started)
+        except Exception as e:
+            # Поток сборщика не должен умирать: метрика просто устареет
+            snapshot.record_error(name)
+            print(f"{name}: ошибка обновления: {e}", file=sys.stderr)
+        stop.wait(max(0, interval - (time.monotonic() - started)))
+
+
+def make_handler(snapshot):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = snapshot.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Экспортер метрик Gonka для Prometheus")
+    parser.add_argument("--wallets", help="файл с адресами для балансов, статуса и веса")
+    parser.add_argument("--nodes", help="файл 'адрес ожидаемый_залог' (nodes.txt)")
+    parser.add_argument("--listen", default="0.0.0.0", help="адрес для /metrics")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="порт для /metrics")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("-j", "--workers", type=int, default=8, help="параллельных запросов в сборщике")
+    parser.add_argument("--balance-interval", type=int, default=300, help="сек между обновлениями балансов")
+    parser.add_argument("--collateral-interval", type=int, default=600, help="сек между обновлениями залога")
+    parser.add_argument("--status-interval", type=int, default=600, help="сек между обновлениями статуса")
+    parser.add_argument("--weight-interval", type=int, default=600, help="сек между обновлениями веса")
+    args = parser.parse_args()
+    if not args.wallets and not args.nodes:
+        parser.error("нужен --wallets и/или --nodes")
+
+    try:
+        args.wallets = read_addresses(args.wallets) if args.wallets else []
+        args.expected_collateral = read_expected_collateral(args.nodes) if args.nodes else {}
+    except FileNotFoundError as e:
+        print(f"Ошибка: файл {e.filename} не найден", file=sys.stderr)
+        return 1
+
+    if args.node:
+        client = GonkaClient(args.node, pool_size=args.workers * 2)
+    else:
+        client = GonkaClient.from_config(NODE_URL, pool_size=args.workers * 2)
+
+    collectors = []
+    if args.wallets:
+        collectors += [
+            ("balances", collect_balances, args.balance_interval),
+            ("status", collect_status, args.status_interval),
+            ("weight", collect_weight, args.weight_interval),
+        ]
+    if args.expected_collateral:
+        collectors.append(("collateral", collect_collateral, args.collateral_interval))
+
+    snapshot = Snapshot()
+    stop = threading.Event()
+    for name, collect, interval in collectors:
+        threading.Thread(
+            target=refresh_loop, args=(name, collect, interval, client, args, snapshot, stop),
+            name=name, daemon=True
+        ).start()
+
+    server = ThreadingHTTPServer((args.listen, args.port), make_handler(snapshot))
+    print(f"Метрики: http://{args.listen}:{args.port}/metrics", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Замеры запросов к нодам, запусков inferenced и других медленных операций.
+
+Все HTTP-запросы пула нод (node_pool.py) и запуски внешних команд через
+instrument.run() записываются одной строкой: операция, цель (путь
+без адресов/хешей или команда), нода, байты, результат и длительность.
+Без переменных окружения ничего не пишется и накладных расходов почти нет.
+
+    GONKA_TRACE=1          сводка при выходе (stderr): число, сумма, p50/p95/p99
+    GONKA_TRACE=trace.jsonl  то же плюс каждая операция строкой JSON в файл
+    GONKA_PROFILE=1        cProfile всех потоков, топ функций при выходе
+    GONKA_PROFILE=out.prof   то же плюс статистика в файл (для snakeviz/pstats)
+
+Пример: GONKA_TRACE=/tmp/send.jsonl ./mass_send_gonka.py payouts.txt full2 --pipeline
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import pstats
+import re
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_ENV = "GONKA_TRACE"
+PROFILE_ENV = "GONKA_PROFILE"
+PROFILE_TOP = 25  # строк топа функций в stderr
+
+# Изменяемые части путей заменяются, чтобы запросы группировались по эндпоинту
+_PATH_PATTERNS = [
+    (re.compile(r"gonka(valoper)?1[a-z0-9]{38,}"), "{address}"),
+    (re.compile(r"\b(0x)?[0-9A-Fa-f]{64}\b"), "{hash}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{n}"),
+]
+
+
+def endpoint(path):
+    """
+    Путь запроса без адресов, хешей и номеров
+
+    >>> endpoint("/chain-api/cosmos/bank/v1beta1/balances/gonka1qqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqqq")
+    '/chain-api/cosmos/bank/v1beta1/balances/{address}'
+    >>> endpoint("/v1/epochs/120/participants")
+    '/v1/epochs/{n}/participants'
+    """
+    path = path.split("?", 1)[0]
+    for pattern, replacement in _PATH_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path
+
+
+def command_name(cmd):
+    """Имя команды для сводки: программа и подкоманды без флагов и аргументов-адресов"""
+    words = [os.path.basename(str(cmd[0]))]
+    for arg in cmd[1:4]:
+        arg = str(arg)
+        if arg.startswith("-") or "/" in arg or "." in arg or len(arg) > 24:
+            break
+        words.append(arg)
+    return " ".join(words)
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+    """Накопление записей и запись трассы; потокобезопасен"""
+
+    def __init__(self, trace_path=None):
+        self.trace_path = trace_path
+        self._durations = {}  # (операция, цель) -> [сек]
+        self._errors = {}
+        self._bytes = {}
+        self._lock = threading.Lock()
+        self._trace = open(trace_path, "a") if trace_path else None
+
+    def record(self, op, target, duration, node=None, nbytes=0, outcome="ok"):
+        key = (op, target)
+        line = None
+        if self._trace is not None:
+            line = json.dumps({
+                "ts": round(time.time(), 6), "op": op, "target": target, "node": node,
+                "duration_ms": round(duration * 1000, 3), "bytes": nbytes, "outcome": outcome,
+                "thread": threading.current_thread().name,
+            }) + "\n"
+        with self._lock:
+            self._durations.setdefault(key, []).append(duration)
+            self._bytes[key] = self._bytes.get(key, 0) + nbytes
+            if outcome != "ok":
+                self._errors[key] = self._errors.get(key, 0) + 1
+            if line is not None and self._trace is not None:
+                self._trace.write(line)
+
+    def summary(self):
+        """Таблица по операциям: число, ошибки, сумма и перцентили (мс), байты"""
+        with self._lock:
+            items = sorted(self._durations.items(), key=lambda item: -sum(item[1]))
+            lines = [f"{'Операция':<60} {'N':>6} {'Ошибок':>6} {'Всего, с':>9} "
+                     f"{'p50':>8} {'p95':>8} {'p99':>8} {'КБ':>9}"]
+            for (op, target), durations in items:
+                ordered = sorted(durations)
+                name = f"{op} {target}"
+                if len(name) > 60:
+                    name = name[:57] + "..."
+                lines.append(
+                    f"{name:<60} {len(ordered):>6} {self._errors.get((op, target), 0):>6} {sum(ordered):>9.2f} "
+                    f"{_percentile(ordered, 0.50) * 1000:>8.1f} {_percentile(ordered, 0.95) * 1000:>8.1f} "
+                    f"{_percentile(ordered, 0.99) * 1000:>8.1f} {self._bytes[(op, target)] / 1024:>9.1f}"
+                )
+        return "\n".join(lines)
+
+    def close(self):
+        if self._trace is not None:
+            self._trace.close()
+            self._trace = None
+
+
+_recorder = None
+
+
+def enabled():
+    return _recorder is not None
+
+
+def record(op, target, duration, node=None, nbytes=0, outcome="ok"):
+    """Одна завершенная операция (ничего не делает, если замеры выключены)"""
+    if _recorder is not None:
+        _recorder.record(op, target, duration, node, nbytes, outcome)
+
+
+class Span:
+    """Изменяемые поля операции внутри span(): байты и результат"""
+    __slots__ = ("nbytes", "outcome")
+
+    def __init__(self):
+        self.nbytes = 0
+        self.outcome = "ok"
+
+
+@contextmanager
+def span(op, target, node=None):
+    """
+    Замер блока кода; исключение записывается как outcome=имя класса
+
+        with span("keyring", name) as s:
+            ...
+            s.nbytes = len(data)
+    """
+    s = Span()
+    if _recorder is None:
+        yield s
+        return
+    started = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.outcome = type(e).__name__
+        raise
+    finally:
+        _recorder.record(op, target, time.perf_counter() - started, node, s.nbytes, s.outcome)
+
+
+def run(cmd, node=None, **kwargs):
+    """subprocess.run с замером; node - хост или нода для трассы"""
+    if _recorder is None:
+        return subprocess.run(cmd, **kwargs)
+    with span("exec", command_name(cmd), node) as s:
+        result = subprocess.run(cmd, **kwargs)
+        s.nbytes = len(result.stdout or "") + len(result.stderr or "")
+        if result.returncode != 0:
+            s.outcome = f"rc={result.returncode}"
+    return result
+
+
+# --- Профилирование ---
+
+_profiles = []
+_profiles_lock = threading.Lock()
+
+
+def _start_thread_profile(*_):
+    """threading.setprofile: в каждом новом потоке включается свой cProfile"""
+    profile = cProfile.Profile()
+    with _profiles_lock:
+        _profiles.append(profile)
+    profile.enable()
+
+
+def _dump_profile(path):
+    for profile in _profiles:
+        profile.disable()
+    stats = None
+    for profile in _profiles:
+        try:
+            if stats is None:
+                stats = pstats.Stats(profile, stream=sys.stderr)
+            else:
+                stats.add(profile)
+        except TypeError:
+            # Поток не успел выполнить ни одной функции
+            continue
+    if stats is None:
+        return
+    if path:
+        stats.dump_stats(path)
+        print(f"Профиль сохранен: {path}", file=sys.stderr)
+    print("", file=sys.stderr)
+    stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+
+def _setup():
+    global _recorder
+    trace = os.environ.get(TRACE_ENV, "")
+    if trace not in ("", "0"):
+        _recorder = Recorder(None if trace == "1" else trace)
+
+        def report():
+            print("", file=sys.stderr)
+            print(_recorder.summary(), file=sys.stderr)
+            _recorder.close()
+
+        atexit.register(report)
+
+    profile = os.environ.get(PROFILE_ENV, "")
+    if profile not in ("", "0"):
+        threading.setprofile(_start_thread_profile)
+        _start_thread_profile()
+        atexit.register(_dump_profile, None if profile == "1" else profile)
+
+
+_setup()
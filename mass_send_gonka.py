@@ -6,6 +6,41 @@ from decimal import Decimal, InvalidOperation
 import getpass
 import json
 import time
+import os
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import instrument
+from gonka_client import GonkaClient, ChainQueryError, ChainTimeoutError
+from node_pool import NodePool
+from ratelimit import AdaptiveRateLimiter, backoff_delay
+
+INFERENCED = '/home/mitch/Crypto/gonka.ai/inferenced'
+CHAIN_ID = 'gonka-mainnet'
+# Нода для inferenced; при запуске заменяется лучшей нодой из gonka_nodes.txt
+NODE = 'http://net2.gonka.top:8000/chain-rpc/'
+KEYRING_BACKEND = 'file'
+DENOM = 'ngonka'
+
+# Газ для пакетной транзакции: база + на каждое сообщение MsgSend.
+# Для одного сообщения получается стандартные 200000.
+BATCH_GAS_BASE = 100000
+BATCH_GAS_PER_MSG = 100000
+
+# Сколько раз переотправлять транзакцию при "account sequence mismatch"
+SEQUENCE_RETRIES = 3
+
+# Отправка с локальным sequence: начальная и предельная частота (tx/сек).
+# Частота падает вдвое при "mempool is full" и таймаутах и растет, пока их нет
+SEND_RATE = 10
+SEND_MAX_RATE = 100
+SEND_RATE_INCREASE = 5  # tx/сек прироста за секунду без ошибок
+# Сколько раз повторять транзакцию, отвергнутую из-за переполненного mempool
+MEMPOOL_RETRIES = 6
+# Код CheckTx для переполненного mempool (cosmos-sdk ErrMempoolIsFull)
+MEMPOOL_FULL_CODE = ('sdk', 20)
 
 def validate_gonka_address(address):
     """Проверка формата адреса Gonka (Cosmos SDK)"""
@@ -31,20 +66,54 @@ def extract_txhash(output):
     try:
         data = json.loads(output)
         if 'txhash' in data:
-            return data['txhash'], data.get('code', 0), data.get('raw_log', '')
+            return data['txhash'], data.get('code', 0), data.get('raw_log', ''), data.get('codespace', '')
     except:
         pass
     
     # Ищем txhash в тексте
     match = re.search(r'txhash:\s*([A-F0-9]{64})', output, re.IGNORECASE)
     if match:
-        return match.group(1), 0, ''
+        return match.group(1), 0, '', ''
     
-    return None, -1, 'не удалось извлечь txhash'
+    return None, -1, 'не удалось извлечь txhash', ''
+
+class SendError(str):
+    """
+    Текст ошибки отправки вместе с кодом ответа ноды
+
+    Ведет себя как обычная строка (выводится в файл результатов), а code и
+    codespace позволяют распознавать ошибку, даже если raw_log ноды пуст
+    или сформулирован иначе.
+    """
+
+    def __new__(cls, text, code=None, codespace=''):
+        error = super().__new__(cls, text)
+        error.code = code
+        error.codespace = codespace
+        return error
+
+def tx_error(code, raw_log, codespace=''):
+    """
+    Ошибка CheckTx: краткий текст из raw_log и код ответа
 
-def send_gonka(address, amount_gonka, sender, password, chain_id='gonka-mainnet', 
-               node='http://net2.gonka.top:8000/chain-rpc/', keyring_backend='file'):
-    """Отправка монет Gonka"""
+    >>> error = tx_error(20, '', 'sdk')
+    >>> error, error.code, error.codespace
+    ('код ошибки 20', 20, 'sdk')
+    >>> tx_error(32, 'account sequence mismatch, expected 5, got 4: incorrect account sequence', 'sdk')
+    'account sequence mismatch, expected 5, got 4'
+    """
+    error_msg = raw_log.split(':')[0] if raw_log else f"код ошибки {code}"
+    return SendError(error_msg[:100], code, codespace)
+
+def send_gonka(address, amount_gonka, sender, password, chain_id=CHAIN_ID, 
+               node=None, keyring_backend=KEYRING_BACKEND,
+               account_number=None, sequence=None):
+    """
+    Отправка монет Gonka
+
+    Если переданы account_number и sequence, inferenced не запрашивает
+    аккаунт у ноды, а транзакция уходит в режиме sync без ожидания блока.
+    """
     
     # Валидация адреса
     if not validate_gonka_address(address):
@@ -58,9 +127,11 @@ def send_gonka(address, amount_gonka, sender, password, chain_id='gonka-mainnet'
     # Конвертация в ngonka
     amount_ngonka = gonka_to_ngonka(amount_decimal)
     
+    node = node or NODE
+
     # Формирование команды
     cmd = [
-        '/home/mitch/Crypto/gonka.ai/inferenced', 'tx', 'bank', 'send',
+        INFERENCED, 'tx', 'bank', 'send',
         sender,
         address,
         f'{amount_ngonka}ngonka',
@@ -68,10 +139,10 @@ def send_gonka(address, amount_gonka, sender, password, chain_id='gonka-mainnet'
         '--keyring-backend', keyring_backend,
         '--node', node,
         '--yes'
-    ]
+    ] + sequence_flags(account_number, sequence)
     
     try:
-        result = subprocess.run(
+        result = instrument.run(
             cmd, 
             input=password + '\n',
             capture_output=True, 
@@ -80,15 +151,13 @@ def send_gonka(address, amount_gonka, sender, password, chain_id='gonka-mainnet'
         )
         
         if result.returncode == 0:
-            txhash, code, raw_log = extract_txhash(result.stdout)
+            txhash, code, raw_log, codespace = extract_txhash(result.stdout)
             
             # Проверяем код ответа из JSON
             if code == 0:
                 return True, None, txhash
             else:
-                # Извлекаем краткое сообщение об ошибке
-                error_msg = raw_log.split(':')[0] if raw_log else f"код ошибки {code}"
-                return False, error_msg[:100], txhash
+                return False, tx_error(code, raw_log, codespace), txhash
         else:
             error_msg = result.stderr.strip().split('\n')[0] if result.stderr else "неизвестная ошибка"
             return False, error_msg[:100], None
@@ -97,20 +166,506 @@ def send_gonka(address, amount_gonka, sender, password, chain_id='gonka-mainnet'
     except Exception as e:
         return False, str(e)[:100], None
 
-def process_file(filename, sender, password, delay=6):
-    """Обработка файла с транзакциями"""
-    success_count = 0
-    fail_count = 0
-    
+def send_gonka_signed(address, amount_gonka, signer, tracker):
+    """Отправка одного перевода с подписью в памяти, проверки как в send_gonka"""
+    if not validate_gonka_address(address):
+        return False, "неверный формат адреса", None
+    amount_decimal, error = validate_amount(str(amount_gonka))
+    if error:
+        return False, error, None
+    transfers = [(address, gonka_to_ngonka(amount_decimal))]
+    return send_with_sequence(
+        lambda number, seq: send_signed(transfers, signer, tracker.client, number, seq, batch_gas(1)),
+        tracker
+    )
+
+def sequence_flags(account_number, sequence):
+    """Флаги inferenced для отправки с заранее известным sequence"""
+    if account_number is None or sequence is None:
+        return []
+    return [
+        '--account-number', str(account_number),
+        '--sequence', str(sequence),
+        '--broadcast-mode', 'sync'
+    ]
+
+def is_sequence_mismatch(error):
+    """Ошибка вида 'account sequence mismatch, expected 12, got 11'"""
+    return bool(error) and 'account sequence mismatch' in error
+
+def is_mempool_full(error):
+    """
+    Нода не приняла транзакцию из-за нагрузки: ее можно отправить еще раз с тем же sequence
+
+    Распознается по коду ответа (sdk 20 - ErrMempoolIsFull, HTTP 429),
+    текст raw_log проверяется только для ошибок без кода.
+
+    >>> is_mempool_full(SendError('код ошибки 20', 20, 'sdk'))
+    True
+    >>> is_mempool_full(SendError('код ошибки 20', 20, 'inference'))
+    False
+    >>> is_mempool_full(SendError('/chain-api/cosmos/tx/v1beta1/txs: HTTP 429', 429, 'http'))
+    True
+    >>> is_mempool_full('mempool is full')
+    True
+    """
+    if not error:
+        return False
+    code = (getattr(error, 'codespace', ''), getattr(error, 'code', None))
+    if code in (MEMPOOL_FULL_CODE, ('http', 429)):
+        return True
+    return 'mempool is full' in error or 'HTTP 429' in error
+
+class SequenceTracker:
+    """
+    Локальный учет account number и sequence отправителя
+
+    Аккаунт запрашивается у ноды один раз, дальше sequence увеличивается
+    локально после каждой принятой в mempool транзакции. Это позволяет
+    отправлять транзакции подряд, не дожидаясь включения каждой в блок.
+    Частоту отправки ограничивает limiter, подстраиваясь под mempool ноды.
+    """
+
+    def __init__(self, client, address):
+        self.client = client
+        self.address = address
+        self.account_number = None
+        self.sequence = None
+        self.limiter = AdaptiveRateLimiter(SEND_RATE, max_rate=SEND_MAX_RATE, increase=SEND_RATE_INCREASE)
+        self.refresh()
+
+    def refresh(self):
+        """Синхронизация с закоммиченным состоянием ноды"""
+        account = self.client.get_account(self.address)
+        if account is None:
+            raise RuntimeError(f"аккаунт {self.address} не найден")
+        self.account_number = account.account_number
+        self.sequence = account.sequence
+
+    def advance(self):
+        self.sequence += 1
+
+    def resync(self, error):
+        """
+        Берем ожидаемый sequence из текста ошибки, иначе спрашиваем ноду
+
+        Если нода не ответила, sequence сбрасывается и запрашивается
+        заново перед следующей отправкой (см. send_with_sequence).
+        """
+        match = re.search(r'expected (\d+)', error or '')
+        if match:
+            self.sequence = int(match.group(1))
+            return
+        try:
+            self.refresh()
+        except ChainQueryError:
+            self.sequence = None
+
+def send_with_sequence(send, tracker, retries=SEQUENCE_RETRIES):
+    """
+    Отправка через send(account_number, sequence) с локальным sequence
+
+    При рассинхронизации sequence повторяет отправку с исправленным номером.
+    Отвергнутая из-за переполненного mempool транзакция повторяется после
+    случайной паузы, частота следующих отправок при этом снижается.
+    Если sequence неизвестен и нода не отвечает на запрос аккаунта,
+    строка получает ошибку, а следующие строки отправляются как обычно.
+
+    >>> from gonka_client import AccountInfo
+    >>> class FlakyClient:
+    ...     down = False
+    ...     def get_account(self, address):
+    ...         if self.down:
+    ...             raise ChainTimeoutError("таймаут")
+    ...         return AccountInfo(address, 7, 3)
+    >>> tracker = SequenceTracker(FlakyClient(), "gonka1test")
+    >>> tracker.client.down = True
+    >>> send_with_sequence(lambda number, seq: (False, "таймаут выполнения", None), tracker)
+    (False, 'таймаут выполнения', None)
+    >>> send_with_sequence(lambda number, seq: (True, None, "AB"), tracker)
+    (False, 'sequence не получен: таймаут', None)
+    >>> tracker.client.down = False
+    >>> send_with_sequence(lambda number, seq: (True, None, f"{number}/{seq}"), tracker)
+    (True, None, '7/3')
+    """
+    attempt = 0
+    mempool_attempt = 0
+    while True:
+        if tracker.sequence is None:
+            try:
+                tracker.refresh()
+            except ChainQueryError as e:
+                return False, f"sequence не получен: {e}"[:100], None
+        tracker.limiter.acquire()
+        success, error, txhash = send(tracker.account_number, tracker.sequence)
+        if success:
+            tracker.limiter.on_success()
+            tracker.advance()
+            return success, error, txhash
+        if is_mempool_full(error) and mempool_attempt < MEMPOOL_RETRIES:
+            tracker.limiter.on_throttle()
+            time.sleep(backoff_delay(mempool_attempt, base=1.0))
+            mempool_attempt += 1
+            continue
+        if is_sequence_mismatch(error) and attempt < retries:
+            tracker.resync(error)
+            attempt += 1
+            continue
+        if error == "таймаут выполнения":
+            # Неизвестно, попала ли транзакция в mempool
+            tracker.limiter.on_throttle()
+            tracker.resync(None)
+        return success, error, txhash
+
+def node_client():
+    """
+    Клиент к той же ноде, куда отправляет inferenced (NODE или --node)
+
+    Иначе sequence может читаться с другой ноды пула и расходиться с mempool
+    ноды, принимающей транзакции.
+    """
+    url = NODE.rstrip('/')
+    if url.endswith('/chain-rpc'):
+        url = url[:-len('/chain-rpc')]
+    return GonkaClient(url)
+
+def make_sequence_tracker(sender, password):
+    """Трекер sequence для ключа sender"""
+    address = get_key_address(sender, password)
+    return SequenceTracker(node_client(), address)
+
+def send_signed(transfers, signer, client, account_number, sequence, gas):
+    """
+    Подпись в памяти (signer.py) и отправка через REST ноды
+
+    Args:
+        transfers: список (адрес, сумма_в_ngonka)
+
+    Returns:
+        (success, error, txhash) - как у send_gonka и send_batch
+    """
+    from signer import msg_send
+
+    messages = [msg_send(signer.address, address, amount_ngonka) for address, amount_ngonka in transfers]
+    try:
+        tx_bytes = signer.sign_tx(messages, CHAIN_ID, account_number, sequence, gas)
+        txhash, result = client.broadcast_tx(tx_bytes)
+    except ChainTimeoutError:
+        return False, "таймаут выполнения", None
+    except ChainQueryError as e:
+        if e.status is not None:
+            return False, SendError(str(e)[:100], e.status, 'http'), None
+        return False, str(e)[:100], None
+
+    if result.code == 0:
+        return True, None, txhash
+    return False, tx_error(result.code, result.log, result.codespace), txhash
+
+def make_signer(sender, password, keyring_dir=None):
+    """Ключ отправителя из file-keyring, расшифровывается один раз"""
+    from signer import Signer
+
+    return Signer.from_keyring(sender, password, keyring_dir)
+
+def select_node():
+    """Лучшая нода пула в формате --node для inferenced"""
+    return NodePool.from_config(NODE).best_url() + '/chain-rpc/'
+
+def run_inferenced(args, password=None, timeout=30):
+    """Запуск inferenced, пароль передается через stdin"""
+    return instrument.run(
+        [INFERENCED] + args,
+        input=(password + '\n') if password is not None else None,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+def get_key_address(sender, password, keyring_backend=KEYRING_BACKEND):
+    """Адрес кошелька отправителя по имени ключа"""
+    result = run_inferenced(
+        ['keys', 'show', sender, '-a', '--keyring-backend', keyring_backend],
+        password
+    )
+    address = result.stdout.strip().split('\n')[-1].strip() if result.stdout else ''
+    if result.returncode != 0 or not validate_gonka_address(address):
+        error = result.stderr.strip().split('\n')[0] if result.stderr else 'неизвестная ошибка'
+        raise RuntimeError(f"не удалось получить адрес {sender}: {error[:100]}")
+    return address
+
+def build_unsigned_tx(from_address, transfers, gas):
+    """
+    Неподписанная транзакция с несколькими MsgSend (формат inferenced tx sign)
+
+    Args:
+        from_address: адрес отправителя
+        transfers: список (адрес, сумма_в_ngonka)
+        gas: лимит газа на всю транзакцию
+    """
+    messages = [
+        {
+            '@type': '/cosmos.bank.v1beta1.MsgSend',
+            'from_address': from_address,
+            'to_address': address,
+            'amount': [{'denom': DENOM, 'amount': str(amount_ngonka)}]
+        }
+        for address, amount_ngonka in transfers
+    ]
+    return {
+        'body': {
+            'messages': messages,
+            'memo': '',
+            'timeout_height': '0',
+            'extension_options': [],
+            'non_critical_extension_options': []
+        },
+        'auth_info': {
+            'signer_infos': [],
+            'fee': {'amount': [], 'gas_limit': str(gas), 'payer': '', 'granter': ''}
+        },
+        'signatures': []
+    }
+
+def batch_gas(count, gas_per_msg=BATCH_GAS_PER_MSG):
+    """Лимит газа для транзакции из count сообщений"""
+    return BATCH_GAS_BASE + gas_per_msg * count
+
+def send_batch(transfers, sender, sender_address, password, gas_per_msg=BATCH_GAS_PER_MSG,
+               chain_id=CHAIN_ID, node=None, keyring_backend=KEYRING_BACKEND,
+               account_number=None, sequence=None):
+    """
+    Отправка нескольких переводов одной транзакцией
+
+    Args:
+        transfers: список (адрес, сумма_в_ngonka)
+        account_number, sequence: если заданы, подпись идет офлайн
+
+    Returns:
+        (success, error, txhash) - общий результат для всех переводов пакета
+    """
+    node = node or NODE
+    unsigned = build_unsigned_tx(sender_address, transfers, batch_gas(len(transfers), gas_per_msg))
+
+    with tempfile.TemporaryDirectory(prefix='gonka_batch_') as tmpdir:
+        unsigned_path = os.path.join(tmpdir, 'unsigned.json')
+        signed_path = os.path.join(tmpdir, 'signed.json')
+        with open(unsigned_path, 'w') as f:
+            json.dump(unsigned, f)
+
+        try:
+            sign_args = [
+                'tx', 'sign', unsigned_path,
+                '--from', sender,
+                '--chain-id', chain_id,
+                '--keyring-backend', keyring_backend,
+                '--node', node,
+                '--output-document', signed_path
+            ]
+            if account_number is not None and sequence is not None:
+                sign_args += ['--offline', '--account-number', str(account_number),
+                              '--sequence', str(sequence)]
+            result = run_inferenced(sign_args, password)
+            if result.returncode != 0:
+                error_msg = result.stderr.strip().split('\n')[0] if result.stderr else "ошибка подписи"
+                return False, error_msg[:100], None
+
+            result = run_inferenced([
+                'tx', 'broadcast', signed_path,
+                '--node', node,
+                '--broadcast-mode', 'sync',
+                '--output', 'json'
+            ])
+        except subprocess.TimeoutExpired:
+            return False, "таймаут выполнения", None
+        except Exception as e:
+            return False, str(e)[:100], None
+
+    if result.returncode != 0:
+        error_msg = result.stderr.strip().split('\n')[0] if result.stderr else "неизвестная ошибка"
+        return False, error_msg[:100], None
+
+    txhash, code, raw_log, codespace = extract_txhash(result.stdout)
+    if code == 0:
+        return True, None, txhash
+    return False, tx_error(code, raw_log, codespace), txhash
+
+def format_result(address, amount_str, success, error, txhash):
+    """Строка результата в формате, который читает verify_transactions_short.sh"""
+    txhash_str = f" txhash: {txhash}" if txhash else ""
+    if success:
+        return f"{address} {amount_str} ok{txhash_str}"
+    return f"{address} {amount_str} Error: {error}{txhash_str}"
+
+def read_lines(filename):
+    """Чтение файла выплат, None при ошибке"""
     try:
         with open(filename, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+            return f.readlines()
     except FileNotFoundError:
         print(f"Файл {filename} не найден")
-        return
     except Exception as e:
         print(f"Ошибка чтения файла: {e}")
-        return
+    return None
+
+def is_payout_line(line):
+    """Строка, на которую печатается результат (не пустая и не комментарий)"""
+    line = line.strip()
+    return bool(line) and not line.startswith('#') and not line.startswith('*')
+
+def print_result(line_num, text):
+    print(text, flush=True)
+
+def prepare_sender(sender, password, signer=None, pipeline=False, client=None):
+    """
+    Адрес отправителя и трекер sequence (если нужен)
+
+    Returns:
+        (адрес, SequenceTracker или None)
+    """
+    sender_address = signer.address if signer else get_key_address(sender, password)
+    tracker = None
+    if pipeline or signer:
+        tracker = SequenceTracker(client or node_client(), sender_address)
+    return sender_address, tracker
+
+class OrderedOutput:
+    """
+    Вывод результатов нескольких отправителей в порядке строк файла
+
+    Строка печатается, как только напечатаны все строки выше нее.
+    """
+
+    def __init__(self, line_nums):
+        self._expected = sorted(line_nums)
+        self._pos = 0
+        self._ready = {}
+        self._lock = threading.Lock()
+
+    def emit(self, line_num, text):
+        with self._lock:
+            self._ready[line_num] = text
+            while self._pos < len(self._expected) and self._expected[self._pos] in self._ready:
+                print(self._ready.pop(self._expected[self._pos]), flush=True)
+                self._pos += 1
+
+    def close(self):
+        """Допечатать то, что осталось (если какой-то поток упал)"""
+        with self._lock:
+            for line_num in sorted(self._ready):
+                print(self._ready[line_num], flush=True)
+            self._ready.clear()
+
+def process_file_batched(filename, sender, password, batch_size, delay=6, gas_per_msg=BATCH_GAS_PER_MSG,
+                         pipeline=False, signer=None, numbered_lines=None, emit=print_result,
+                         sender_address=None, tracker=None):
+    """
+    Обработка файла с транзакциями пакетами по batch_size переводов
+
+    Каждая строка по-прежнему получает свою строку результата (ok txhash: /
+    Error:), у переводов одного пакета txhash общий. Один получатель не
+    попадает в пакет дважды, чтобы проверка по to_address была однозначной.
+    С pipeline=True пакеты отправляются подряд с локальным sequence.
+    С signer (signer.Signer) подпись идет в памяти без inferenced.
+    numbered_lines - готовый список (номер, строка) вместо чтения файла,
+    sender_address и tracker - уже подготовленный отправитель.
+    """
+    if numbered_lines is None:
+        lines = read_lines(filename)
+        if lines is None:
+            return
+        numbered_lines = list(enumerate(lines, 1))
+
+    if sender_address is None:
+        try:
+            sender_address, tracker = prepare_sender(sender, password, signer, pipeline)
+        except Exception as e:
+            print(f"Ошибка: {e}")
+            return
+
+    # Результаты печатаются в порядке строк файла
+    pending = []
+    batch = []
+    first_tx = True
+
+    def flush():
+        nonlocal first_tx
+        if batch:
+            if not first_tx and not pipeline:
+                time.sleep(delay)
+            first_tx = False
+
+            transfers = [(address, amount_ngonka) for _, address, amount_str, amount_ngonka in batch]
+            if signer is not None:
+                gas = batch_gas(len(transfers), gas_per_msg)
+                success, error, txhash = send_with_sequence(
+                    lambda number, seq: send_signed(transfers, signer, tracker.client, number, seq, gas),
+                    tracker
+                )
+            elif tracker is None:
+                success, error, txhash = send_batch(transfers, sender, sender_address, password, gas_per_msg)
+            else:
+                success, error, txhash = send_with_sequence(
+                    lambda number, seq: send_batch(transfers, sender, sender_address, password, gas_per_msg,
+                                                   account_number=number, sequence=seq),
+                    tracker
+                )
+            for line_num, address, amount_str, _ in batch:
+                pending.append((line_num, format_result(address, amount_str, success, error, txhash)))
+            batch.clear()
+
+        for line_num, text in sorted(pending):
+            emit(line_num, text)
+        pending.clear()
+
+    for line_num, line in numbered_lines:
+        line = line.strip()
+
+        # Пропуск пустых строк и комментариев
+        if not is_payout_line(line):
+            continue
+
+        parts = line.split()
+        if len(parts) != 2:
+            pending.append((line_num, f"{line} Error: неверный формат (ожидается: адрес сумма)"))
+            continue
+
+        address, amount_str = parts
+        if not validate_gonka_address(address):
+            pending.append((line_num, format_result(address, amount_str, False, "неверный формат адреса", None)))
+            continue
+        amount_decimal, error = validate_amount(amount_str)
+        if error:
+            pending.append((line_num, format_result(address, amount_str, False, error, None)))
+            continue
+
+        if any(address == queued for _, queued, _, _ in batch):
+            flush()
+        batch.append((line_num, address, amount_str, gonka_to_ngonka(amount_decimal)))
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+
+def process_file(filename, sender, password, delay=6, tracker=None, signer=None, pipeline=None,
+                 numbered_lines=None, emit=print_result):
+    """
+    Обработка файла с транзакциями
+
+    С трекером sequence транзакции отправляются подряд без задержки
+    (если pipeline не задан явно). С signer подпись идет в памяти,
+    трекер при этом обязателен. numbered_lines - готовый список
+    (номер, строка) вместо чтения файла.
+    """
+    if pipeline is None:
+        pipeline = tracker is not None
+    success_count = 0
+    fail_count = 0
+    
+    if numbered_lines is None:
+        lines = read_lines(filename)
+        if lines is None:
+            return
+        numbered_lines = list(enumerate(lines, 1))
     
     #print(f"Отправитель: {sender}")
     #print(f"Задержка между транзакциями: {delay} сек")
@@ -118,59 +673,162 @@ def process_file(filename, sender, password, delay=6):
     
     first_tx = True
     
-    for line_num, line in enumerate(lines, 1):
+    for line_num, line in numbered_lines:
         line = line.strip()
         
         # Пропуск пустых строк и комментариев
-        if not line or line.startswith('#') or line.startswith('*'):
+        if not is_payout_line(line):
             continue
         
         # Парсинг строки
         parts = line.split()
         if len(parts) != 2:
-            print(f"{line} Error: неверный формат (ожидается: адрес сумма)")
+            emit(line_num, f"{line} Error: неверный формат (ожидается: адрес сумма)")
             fail_count += 1
             continue
         
         address, amount_str = parts
         
         # Задержка между транзакциями (кроме первой)
-        if not first_tx:
+        if not first_tx and not pipeline:
             #print(f"Ожидание {delay} сек...")
             time.sleep(delay)
         first_tx = False
         
         # Отправка
-        success, error, txhash = send_gonka(address, amount_str, sender, password)
+        if signer is not None:
+            success, error, txhash = send_gonka_signed(address, amount_str, signer, tracker)
+        elif tracker is None:
+            success, error, txhash = send_gonka(address, amount_str, sender, password)
+        else:
+            success, error, txhash = send_with_sequence(
+                lambda number, seq: send_gonka(address, amount_str, sender, password,
+                                               account_number=number, sequence=seq),
+                tracker
+            )
+        emit(line_num, format_result(address, amount_str, success, error, txhash))
         
         if success:
-            txhash_str = f" txhash: {txhash}" if txhash else ""
-            print(f"{address} {amount_str} ok{txhash_str}")
             success_count += 1
         else:
-            txhash_str = f" txhash: {txhash}" if txhash else ""
-            print(f"{address} {amount_str} Error: {error}{txhash_str}")
             fail_count += 1
     
     #print(f"\nИтого: успешно {success_count}, ошибок {fail_count}")
 
+def process_file_sharded(filename, senders, password, delay=6, batch_size=1, gas_per_msg=BATCH_GAS_PER_MSG,
+                         pipeline=False, signers=None):
+    """
+    Выплаты с нескольких отправителей параллельно
+
+    Строки файла раздаются отправителям по кругу; у каждого отправителя
+    свой аккаунт и свой поток sequence, поэтому конфликтов нет. Результаты
+    печатаются одним логом в порядке строк файла.
+
+    Args:
+        senders: имена ключей отправителей
+        signers: {имя: signer.Signer} для подписи в памяти
+    """
+    lines = read_lines(filename)
+    if lines is None:
+        return
+    signers = signers or {}
+
+    # Все отправители готовятся до первой отправки: ошибка любого - ничего не отправлено
+    client = node_client() if pipeline or signers else None
+    prepared = {}
+    for sender in senders:
+        try:
+            prepared[sender] = prepare_sender(sender, password, signers.get(sender), pipeline, client)
+        except Exception as e:
+            print(f"Ошибка: отправитель {sender}: {e}")
+            return
+
+    numbered = [(n, line) for n, line in enumerate(lines, 1) if is_payout_line(line)]
+    shards = [numbered[i::len(senders)] for i in range(len(senders))]
+    output = OrderedOutput(n for n, _ in numbered)
+
+    def run(sender, shard):
+        sender_address, tracker = prepared[sender]
+        signer = signers.get(sender)
+        if batch_size > 1:
+            process_file_batched(filename, sender, password, batch_size, delay, gas_per_msg, pipeline, signer,
+                                 numbered_lines=shard, emit=output.emit,
+                                 sender_address=sender_address, tracker=tracker)
+        else:
+            process_file(filename, sender, password, delay, tracker, signer, pipeline,
+                         numbered_lines=shard, emit=output.emit)
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(senders)) as executor:
+            for future in [executor.submit(run, sender, shard) for sender, shard in zip(senders, shards)]:
+                future.result()
+    finally:
+        output.close()
+
 if __name__ == '__main__':
-    if len(sys.argv) < 3:
-        print("Использование: python send_gonka.py <файл> <sender> [пароль] [задержка_сек]")
-        print("\nПример:")
-        print("python send_gonka.py transactions.txt full2")
-        print("python send_gonka.py transactions.txt full2 mypass 10")
-        sys.exit(1)
-    
-    filename = sys.argv[1]
-    sender = sys.argv[2]
-    
-    if len(sys.argv) >= 4:
-        password = sys.argv[3]
-    else:
-        password = getpass.getpass(f"Введите пароль для кошелька {sender}: ")
-    
+    parser = argparse.ArgumentParser(
+        description="Массовая отправка GONKA по файлу 'адрес сумма'",
+        epilog="Пример: python send_gonka.py transactions.txt full2 mypass 10 --batch 50"
+    )
+    parser.add_argument('filename', help='файл с транзакциями')
+    parser.add_argument('sender',
+                        help='имя кошелька отправителя; несколько через запятую - строки делятся между ними')
+    parser.add_argument('password', nargs='?', help='пароль keyring (иначе GONKA_KEYRING_PASSWORD или запрос)')
     # Задержка между транзакциями (по умолчанию 10 секунд)
-    delay = int(sys.argv[4]) if len(sys.argv) >= 5 else 10
-    
-    process_file(filename, sender, password, delay)
+    parser.add_argument('delay', nargs='?', type=int, default=10, help='задержка между транзакциями, сек')
+    parser.add_argument('--batch', type=int, default=1,
+                        help='число переводов в одной транзакции (1 - по одной транзакции на строку)')
+    parser.add_argument('--gas-per-msg', type=int, default=BATCH_GAS_PER_MSG,
+                        help='газ на один перевод в пакетной транзакции')
+    parser.add_argument('--node', help='RPC ноды для inferenced, http://host:port/chain-rpc/ (по умолчанию лучшая из gonka_nodes.txt)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='отправлять подряд без задержки, sequence считается локально')
+    parser.add_argument('--signer', choices=['inferenced', 'inprocess'], default='inferenced',
+                        help='inprocess - подпись в памяти без запуска inferenced (нужен cryptography)')
+    parser.add_argument('--keyring-dir', help='каталог file-keyring для --signer inprocess')
+    parser.add_argument('--rate', type=float, default=SEND_RATE,
+                        help='начальная частота отправки с --pipeline, tx/сек (дальше подстраивается под ноду)')
+    parser.add_argument('--max-rate', type=float, default=SEND_MAX_RATE,
+                        help='предельная частота отправки с --pipeline, tx/сек')
+    args = parser.parse_args()
+    SEND_RATE = args.rate
+    SEND_MAX_RATE = args.max_rate
+
+    NODE = args.node or select_node()
+    senders = list(dict.fromkeys(s.strip() for s in args.sender.split(',') if s.strip()))
+    if not senders:
+        parser.error('не задан отправитель')
+    args.sender = senders[0]
+
+    password = args.password or os.environ.get('GONKA_KEYRING_PASSWORD')
+    if password is None:
+        password = getpass.getpass(f"Введите пароль для кошелька {args.sender}: ")
+
+    signers = {}
+    if args.signer == 'inprocess':
+        try:
+            for sender in senders:
+                signers[sender] = make_signer(sender, password, args.keyring_dir)
+        except Exception as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+    signer = signers.get(args.sender)
+
+    if len(senders) > 1:
+        process_file_sharded(args.filename, senders, password, args.delay, args.batch, args.gas_per_msg,
+                             pipeline=args.pipeline, signers=signers)
+    elif args.batch > 1:
+        process_file_batched(args.filename, args.sender, password, args.batch, args.delay, args.gas_per_msg,
+                             pipeline=args.pipeline, signer=signer)
+    else:
+        tracker = None
+        if args.pipeline or signer:
+            try:
+                if signer:
+                    tracker = SequenceTracker(node_client(), signer.address)
+                else:
+                    tracker = make_sequence_tracker(args.sender, password)
+            except Exception as e:
+                print(f"Ошибка: {e}")
+                sys.exit(1)
+        process_file(args.filename, args.sender, password, args.delay, tracker, signer, args.pipeline)
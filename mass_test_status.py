@@ -2,13 +2,19 @@
 import subprocess
 import csv
 import sys
-import yaml
 import re
 import os
 
+import instrument
+from bech32 import convert_prefix, Bech32Error
+from gonka_client import GonkaClient, ChainQueryError, cli_fallback_requested
+
 # Адрес ноды
 NODE_URL = "http://node2.gonka.ai:8000"
 
+# Префикс адресов аккаунтов (оператор валидатора - gonkavaloper1...)
+ACCOUNT_PREFIX = "gonka"
+
 def validate_wallet(wallet):
     """
     Валидация адреса кошелька
@@ -29,11 +35,59 @@ def validate_wallet(wallet):
     
     return True, None
 
-def query_validator_info(wallet):
+def query_validator_info(wallet, client):
     """
-    Запрос информации о валидаторе для кошелька
+    Запрос информации о валидаторе для кошелька через REST ноды
     Возвращает (jailed, status)
     """
+    try:
+        validators = client.get_delegator_validators(wallet)
+    except ChainQueryError as e:
+        print(f"Ошибка при запросе для {wallet}: {e}", file=sys.stderr)
+        return None, None
+
+    if not validators:
+        return None, None
+
+    validator = validators[0]
+    return str(validator.jailed).lower(), validator.status
+
+def build_validator_index(client):
+    """
+    Индекс всего набора валидаторов (флаг --bulk)
+    Возвращает {адрес оператора или аккаунта: (jailed, status)}
+    """
+    validators = client.get_validators()
+    print(f"Загружено валидаторов: {len(validators)}", file=sys.stderr)
+    index = {}
+    for validator in validators:
+        info = (str(validator.jailed).lower(), validator.status)
+        index[validator.operator_address] = info
+        try:
+            index[convert_prefix(validator.operator_address, ACCOUNT_PREFIX)] = info
+        except Bech32Error:
+            print(f"Неверный адрес оператора: {validator.operator_address}", file=sys.stderr)
+    return index
+
+def query_validator_info_bulk(wallet, index, client):
+    """
+    Информация о валидаторе из индекса
+    Кошельки, не являющиеся операторами, запрашиваются по одному,
+    чтобы результат совпадал с обычным режимом
+    Возвращает (jailed, status)
+    """
+    info = index.get(wallet)
+    if info is not None:
+        return info
+    return query_validator_info(wallet, client)
+
+def query_validator_info_cli(wallet):
+    """
+    Запрос информации о валидаторе через inferenced (флаг --cli)
+    Возвращает (jailed, status)
+    """
+    import yaml
+
     try:
         cmd = [
             "./inferenced",
@@ -45,7 +99,7 @@ def query_validator_info(wallet):
             f"{NODE_URL}/chain-rpc/"
         ]
         
-        result = subprocess.run(
+        result = instrument.run(
             cmd,
             capture_output=True,
             text=True,
@@ -91,8 +145,13 @@ def query_validator_info(wallet):
         return None, None
 
 def main():
-    if len(sys.argv) != 2:
-        print("Использование: python script.py <файл_с_кошельками>")
+    use_cli = cli_fallback_requested(sys.argv)
+    bulk = "--bulk" in sys.argv
+    if bulk:
+        sys.argv.remove("--bulk")
+
+    if len(sys.argv) != 2 or (bulk and use_cli):
+        print("Использование: python script.py <файл_с_кошельками> [--cli | --bulk]")
         sys.exit(1)
     
     input_file = sys.argv[1]
@@ -130,6 +189,16 @@ def main():
         if response != 'y':
             sys.exit(1)
     
+    client = None if use_cli else GonkaClient.from_config(NODE_URL, timeout=30)
+
+    # Весь набор валидаторов одним постраничным запросом
+    index = None
+    if bulk:
+        try:
+            index = build_validator_index(client)
+        except ChainQueryError as e:
+            print(f"Не удалось загрузить список валидаторов, запрос по одному: {e}", file=sys.stderr)
+
     # Сбор результатов
     results = []
     
@@ -140,7 +209,12 @@ def main():
     # Запрос данных для каждого валидного кошелька
     for wallet in valid_wallets:
         print(f"Запрос данных для {wallet}...", file=sys.stderr)
-        jailed, status = query_validator_info(wallet)
+        if use_cli:
+            jailed, status = query_validator_info_cli(wallet)
+        elif index is not None:
+            jailed, status = query_validator_info_bulk(wallet, index, client)
+        else:
+            jailed, status = query_validator_info(wallet, client)
         
         # Подготовка данных для записи
         row = [
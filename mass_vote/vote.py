@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Голосование по proposal со всех кошельков из файла (замена vote_automation.sh).
+
+Пароль keyring вводится один раз, ключи расшифровываются в памяти
+(signer.py), голоса подписываются без запуска inferenced и отправляются
+параллельно: у каждого кошелька свой аккаунт, а транзакции unordered,
+как у vote_automation.sh (--unordered), поэтому sequence не мешает.
+Кошельки, уже проголосовавшие по proposal, пропускаются (один запрос
+всех голосов), повторы имен в файле убираются. После отправки включение
+в блок подтверждается, в конце печатается таблица по кошелькам.
+
+Использование: ./vote.py <файл_с_кошельками> <номер_proposal> [--option no]
+"""
+
+import argparse
+import getpass
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from confirm_txs import TxConfirmer  # noqa: E402
+from gonka_client import GonkaClient, ChainQueryError, ChainTimeoutError  # noqa: E402
+from signer import Signer, KeyringError, VOTE_OPTIONS, msg_vote  # noqa: E402
+
+NODE_URL = "http://node1.gonka.ai:8000"
+CHAIN_ID = "gonka-mainnet"
+
+# Как в vote_automation.sh
+VOTE_OPTION = "no"
+VOTE_GAS = 2000000
+TIMEOUT_DURATION = 60  # сек, --timeout-duration для unordered-транзакции
+
+# Цвета для вывода
+GREEN = "\033[0;32m"
+RED = "\033[0;31m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+OK = "ok"
+SKIPPED = "skipped"
+ERROR = "error"
+SENT = "sent"
+
+
+@dataclass
+class WalletVote:
+    name: str
+    signer: Optional[Signer] = None
+    account_number: Optional[int] = None
+    txhash: Optional[str] = None
+    status: str = ""
+    detail: str = ""
+
+    @property
+    def address(self):
+        return self.signer.address if self.signer else ""
+
+    def fail(self, detail):
+        self.status = ERROR
+        self.detail = detail[:100]
+
+
+def read_wallet_names(path):
+    """
+    Имена ключей из файла без повторов
+
+    Returns:
+        (имена в порядке файла, повторяющиеся имена)
+    """
+    names = []
+    duplicates = []
+    with open(path, "r") as f:
+        for line in f:
+            name = line.strip()
+            if not name or name.startswith("#"):
+                continue
+            if name in names:
+                if name not in duplicates:
+                    duplicates.append(name)
+                continue
+            names.append(name)
+    return names, duplicates
+
+
+def unlock_wallets(names, password, keyring_dir=None):
+    """Расшифровка ключей; ошибка одного кошелька не останавливает остальные"""
+    votes = []
+    for name in names:
+        vote = WalletVote(name)
+        try:
+            vote.signer = Signer.from_keyring(name, password, keyring_dir)
+        except (KeyringError, ValueError, KeyError) as e:
+            vote.fail(str(e))
+        votes.append(vote)
+    return votes
+
+
+def skip_already_voted(votes, client, proposal_id):
+    """Отмечает кошельки, чей голос уже есть в proposal"""
+    try:
+        existing = client.get_proposal_votes(proposal_id)
+    except ChainQueryError as e:
+        print(f"{YELLOW}Не удалось получить голоса по proposal, проверка пропущена: {e}{NC}")
+        return
+    for vote in votes:
+        if not vote.status and vote.address in existing:
+            vote.status = SKIPPED
+            vote.detail = "уже проголосовал: " + ", ".join(existing[vote.address])
+
+
+def sign_and_broadcast(vote, client, proposal_id, option, gas, timeout_duration):
+    """Подпись и отправка голоса одного кошелька"""
+    try:
+        account = client.get_account(vote.address)
+        if account is None:
+            vote.fail("аккаунт не найден")
+            return
+        tx_bytes = vote.signer.sign_tx(
+            [msg_vote(proposal_id, vote.address, option)], CHAIN_ID, account.account_number, 0, gas,
+            unordered=True, timeout_unix=time.time() + timeout_duration
+        )
+        vote.txhash, result = client.broadcast_tx(tx_bytes)
+    except ChainTimeoutError:
+        vote.fail("таймаут отправки")
+        return
+    except ChainQueryError as e:
+        vote.fail(str(e))
+        return
+    if result.code != 0:
+        vote.fail(f"code={result.code} {result.log.split(':')[0]}")
+        return
+    vote.status = SENT
+
+
+def confirm_votes(votes, client, start_height, timeout, interval=1.0):
+    """Ожидание включения отправленных голосов в блоки"""
+    confirmer = TxConfirmer(client, start_height)
+    by_hash = {v.txhash: v for v in votes if v.status == SENT}
+    for txhash in by_hash:
+        confirmer.add(txhash)
+
+    deadline = time.monotonic() + timeout
+    while confirmer.pending() and time.monotonic() < deadline:
+        try:
+            for txhash, height, result in confirmer.poll():
+                vote = by_hash[txhash]
+                if result.code == 0:
+                    vote.status = OK
+                    vote.detail = f"блок {height}"
+                else:
+                    vote.fail(f"code={result.code} {result.log.split(':')[0]}")
+        except ChainQueryError as e:
+            print(f"{YELLOW}Ошибка опроса блоков: {e}{NC}", file=sys.stderr)
+        if confirmer.pending():
+            time.sleep(interval)
+
+    for txhash in confirmer.pending():
+        by_hash[txhash].fail("не подтверждена за время ожидания")
+
+
+def print_table(votes):
+    colors = {OK: GREEN, SKIPPED: YELLOW, ERROR: RED}
+    print(f"{'Кошелек':<24} {'Адрес':<46} {'Статус':<8} Подробности")
+    print("-" * 110)
+    for vote in votes:
+        color = colors.get(vote.status, NC)
+        txhash = f" txhash: {vote.txhash}" if vote.txhash else ""
+        print(f"{vote.name:<24} {vote.address:<46} {color}{vote.status:<8}{NC} {vote.detail}{txhash}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Голосование по proposal со всех кошельков из файла")
+    parser.add_argument("wallets_file", help="файл с именами ключей, по одному на строку")
+    parser.add_argument("proposal_id", type=int, help="номер proposal")
+    parser.add_argument("--option", choices=sorted(VOTE_OPTIONS), default=VOTE_OPTION,
+                        help=f"вариант голоса (по умолчанию {VOTE_OPTION}, как в vote_automation.sh)")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("--keyring-dir", help="каталог file-keyring")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="параллельных отправок")
+    parser.add_argument("--gas", type=int, default=VOTE_GAS, help="лимит газа")
+    parser.add_argument("--timeout-duration", type=int, default=TIMEOUT_DURATION,
+                        help="срок жизни unordered-транзакции, сек")
+    parser.add_argument("--confirm-timeout", type=int, default=120, help="сколько ждать включения в блок, сек")
+    args = parser.parse_args()
+
+    try:
+        names, duplicates = read_wallet_names(args.wallets_file)
+    except FileNotFoundError:
+        print(f"{RED}Ошибка: файл {args.wallets_file} не найден{NC}")
+        return 1
+    for name in duplicates:
+        print(f"{YELLOW}Повтор в файле, голос будет один: {name}{NC}")
+
+    password = os.environ.get("GONKA_KEYRING_PASSWORD")
+    if password is None:
+        password = getpass.getpass("Введите пароль для keyring: ")
+
+    client = GonkaClient(args.node, pool_size=args.workers) if args.node \
+        else GonkaClient.from_config(NODE_URL, pool_size=args.workers)
+
+    print(f"{GREEN}=== Начало голосования ==={NC}")
+    print(f"Proposal ID: {args.proposal_id}")
+    print(f"Голос: {args.option}")
+    print(f"Node URL: {client.node_url}")
+    print("")
+
+    votes = unlock_wallets(names, password, args.keyring_dir)
+    skip_already_voted(votes, client, args.proposal_id)
+    to_send = [v for v in votes if not v.status]
+
+    try:
+        start_height = client.latest_height()
+    except ChainQueryError as e:
+        print(f"{RED}Ошибка: не удалось получить высоту блока: {e}{NC}")
+        return 1
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        list(executor.map(
+            lambda v: sign_and_broadcast(v, client, args.proposal_id, args.option, args.gas, args.timeout_duration),
+            to_send
+        ))
+
+    sent = sum(1 for v in to_send if v.status == SENT)
+    print(f"Отправлено: {sent} из {len(to_send)}, ожидание включения в блоки...")
+    confirm_votes(to_send, client, start_height, args.confirm_timeout)
+
+    print("")
+    print_table(votes)
+
+    counts = {status: sum(1 for v in votes if v.status == status) for status in (OK, SKIPPED, ERROR)}
+    print("")
+    print(f"{GREEN}=== Завершено ==={NC}")
+    print(f"Всего кошельков: {len(votes)}")
+    print(f"{GREEN}Успешно: {counts[OK]}{NC}")
+    print(f"{YELLOW}Пропущено: {counts[SKIPPED]}{NC}")
+    print(f"{RED}Ошибок: {counts[ERROR]}{NC}")
+    return 0 if counts[ERROR] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 #!/bin/bash
-export NODE_URL=http://node1.gonka.ai:8000
+# Лучшая нода из gonka_nodes.txt, при ошибке - node1
+export NODE_URL=$(python3 "$(dirname "$0")/../node_pool.py" --best 2>/dev/null || echo http://node1.gonka.ai:8000)
 
 # Цвета для вывода
 GREEN='\033[0;32m'
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Пул нод Gonka с учетом задержек, переключением и хеджированием запросов.
+
+Список нод берется из файла gonka_nodes.txt рядом со скриптами (или из
+файла в переменной окружения GONKA_NODES_FILE): один адрес http://host:port
+на строку, строки с # игнорируются. Пул проверяет ноды через
+/chain-rpc/status, ведет скользящую задержку и долю ошибок каждой ноды и
+отправляет запрос на лучшую. Медленное чтение (GET) дублируется на
+следующую ноду, если ответ не пришел за типичное для ноды время (p95).
+Запросы с телом (POST, отправка транзакций) никогда не дублируются и не
+повторяются на другой ноде. GET, на который все ноды ответили 429/5xx
+или не ответили, повторяется после случайной паузы (до retries раз).
+GET на закрепленной высоте (заголовок x-cosmos-block-height) идет сначала
+на ноды, дошедшие до этой высоты; ответ отстающей ноды "height in the
+future" повторяется на другой ноде, как 429/5xx.
+С rate у каждой ноды свой AdaptiveRateLimiter: частота запросов к ноде
+падает при 429/5xx и таймаутах и растет, пока нода отвечает нормально.
+
+Использование из shell: NODE_URL=$(./node_pool.py --best)
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrument
+from ratelimit import AdaptiveRateLimiter, backoff_delay
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gonka_nodes.txt")
+
+# Ответы, после которых имеет смысл спросить другую ноду
+RETRY_STATUSES = (429, 502, 503, 504)
+# Высота запроса для REST (Cosmos SDK) и ошибка ноды, которая до нее еще не дошла
+HEIGHT_HEADER = "x-cosmos-block-height"
+FUTURE_HEIGHT_ERROR = "cannot query with height in the future"
+
+HEALTH_INTERVAL = 60  # сек между фоновыми проверками нод
+MAX_HEIGHT_LAG = 5  # нода, отставшая больше чем на столько блоков, считается больной
+HEDGE_MIN_DELAY = 0.05  # сек, раньше этого дубль не отправляется
+SAMPLE_WINDOW = 50  # размер окна для задержек и ошибок
+GET_RETRIES = 2  # повторов GET после неудачи на всех нодах
+
+
+def normalize_node_url(node_url):
+    """Приводит адрес ноды к виду http://host:port (без /chain-rpc/ и /chain-api/)"""
+    node_url = node_url.rstrip("/")
+    for suffix in ("/chain-rpc", "/chain-api"):
+        if node_url.endswith(suffix):
+            node_url = node_url[:-len(suffix)]
+    return node_url
+
+
+def load_node_urls(path=None):
+    """Адреса нод из файла конфигурации, пустой список если файла нет"""
+    path = path or os.environ.get("GONKA_NODES_FILE") or DEFAULT_CONFIG
+    try:
+        with open(path, "r") as f:
+            lines = [line.split("#", 1)[0].strip() for line in f]
+    except FileNotFoundError:
+        return []
+    return [normalize_node_url(line) for line in lines if line]
+
+
+def requested_height(headers):
+    """Высота из заголовка HEIGHT_HEADER или None"""
+    value = (headers or {}).get(HEIGHT_HEADER)
+    return int(value) if value is not None else None
+
+
+def behind_height(response):
+    """Нода ответила, что еще не дошла до запрошенной высоты"""
+    return response.status_code >= 400 and FUTURE_HEIGHT_ERROR in response.text
+
+
+def retryable(response):
+    """Ответ, после которого запрос повторяется на другой ноде"""
+    return response.status_code in RETRY_STATUSES or behind_height(response)
+
+
+def retry_after(response):
+    """Секунды из заголовка Retry-After (только числовая форма), иначе None"""
+    value = response.headers.get("Retry-After", "")
+    return float(value) if value.strip().isdigit() else None
+
+
+class NodeState:
+    """Скользящая статистика одной ноды"""
+
+    def __init__(self, url, limiter=None):
+        self.url = url
+        self.limiter = limiter
+        self.latencies = deque(maxlen=SAMPLE_WINDOW)
+        self.outcomes = deque(maxlen=SAMPLE_WINDOW)
+        self.ewma = None
+        self.healthy = True
+        self.height = None
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.outcomes.append(ok)
+            if ok:
+                self.latencies.append(latency)
+                self.ewma = latency if self.ewma is None else 0.8 * self.ewma + 0.2 * latency
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def latency_quantile(self, q):
+        with self._lock:
+            if not self.latencies:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def score(self):
+        """Меньше - лучше. Нода без статистики пробуется первой"""
+        penalty = 0 if self.healthy else 1000
+        return penalty + (self.ewma or 0) * (1 + 10 * self.error_rate())
+
+    def behind(self, height):
+        """Известно, что нода еще не дошла до height"""
+        return height is not None and self.height is not None and self.height < height
+
+    def mark_behind(self, height):
+        """Нода ответила "height in the future": ее высота меньше height"""
+        if self.height is None or self.height >= height:
+            self.height = height - 1
+
+
+class NodePool:
+    """
+    Набор нод с общей keep-alive сессией
+
+    Потокобезопасен; max_per_host ограничивает число одновременных
+    запросов к одному хосту.
+    """
+
+    def __init__(self, urls, timeout=10, pool_size=20, max_per_host=None, hedge=True, max_attempts=3,
+                 rate=None, max_rate=None, retries=GET_RETRIES):
+        if not urls:
+            raise ValueError("пустой список нод")
+        self.nodes = [
+            NodeState(normalize_node_url(url), AdaptiveRateLimiter(rate, max_rate=max_rate) if rate else None)
+            for url in dict.fromkeys(urls)
+        ]
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.hedge = hedge
+        self.max_attempts = max_attempts
+        self.retries = retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(len(self.nodes), 10), pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._executor_size = max(pool_size * 2, 32)
+        self._last_health_check = None
+        self._health_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, default_url=None, path=None, **kwargs):
+        """Пул из файла конфигурации; если файла нет - из одной ноды default_url"""
+        urls = load_node_urls(path)
+        if not urls:
+            if default_url is None:
+                raise ValueError("нет файла со списком нод и не задана нода по умолчанию")
+            urls = [default_url]
+        return cls(urls, **kwargs)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.session.close()
+
+    # --- Выбор ноды ---
+
+    def ranked(self, min_height=None):
+        """Ноды от лучшей к худшей; с min_height отстающие от нее ноды идут последними"""
+        self._maybe_health_check()
+        return sorted(self.nodes, key=lambda node: (node.behind(min_height), node.score()))
+
+    def best_url(self):
+        return self.ranked()[0].url
+
+    def health_check(self, max_lag=MAX_HEIGHT_LAG):
+        """Проверяет все ноды через /chain-rpc/status (параллельно)"""
+
+        def check(node):
+            start = time.monotonic()
+            try:
+                response = self.session.get(f"{node.url}/chain-rpc/status", timeout=self.timeout)
+                response.raise_for_status()
+                sync_info = response.json()["result"]["sync_info"]
+                node.height = int(sync_info["latest_block_height"])
+                node.record(time.monotonic() - start, True)
+                return not sync_info.get("catching_up", False)
+            except (requests.RequestException, ValueError, KeyError):
+                node.record(time.monotonic() - start, False)
+                node.height = None
+                return False
+
+        with ThreadPoolExecutor(max_workers=len(self.nodes)) as executor:
+            alive = list(executor.map(check, self.nodes))
+
+        heights = [n.height for n in self.nodes if n.height is not None]
+        top = max(heights) if heights else 0
+        for node, ok in zip(self.nodes, alive):
+            node.healthy = ok and node.height is not None and top - node.height <= max_lag
+        self._last_health_check = time.monotonic()
+
+    def _maybe_health_check(self):
+        if len(self.nodes) < 2:
+            return
+        with self._health_lock:
+            last = self._last_health_check
+            if last is not None and time.monotonic() - last < HEALTH_INTERVAL:
+                return
+            self._last_health_check = time.monotonic()
+        if last is None:
+            # Первая проверка синхронно, чтобы сразу выбрать живую ноду
+            self.health_check()
+        else:
+            threading.Thread(target=self.health_check, daemon=True).start()
+
+    # --- Транспорт ---
+
+    def _host_slot(self, url):
+        """Семафор хоста для ограничения параллельных запросов"""
+        if not self.max_per_host:
+            return nullcontext()
+        host = urlsplit(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._executor_size)
+            return self._executor
+
+    def _send(self, node, method, path, **kwargs):
+        url = f"{node.url}{path}"
+        if node.limiter is not None:
+            node.limiter.acquire()
+        start = time.monotonic()
+        try:
+            with self._host_slot(url):
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            node.record(time.monotonic() - start, False)
+            if node.limiter is not None:
+                node.limiter.on_throttle()
+            instrument.record("http", f"{method} {instrument.endpoint(path)}", time.monotonic() - start,
+                              node.url, outcome=type(e).__name__)
+            raise
+        height = requested_height(kwargs.get("headers"))
+        if height is not None and behind_height(response):
+            node.mark_behind(height)
+        node.record(time.monotonic() - start, not retryable(response))
+        if node.limiter is not None:
+            if response.status_code == 429 or response.status_code >= 500:
+                node.limiter.on_throttle()
+            else:
+                node.limiter.on_success()
+        if instrument.enabled():
+            outcome = "ok" if response.status_code < 400 else f"http {response.status_code}"
+            instrument.record("http", f"{method} {instrument.endpoint(path)}", time.monotonic() - start,
+                              node.url, len(response.content), outcome)
+        return response
+
+    def hedge_delay(self, node):
+        """Через сколько отправлять дубль: p95 задержки ноды"""
+        p95 = node.latency_quantile(0.95)
+        if p95 is None:
+            return self.timeout / 2
+        return max(HEDGE_MIN_DELAY, p95)
+
+    def get(self, path, params=None, hedge=None, headers=None):
+        """
+        GET к лучшей ноде с переключением, хеджированием и повторами
+
+        Args:
+            path: путь от корня ноды, например "/chain-api/cosmos/..."
+            hedge: дублировать ли медленный запрос (по умолчанию настройка пула)
+            headers: дополнительные заголовки; с HEIGHT_HEADER запрос идет
+                сначала на ноды, дошедшие до этой высоты
+
+        Returns:
+            requests.Response первой ноды, ответившей без ошибки
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._get_once(path, params, hedge, headers)
+            except requests.RequestException:
+                if attempt == self.retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+            if not retryable(response) or attempt == self.retries:
+                return response
+            time.sleep(backoff_delay(attempt, retry_after=retry_after(response)))
+
+    def _get_once(self, path, params=None, hedge=None, headers=None):
+        """Один проход по нодам: первая, ответившая без ошибки, или последняя ошибка"""
+        hedge = self.hedge if hedge is None else hedge
+        candidates = self.ranked(requested_height(headers))[:self.max_attempts]
+        if len(candidates) == 1:
+            return self._send(candidates[0], "GET", path, params=params, headers=headers)
+
+        executor = self._get_executor()
+        queue = iter(candidates)
+        pending = set()
+        last_response = None
+        last_error = None
+
+        def launch():
+            node = next(queue, None)
+            if node is None:
+                return False
+            pending.add(executor.submit(self._send, node, "GET", path, params=params, headers=headers))
+            return True
+
+        launch()
+        can_hedge = hedge
+        while pending:
+            delay = self.hedge_delay(candidates[0]) if can_hedge else None
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Ответа нет дольше обычного - дублируем на следующую ноду
+                can_hedge = launch()
+                continue
+            for future in done:
+                pending.discard(future)
+                try:
+                    response = future.result()
+                except requests.RequestException as e:
+                    last_error = e
+                    launch()
+                    continue
+                if retryable(response):
+                    last_response = response
+                    launch()
+                    continue
+                return response
+
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def post(self, path, json=None):
+        """POST на лучшую ноду: без дублей и без повтора на другой ноде"""
+        return self._send(self.ranked()[0], "POST", path, json=json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Состояние нод из gonka_nodes.txt")
+    parser.add_argument("--config", help="файл со списком нод")
+    parser.add_argument("--best", action="store_true", help="вывести только адрес лучшей ноды")
+    args = parser.parse_args()
+
+    urls = load_node_urls(args.config)
+    if not urls:
+        print("Список нод пуст или файл не найден", file=sys.stderr)
+        return 1
+
+    pool = NodePool(urls)
+    pool.health_check()
+    if args.best:
+        print(pool.best_url())
+        return 0
+
+    for node in pool.ranked():
+        latency = f"{node.ewma * 1000:.0f} ms" if node.ewma is not None else "-"
+        state = "ok" if node.healthy else "FAIL"
+        print(f"{node.url:<40} {state:<5} height={node.height or '-':<10} {latency}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Общий кеш ответов GET-запросов к ноде внутри процесса.
+
+Одинаковые запросы (дубли в списках кошельков, один и тот же валидатор
+у многих делегаторов) не уходят к ноде повторно, пока не истек TTL
+эндпоинта (DEFAULT_TTLS; эндпоинтов без TTL кеш не хранит). Одновременные
+одинаковые запросы из разных потоков объединяются: к ноде уходит один,
+остальные ждут его ответ. Размер ограничен (LRU), ошибки не кешируются.
+
+    GONKA_QUERY_CACHE=0        кеш выключен
+    GONKA_QUERY_CACHE=1        кеш также сохраняется на диск, в
+                               ~/.cache/gonka/query_cache.sqlite, и следующий
+                               запуск скрипта берет еще не истекшие ответы
+    GONKA_QUERY_CACHE=<файл>   то же с другим файлом
+
+Попадания и объединенные запросы видны в сводке GONKA_TRACE (операции cache).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import instrument
+from chain_cache import DEFAULT_CACHE_DIR
+
+CACHE_ENV = "GONKA_QUERY_CACHE"
+CACHE_FILENAME = "query_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 50000
+
+# Время жизни ответа по эндпоинту (путь после instrument.endpoint), сек.
+# Аккаунты (sequence), транзакции, статус и блоки не кешируются: их читают,
+# чтобы увидеть изменение.
+DEFAULT_TTLS = {
+    "/chain-api/cosmos/bank/v1beta1/balances/{address}": 5,
+    "/chain-api/productscience/inference/streamvesting/total_vesting/{address}": 30,
+    "/chain-api/productscience/inference/collateral/collateral/{address}": 30,
+    "/chain-api/cosmos/staking/v1beta1/delegators/{address}/validators": 60,
+    "/chain-api/cosmos/staking/v1beta1/validators": 60,
+    "/chain-api/cosmos/gov/v1/proposals/{n}/votes": 10,
+    "/v1/epochs/current/participants": 30,
+    "/v1/epochs/{n}/participants": 3600,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def default_cache_path():
+    cache_dir = os.environ.get("GONKA_CACHE_DIR") or DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir, CACHE_FILENAME)
+
+
+def request_key(path, params=None, headers=None):
+    """
+    Ключ запроса: путь, параметры и заголовки в постоянном порядке
+
+    >>> request_key("/chain-api/x", {"b": "2", "a": "1"}, {"x-cosmos-block-height": "10"})
+    '/chain-api/x?a=1&b=2 x-cosmos-block-height=10'
+    >>> request_key("/chain-rpc/status")
+    '/chain-rpc/status'
+    """
+    key = path
+    if params:
+        key += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    if headers:
+        key += " " + " ".join(f"{k.lower()}={v}" for k, v in sorted(headers.items()))
+    return key
+
+
+class DiskStore:
+    """
+    Ответы с TTL в SQLite для следующих запусков
+
+    Одно соединение SQLite на объект, доступ из потоков сериализуется
+    блокировкой (как ChainCache). Истекшие записи удаляются при открытии.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key):
+        """(ответ, момент истечения) или None, если записи нет или она истекла"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at FROM entries WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put(self, key, value, expires_at):
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, expires_at) VALUES (?, ?, ?)", (key, payload, expires_at)
+            )
+            self._conn.commit()
+
+
+class QueryCache:
+    """
+    LRU-кеш ответов с TTL по эндпоинту и объединением одновременных запросов
+
+    Потокобезопасен. Счетчики: hits (из памяти), disk_hits (с диска),
+    coalesced (дождались чужого запроса), misses (запрос к ноде),
+    evictions (вытеснено по размеру).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttls=None, disk=None):
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.disk = disk
+        self._entries = OrderedDict()  # ключ -> (момент истечения, ответ)
+        self._inflight = {}  # ключ -> Future запроса, который уже идет
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.coalesced = self.misses = self.evictions = 0
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, 0)
+
+    def get(self, path, fetch, params=None, headers=None):
+        """
+        Ответ из кеша или fetch() (один на все потоки с тем же запросом)
+
+        Args:
+            path: путь запроса от корня ноды (для TTL и ключа)
+            fetch: функция без аргументов, выполняющая запрос
+        """
+        endpoint = instrument.endpoint(path)
+        ttl = self.ttl(endpoint)
+        key = request_key(path, params, headers)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                instrument.record("cache", f"hit {endpoint}", 0.0)
+                return entry[1]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = self._inflight[key] = Future()
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            instrument.record("cache", f"coalesced {endpoint}", 0.0)
+            return inflight.result()
+
+        try:
+            stored = self.disk.get(key) if self.disk is not None and ttl > 0 else None
+            if stored is not None:
+                value, expires_at = stored
+            else:
+                value = fetch()
+                expires_at = time.time() + ttl
+                if self.disk is not None and ttl > 0:
+                    self.disk.put(key, value, expires_at)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            inflight.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._inflight[key]
+            if stored is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            if ttl > 0:
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        if stored is not None:
+            instrument.record("cache", f"disk hit {endpoint}", 0.0)
+        inflight.set_result(value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Счетчики и текущий размер"""
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "coalesced": self.coalesced,
+                    "misses": self.misses, "evictions": self.evictions, "size": len(self._entries)}
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared():
+    """Кеш процесса по настройке GONKA_QUERY_CACHE (None, если выключен)"""
+    global _shared
+    setting = os.environ.get(CACHE_ENV, "")
+    if setting == "0":
+        return None
+    with _shared_lock:
+        if _shared is None:
+            disk = None
+            if setting:
+                disk = DiskStore(None if setting == "1" else setting)
+            _shared = QueryCache(disk=disk)
+        return _shared
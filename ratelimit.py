@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Ограничение частоты запросов к нодам.
+
+TokenBucket заменяет фиксированные паузы (sleep 0.1 между кошельками):
+запросы идут без задержки, пока есть запас, а в среднем не чаще rate
+в секунду, сколько бы потоков их ни отправляло. AdaptiveRateLimiter
+дополнительно подстраивает rate под ноду: замедляется на 429/5xx,
+таймаутах и переполненном mempool и разгоняется, пока ошибок нет.
+"""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Общий на все потоки лимит: rate запросов в секунду, до burst подряд
+
+    Потокобезопасен; acquire() блокирует вызывающий поток до появления токена.
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("rate должен быть больше 0")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """Дождаться и забрать tokens токенов"""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """
+    TokenBucket, который сам подбирает rate (AIMD)
+
+    on_success() понемногу поднимает rate (на increase в секунду при
+    работе на полной скорости), on_throttle() сразу делит его на 1/decrease
+    (429, 5xx, таймаут, mempool is full). Серия ошибок от уже отправленных
+    параллельных запросов снижает rate один раз за cooldown секунд.
+    """
+
+    def __init__(self, rate, min_rate=0.5, max_rate=None, increase=1.0, decrease=0.5, cooldown=1.0):
+        super().__init__(rate)
+        self.min_rate = float(min(min_rate, rate))
+        self.max_rate = float(max_rate if max_rate is not None else rate * 10)
+        self.increase = float(increase)
+        self.decrease = float(decrease)
+        self.cooldown = cooldown
+        self._last_decrease = None
+
+    def _set_rate(self, rate):
+        self.rate = min(self.max_rate, max(self.min_rate, rate))
+        self.burst = max(1.0, self.rate)
+        self._tokens = min(self._tokens, self.burst)
+
+    def on_success(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._set_rate(self.rate + self.increase / self.rate)
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if self._last_decrease is not None and now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self._refill(now)
+            self._set_rate(self.rate * self.decrease)
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0, retry_after=None):
+    """
+    Пауза перед повтором attempt (0, 1, ...): случайная в [0, base * 2**attempt]
+
+    Случайная пауза ("full jitter") разводит повторы параллельных потоков.
+    retry_after (сек из заголовка Retry-After) задает нижнюю границу.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
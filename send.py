@@ -10,11 +10,14 @@ import os
 import subprocess
 from pathlib import Path
 
+import instrument
+from node_pool import NodePool
+
 # Константы
 GONKA_TO_NGONKA = 1_000_000_000  # 1 GONKA = 1 000 000 000 ngonka
 CHAIN_ID = "gonka-mainnet"
 KEYRING_BACKEND = "file"
-NODE_URL = "http://net2.gonka.top:8000/chain-rpc/"
+NODE_URL = "http://net2.gonka.top:8000/chain-rpc/"  # если нет gonka_nodes.txt
 
 
 def print_usage():
@@ -105,7 +108,17 @@ def find_inferenced():
     sys.exit(1)
 
 
-def send_gonka(sender, recipient, amount_ngonka, inferenced_path):
+def select_node():
+    """
+    Выбор ноды из gonka_nodes.txt по задержке и доступности
+    
+    Returns:
+        str: адрес RPC ноды для inferenced
+    """
+    return NodePool.from_config(NODE_URL).best_url() + "/chain-rpc/"
+
+
+def send_gonka(sender, recipient, amount_ngonka, inferenced_path, node_url=NODE_URL):
     """
     Отправка монет GONKA
     
@@ -114,6 +127,7 @@ def send_gonka(sender, recipient, amount_ngonka, inferenced_path):
         recipient: адрес получателя
         amount_ngonka: сумма в ngonka
         inferenced_path: путь к исполняемому файлу inferenced
+        node_url: адрес RPC ноды
     """
     amount_gonka = amount_ngonka / GONKA_TO_NGONKA
     
@@ -124,7 +138,7 @@ def send_gonka(sender, recipient, amount_ngonka, inferenced_path):
     print(f"Кому:        {recipient}")
     print(f"Сумма:       {amount_gonka} GONKA ({amount_ngonka} ngonka)")
     print(f"Chain ID:    {CHAIN_ID}")
-    print(f"Node:        {NODE_URL}")
+    print(f"Node:        {node_url}")
     print("="*60)
     
     # Формируем команду
@@ -136,7 +150,7 @@ def send_gonka(sender, recipient, amount_ngonka, inferenced_path):
         f"{amount_ngonka}ngonka",
         '--chain-id', CHAIN_ID,
         '--keyring-backend', KEYRING_BACKEND,
-        '--node', NODE_URL
+        '--node', node_url
     ]
     
     print("\nВыполнение команды...")
@@ -144,7 +158,7 @@ def send_gonka(sender, recipient, amount_ngonka, inferenced_path):
     
     # Выполняем команду
     try:
-        result = subprocess.run(cmd)
+        result = instrument.run(cmd)
         
         if result.returncode == 0:
             print("\n✓ Транзакция успешно отправлена!")
@@ -178,7 +192,7 @@ def main():
     inferenced_path = find_inferenced()
     
     # Отправка
-    send_gonka(sender, recipient, amount_ngonka, inferenced_path)
+    send_gonka(sender, recipient, amount_ngonka, inferenced_path, select_node())
 
 
 if __name__ == "__main__":
@@ -11,7 +11,12 @@ FILENAME=$1
 ACCOUNT=$2
 PAYMENTS_PATH="/home/mitch/Crypto/gonka.ai/scripts/payments/${FILENAME}"
 TX_PATH="/home/mitch/Crypto/gonka.ai/scripts/tx/${FILENAME}"
-PAUSE_SECONDS=60
+# Сколько секунд ждать подтверждения после отправки последней транзакции
+CONFIRM_TIMEOUT="${CONFIRM_TIMEOUT:-120}"
+# Число переводов в одной транзакции (1 - по одной транзакции на строку)
+BATCH_SIZE="${BATCH_SIZE:-1}"
+# PIPELINE=1 - отправка подряд с локальным sequence, без задержки между транзакциями
+PIPELINE="${PIPELINE:-}"
 
 # Проверка существования входного файла
 if [ ! -f "$PAYMENTS_PATH" ]; then
@@ -27,29 +32,40 @@ echo "Запуск отправки транзакций..."
 echo "Входной файл: ${PAYMENTS_PATH}"
 echo "Выходной файл: ${TX_PATH}"
 echo "Аккаунт: ${ACCOUNT}"
+echo "Переводов в транзакции: ${BATCH_SIZE}"
 echo "==================================================="
 
-# Запуск первой команды
-/home/mitch/Crypto/gonka.ai/scripts/git_gonka/mass_send_gonka.py "$PAYMENTS_PATH" "$ACCOUNT" > "$TX_PATH"
+SCRIPTS_DIR=/home/mitch/Crypto/gonka.ai/scripts/git_gonka
 
-# Проверка успешности выполнения
-if [ $? -ne 0 ]; then
-    echo "Ошибка при выполнении mass_send_gonka.py"
-    exit 1
-fi
+# Пароль запрашиваем здесь: фоновый процесс не может читать с терминала
+read -s -p "Введите пароль для кошелька ${ACCOUNT}: " PASSWORD
+echo
+
+# Запуск первой команды в фоне, чтобы подтверждать транзакции по мере отправки
+GONKA_KEYRING_PASSWORD="$PASSWORD" "$SCRIPTS_DIR/mass_send_gonka.py" "$PAYMENTS_PATH" "$ACCOUNT" --batch "$BATCH_SIZE" ${PIPELINE:+--pipeline} > "$TX_PATH" &
+SEND_PID=$!
 
 echo ""
 echo "==================================================="
-echo "Транзакции отправлены успешно!"
-echo "Пауза ${PAUSE_SECONDS} секунд (2 минуты)..."
+echo "Подтверждение транзакций по мере появления блоков..."
 echo "==================================================="
 
-# Пауза с обратным отсчетом
-for ((i=$PAUSE_SECONDS; i>0; i--)); do
-    printf "\rОсталось: %3d секунд" $i
-    sleep 1
-done
-printf "\rПауза завершена!          \n"
+# Следим за новыми блоками, пока идет отправка, и до подтверждения последней транзакции
+"$SCRIPTS_DIR/confirm_txs.py" "$TX_PATH" --follow --wait-pid "$SEND_PID" --timeout "$CONFIRM_TIMEOUT"
+CONFIRM_STATUS=$?
+
+wait "$SEND_PID"
+SEND_STATUS=$?
+
+# Проверка успешности выполнения
+if [ $SEND_STATUS -ne 0 ]; then
+    echo "Ошибка при выполнении mass_send_gonka.py"
+    exit 1
+fi
+
+if [ $CONFIRM_STATUS -ne 0 ]; then
+    echo "Внимание: не все транзакции подтверждены"
+fi
 
 echo ""
 echo "==================================================="
@@ -57,11 +73,11 @@ echo "Запуск верификации транзакций..."
 echo "==================================================="
 
 # Запуск второй команды
-/home/mitch/Crypto/gonka.ai/scripts/git_gonka/verify_transactions_short.sh "$TX_PATH"
+"$SCRIPTS_DIR/verify_transactions.py" "$TX_PATH"
 
 # Проверка успешности выполнения
 if [ $? -ne 0 ]; then
-    echo "Ошибка при выполнении verify_transactions_short.sh"
+    echo "Ошибка при выполнении verify_transactions.py"
     exit 1
 fi
 
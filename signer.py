@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Подпись транзакций Gonka в памяти процесса, без запуска inferenced.
+
+Ключ один раз расшифровывается из file-keyring (тот же каталог, что у
+inferenced --keyring-backend file) и дальше хранится только в памяти.
+Транзакции собираются в protobuf (TxBody, AuthInfo, SignDoc, TxRaw),
+подписываются secp256k1 (SIGN_MODE_DIRECT) и отправляются через
+GonkaClient.broadcast_tx.
+
+Нужен пакет cryptography (pip install cryptography).
+
+Проверка ключа: ./signer.py <имя_ключа> [--keyring-dir DIR] - выводит адрес
+"""
+
+import argparse
+import base64
+import getpass
+import hashlib
+import json
+import os
+import struct
+import sys
+
+from cryptography.exceptions import InvalidSignature, InvalidTag
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.keywrap import InvalidUnwrap, aes_key_unwrap
+
+import instrument
+from bech32 import encode as bech32_encode
+from gonka_client import DENOM
+
+DEFAULT_KEYRING_DIR = os.path.join(os.path.expanduser("~"), ".inference", "keyring-file")
+ADDRESS_PREFIX = "gonka"
+DEFAULT_GAS = 200000  # как у inferenced без --gas
+
+SIGN_MODE_DIRECT = 1
+SECP256K1_ORDER = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+MSG_SEND_TYPE = "/cosmos.bank.v1beta1.MsgSend"
+MSG_VOTE_TYPE = "/cosmos.gov.v1.MsgVote"
+PUBKEY_TYPE = "/cosmos.crypto.secp256k1.PubKey"
+PRIVKEY_TYPE = "/cosmos.crypto.secp256k1.PrivKey"
+
+VOTE_OPTIONS = {"yes": 1, "abstain": 2, "no": 3, "no_with_veto": 4}
+
+
+class KeyringError(Exception):
+    """Ключ не найден, неверный пароль или неподдерживаемый формат"""
+
+
+# --- protobuf ---
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _tag(number, wire_type):
+    return _varint(number << 3 | wire_type)
+
+
+def _uint(number, value):
+    """Поле uint64/bool/enum; нулевое значение не пишется (proto3)"""
+    return _tag(number, 0) + _varint(int(value)) if value else b""
+
+
+def _bytes(number, value):
+    """Поле bytes/string/вложенное сообщение; пустое значение не пишется"""
+    if isinstance(value, str):
+        value = value.encode()
+    return _tag(number, 2) + _varint(len(value)) + value if value else b""
+
+
+def _message(number, value):
+    """Вложенное сообщение пишется даже пустым"""
+    return _tag(number, 2) + _varint(len(value)) + value
+
+
+def _any(type_url, value):
+    return _bytes(1, type_url) + _bytes(2, value)
+
+
+def _coin(denom, amount):
+    return _bytes(1, denom) + _bytes(2, str(amount))
+
+
+def parse_proto(data):
+    """
+    Разбор protobuf без схемы
+
+    Returns:
+        {номер_поля: [значения]} - int для varint, bytes для остальных
+    """
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f"неподдерживаемый тип поля {wire_type}")
+        fields.setdefault(number, []).append(value)
+    return fields
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+# --- Сообщения ---
+
+def msg_send(from_address, to_address, amount, denom=DENOM):
+    """MsgSend, упакованный в Any"""
+    value = _bytes(1, from_address) + _bytes(2, to_address) + _message(3, _coin(denom, amount))
+    return _any(MSG_SEND_TYPE, value)
+
+
+def msg_vote(proposal_id, voter, option, metadata=""):
+    """MsgVote (gov v1) в Any; option - yes, no, abstain, no_with_veto"""
+    value = _uint(1, proposal_id) + _bytes(2, voter) + _uint(3, VOTE_OPTIONS[option]) + _bytes(4, metadata)
+    return _any(MSG_VOTE_TYPE, value)
+
+
+def build_tx_body(messages, memo="", unordered=False, timeout_unix=None):
+    """
+    TxBody
+
+    Args:
+        messages: сообщения в Any (msg_send, msg_vote)
+        unordered: транзакция без sequence (как inferenced --unordered),
+            требует timeout_unix
+    """
+    body = b"".join(_message(1, m) for m in messages) + _bytes(2, memo)
+    if unordered:
+        body += _uint(4, True)
+    if timeout_unix is not None:
+        seconds = int(timeout_unix)
+        nanos = int(round((timeout_unix - seconds) * 1e9))
+        body += _message(5, _uint(1, seconds) + _uint(2, nanos))
+    return body
+
+
+def build_sign_doc(body, auth_info, chain_id, account_number):
+    """SignDoc (SIGN_MODE_DIRECT): подписываются именно эти байты"""
+    return _bytes(1, body) + _bytes(2, auth_info) + _bytes(3, chain_id) + _uint(4, account_number)
+
+
+# --- Адрес ---
+
+def _ripemd160(data):
+    """RIPEMD-160 на случай OpenSSL без legacy-алгоритмов"""
+    try:
+        return hashlib.new("ripemd160", data).digest()
+    except ValueError:
+        return _ripemd160_py(data)
+
+
+_RL = [
+    list(range(16)),
+    [7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8],
+    [3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12],
+    [1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2],
+    [4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13],
+]
+_RR = [
+    [5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12],
+    [6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2],
+    [15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13],
+    [8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14],
+    [12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11],
+]
+_SL = [
+    [11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8],
+    [7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12],
+    [11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5],
+    [11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12],
+    [9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6],
+]
+_SR = [
+    [8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6],
+    [9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11],
+    [9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5],
+    [15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8],
+    [8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11],
+]
+_KL = [0x00000000, 0x5A827999, 0x6ED9EBA1, 0x8F1BBCDC, 0xA953FD4E]
+_KR = [0x50A28BE6, 0x5C4DD124, 0x6D703EF3, 0x7A6D76E9, 0x00000000]
+
+
+def _ripemd160_py(data):
+    def rol(x, n):
+        return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
+
+    def f(j, x, y, z):
+        if j == 0:
+            return x ^ y ^ z
+        if j == 1:
+            return (x & y) | (~x & z)
+        if j == 2:
+            return (x | ~y) ^ z
+        if j == 3:
+            return (x & z) | (y & ~z)
+        return x ^ (y | ~z)
+
+    message = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476, 0xC3D2E1F0]
+    for offset in range(0, len(message), 64):
+        x = struct.unpack("<16I", message[offset:offset + 64])
+        al, bl, cl, dl, el = h
+        ar, br, cr, dr, er = h
+        for j in range(5):
+            for i in range(16):
+                t = rol((al + f(j, bl, cl, dl) + x[_RL[j][i]] + _KL[j]) & 0xFFFFFFFF, _SL[j][i]) + el
+                al, el, dl, cl, bl = el, dl, rol(cl, 10), bl, t & 0xFFFFFFFF
+                t = rol((ar + f(4 - j, br, cr, dr) + x[_RR[j][i]] + _KR[j]) & 0xFFFFFFFF, _SR[j][i]) + er
+                ar, er, dr, cr, br = er, dr, rol(cr, 10), br, t & 0xFFFFFFFF
+        t = (h[1] + cl + dr) & 0xFFFFFFFF
+        h[1] = (h[2] + dl + er) & 0xFFFFFFFF
+        h[2] = (h[3] + el + ar) & 0xFFFFFFFF
+        h[3] = (h[4] + al + br) & 0xFFFFFFFF
+        h[4] = (h[0] + bl + cr) & 0xFFFFFFFF
+        h[0] = t
+    return struct.pack("<5I", *h)
+
+
+def pubkey_address(pubkey, prefix=ADDRESS_PREFIX):
+    """Адрес аккаунта: bech32(ripemd160(sha256(сжатый публичный ключ)))"""
+    return bech32_encode(prefix, _ripemd160(hashlib.sha256(pubkey).digest()))
+
+
+# --- file-keyring ---
+
+def _b64url(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def decrypt_jwe(token, password):
+    """Расшифровка JWE PBES2-HS256+A128KW / A256GCM (формат file-keyring)"""
+    try:
+        header_b64, key_b64, iv_b64, ciphertext_b64, tag_b64 = token.strip().split(".")
+        header = json.loads(_b64url(header_b64))
+    except ValueError as e:
+        raise KeyringError("файл ключа не в формате JWE") from e
+    if header.get("alg") != "PBES2-HS256+A128KW" or header.get("enc") != "A256GCM":
+        raise KeyringError(f"неподдерживаемое шифрование {header.get('alg')}/{header.get('enc')}")
+
+    salt = header["alg"].encode() + b"\x00" + _b64url(header["p2s"])
+    kek = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, int(header["p2c"]), 16)
+    try:
+        cek = aes_key_unwrap(kek, _b64url(key_b64))
+        return AESGCM(cek).decrypt(
+            _b64url(iv_b64), _b64url(ciphertext_b64) + _b64url(tag_b64), header_b64.encode("ascii")
+        )
+    except (InvalidUnwrap, InvalidTag):
+        raise KeyringError("неверный пароль keyring") from None
+
+
+def load_private_key(name, password, keyring_dir=None):
+    """Приватный ключ secp256k1 (32 байта) из файла <имя>.info"""
+    keyring_dir = keyring_dir or os.environ.get("GONKA_KEYRING_DIR") or DEFAULT_KEYRING_DIR
+    path = os.path.join(keyring_dir, f"{name}.info")
+    try:
+        with open(path, "r") as f:
+            token = f.read()
+    except FileNotFoundError:
+        raise KeyringError(f"ключ {name} не найден в {keyring_dir}") from None
+
+    item = json.loads(decrypt_jwe(token, password))
+    record = parse_proto(base64.b64decode(item["Data"]))
+    if 3 not in record:
+        raise KeyringError(f"ключ {name} не локальный (ledger/offline) или в старом формате")
+    priv_any = parse_proto(parse_proto(record[3][0])[1][0])
+    type_url = priv_any[1][0].decode()
+    if type_url != PRIVKEY_TYPE:
+        raise KeyringError(f"неподдерживаемый тип ключа {type_url}")
+    return parse_proto(priv_any[2][0])[1][0]
+
+
+class Signer:
+    """
+    Ключ отправителя в памяти и подпись транзакций
+
+    Один объект на весь прогон: расшифровка keyring выполняется один раз.
+    """
+
+    def __init__(self, private_key_bytes, prefix=ADDRESS_PREFIX):
+        self._key = ec.derive_private_key(int.from_bytes(private_key_bytes, "big"), ec.SECP256K1())
+        self.pubkey = self._key.public_key().public_bytes(
+            serialization.Encoding.X962, serialization.PublicFormat.CompressedPoint
+        )
+        self.address = pubkey_address(self.pubkey, prefix)
+
+    @classmethod
+    def from_keyring(cls, name, password, keyring_dir=None):
+        with instrument.span("keyring", "unlock"):
+            return cls(load_private_key(name, password, keyring_dir))
+
+    def sign_bytes(self, data):
+        """Подпись sha256(data) в формате Cosmos: r||s по 32 байта, low-S"""
+        r, s = decode_dss_signature(self._key.sign(data, ec.ECDSA(hashes.SHA256())))
+        if s > SECP256K1_ORDER // 2:
+            s = SECP256K1_ORDER - s
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def auth_info(self, sequence, gas, fee=None):
+        """AuthInfo с одним подписантом в SIGN_MODE_DIRECT"""
+        pubkey_any = _any(PUBKEY_TYPE, _bytes(1, self.pubkey))
+        mode_info = _message(1, _uint(1, SIGN_MODE_DIRECT))
+        signer_info = _message(1, pubkey_any) + _message(2, mode_info) + _uint(3, sequence)
+        fee_msg = b"".join(_message(1, _coin(denom, amount)) for denom, amount in (fee or [])) + _uint(2, gas)
+        return _message(1, signer_info) + _message(2, fee_msg)
+
+    def sign_tx(self, messages, chain_id, account_number, sequence, gas=DEFAULT_GAS, fee=None,
+                memo="", unordered=False, timeout_unix=None):
+        """
+        Подписанная транзакция
+
+        Args:
+            messages: сообщения в Any (msg_send, msg_vote)
+            sequence: для unordered-транзакции передается 0
+            fee: список (denom, amount), по умолчанию без комиссии
+
+        Returns:
+            bytes: TxRaw для broadcast_tx
+        """
+        body = build_tx_body(messages, memo, unordered, timeout_unix)
+        auth_info = self.auth_info(sequence, gas, fee)
+        signature = self.sign_bytes(build_sign_doc(body, auth_info, chain_id, account_number))
+        return _bytes(1, body) + _bytes(2, auth_info) + _message(3, signature)
+
+
+def verify_signature(pubkey, data, signature):
+    """Проверка подписи sign_bytes по сжатому публичному ключу, как на ноде"""
+    if len(signature) != 64:
+        return False
+    r, s = int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+    if s > SECP256K1_ORDER // 2:
+        return False
+    try:
+        key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256K1(), pubkey)
+        key.verify(encode_dss_signature(r, s), data, ec.ECDSA(hashes.SHA256()))
+    except (InvalidSignature, ValueError):
+        return False
+    return True
+
+
+def txhash(tx_bytes):
+    """Хеш транзакции, как его показывает нода"""
+    return hashlib.sha256(tx_bytes).hexdigest().upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка ключа file-keyring: вывод адреса")
+    parser.add_argument("name", help="имя ключа")
+    parser.add_argument("--keyring-dir", help=f"каталог keyring (по умолчанию {DEFAULT_KEYRING_DIR})")
+    args = parser.parse_args()
+
+    password = os.environ.get("GONKA_KEYRING_PASSWORD")
+    if password is None:
+        password = getpass.getpass(f"Введите пароль для кошелька {args.name}: ")
+    try:
+        print(Signer.from_keyring(args.name, password, args.keyring_dir).address)
+    except KeyringError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
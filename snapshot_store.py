@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Снимки балансов кошельков в SQLite для инкрементального обновления.
+
+Для каждого вида суммы (spendable - баланс bank, vesting - остаток
+streamvesting) хранится последнее значение кошелька, высота, до которой
+оно проверено, и время последнего запроса к ноде. Следующий запуск
+ищет через tx_search события transfer начиная с этой высоты и заново
+запрашивает только кошельки, у которых были переводы (plan_refresh).
+
+Переводы модулей вне транзакций (выдача streamvesting в конце эпохи)
+в tx_search не попадают, поэтому кошельки с ненулевым vesting в снимке
+запрашиваются всегда, а остальные - не реже чем раз в max_age.
+
+По умолчанию база лежит в ~/.cache/gonka/snapshots.sqlite
+(каталог задается переменной окружения GONKA_CACHE_DIR).
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from chain_cache import DEFAULT_CACHE_DIR
+from gonka_client import ChainQueryError
+
+SNAPSHOT_FILENAME = "snapshots.sqlite"
+DEFAULT_MAX_AGE_HOURS = 168  # кошелек без событий все равно перезапрашивается раз в неделю
+# Транзакций на страницу tx_search при просмотре всех переводов цепочки
+CHAIN_SCAN_PAGE = 100
+
+SPENDABLE = "spendable"
+VESTING = "vesting"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS balances (
+    kind TEXT NOT NULL,
+    address TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, address)
+);
+"""
+
+
+def default_snapshot_path():
+    cache_dir = os.environ.get("GONKA_CACHE_DIR") or DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir, SNAPSHOT_FILENAME)
+
+
+@dataclass
+class Snapshot:
+    amount: int  # ngonka
+    height: int  # до этой высоты значение проверено
+    fetched_at: float  # unix-время последнего запроса к ноде
+
+
+@dataclass
+class RefreshPlan:
+    """Что запросить у ноды и что взять из снимка"""
+    height: int  # высота, на которую строится новый снимок
+    query: List[str]  # адреса для запроса, в порядке входного списка
+    previous: Dict[str, Dict[str, Snapshot]]  # вид -> адрес -> снимок прошлого запуска
+    reason: str = ""  # почему кошельки запрашиваются все (пусто - инкрементально)
+
+
+class SnapshotStore:
+    """
+    Хранилище снимков
+
+    Одно соединение SQLite на объект, доступ из пула потоков
+    сериализуется блокировкой (как ChainCache).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_snapshot_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, kind, addresses) -> Dict[str, Snapshot]:
+        """Снимки указанных кошельков (кошельков без снимка в ответе нет)"""
+        wanted = set(addresses)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address, amount, height, fetched_at FROM balances WHERE kind = ?", (kind,)
+            ).fetchall()
+        return {row[0]: Snapshot(row[1], row[2], row[3]) for row in rows if row[0] in wanted}
+
+    def put(self, kind, amounts, height):
+        """Новые значения {адрес: сумма}, запрошенные на высоте height"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO balances (kind, address, amount, height, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                [(kind, address, amount, height, now) for address, amount in amounts.items()],
+            )
+            self._conn.commit()
+
+    def confirm(self, kind, addresses, height):
+        """Значения не изменились до height (переводов не было): сдвигаем высоту, время запроса прежнее"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE balances SET height = ? WHERE kind = ? AND address = ? AND height < ?",
+                [(height, kind, address, height) for address in addresses],
+            )
+            self._conn.commit()
+
+
+def wallet_active(client, address, since_height, until_height) -> bool:
+    """Были ли у кошелька переводы (как отправителя или получателя) в блоках (since_height, until_height]"""
+    heights = f"tx.height>{since_height} AND tx.height<={until_height}"
+    return any(client.count_txs(f"transfer.{role}='{address}' AND {heights}") for role in ("recipient", "sender"))
+
+
+def active_addresses(client, checked, until_height, workers=1) -> Set[str]:
+    """
+    Кошельки с переводами (transfer.sender/recipient) после высоты своего снимка
+
+    Args:
+        checked: {адрес: высота снимка}
+
+    Если всех транзакций с переводами за период мало (страниц tx_search
+    не больше, чем кошельков), они просматриваются целиком. Иначе каждый
+    кошелек проверяется своими tx_search по transfer.recipient и
+    transfer.sender: в tx_search нет OR, а на загруженной цепочке
+    переводы (включая комиссии) есть почти в каждой транзакции.
+    """
+    since = min(checked.values())
+    chain_query = f"transfer.recipient EXISTS AND tx.height>{since} AND tx.height<={until_height}"
+    pages = -(-client.count_txs(chain_query) // CHAIN_SCAN_PAGE)
+    if pages <= len(checked):
+        active = set()
+        for transfer in client.search_transfers(chain_query, CHAIN_SCAN_PAGE, max_pages=max(1, pages)):
+            for address in (transfer.sender, transfer.recipient):
+                if address in checked and transfer.height > checked[address]:
+                    active.add(address)
+        return active
+
+    def check(address):
+        return wallet_active(client, address, checked[address], until_height)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        flags = list(executor.map(check, checked))
+    return {address for address, flag in zip(checked, flags) if flag}
+
+
+def plan_refresh(store, client, addresses, kinds=(SPENDABLE,), max_age_hours=DEFAULT_MAX_AGE_HOURS,
+                 full=False, workers=1) -> RefreshPlan:
+    """
+    Какие кошельки запросить заново
+
+    Запрашиваются кошельки без снимка, старше max_age_hours, с ненулевым
+    vesting в снимке и с переводами после высоты своего снимка. Если
+    tx_search недоступен, запрашиваются все; workers - параллельных
+    tx_search при проверке кошельков по одному. Суммы нужно читать на высоте
+    plan.height (client.pin_height), иначе нода пула, отстающая на несколько
+    блоков, даст значения раньше записанной высоты.
+    """
+    height = client.latest_height()
+    previous = {kind: store.get(kind, addresses) for kind in kinds}
+    if full:
+        return RefreshPlan(height, list(addresses), previous, "полное обновление")
+
+    cutoff = time.time() - max_age_hours * 3600
+    vesting = store.get(VESTING, addresses)
+    refresh = set()
+    checked = {}
+    for address in addresses:
+        snapshots = [previous[kind].get(address) for kind in kinds]
+        if any(s is None or s.fetched_at < cutoff for s in snapshots):
+            refresh.add(address)
+        elif address in vesting and vesting[address].amount > 0:
+            refresh.add(address)
+        else:
+            checked[address] = min(s.height for s in snapshots)
+
+    if checked:
+        try:
+            refresh |= active_addresses(client, checked, height, workers)
+        except ChainQueryError as e:
+            return RefreshPlan(height, list(addresses), previous, f"tx_search недоступен: {e}")
+
+    return RefreshPlan(height, [a for a in addresses if a in refresh], previous)
+
+
+def save_refresh(store, plan, kind, amounts, addresses):
+    """
+    Запись результата: новые значения и подтверждение остальных
+
+    Args:
+        amounts: {адрес: сумма} успешно запрошенных кошельков
+        addresses: все кошельки прогона
+    """
+    store.put(kind, amounts, plan.height)
+    queried = set(plan.query)
+    store.confirm(kind, [a for a in addresses if a not in queried and a in plan.previous[kind]], plan.height)
+
+
+def diff_amounts(previous: Dict[str, Snapshot], current: Dict[str, Optional[int]]):
+    """
+    Изменившиеся суммы: [(адрес, было или None, стало)] в порядке current
+
+    Кошельки с ошибкой запроса (None) в сравнение не попадают.
+    """
+    changes = []
+    for address, amount in current.items():
+        if amount is None:
+            continue
+        before = previous.get(address)
+        if before is None or before.amount != amount:
+            changes.append((address, before.amount if before else None, amount))
+    return changes
+
+
+def print_plan(plan, total, file=sys.stderr):
+    if plan.reason:
+        print(f"Снимок: запрашиваются все {total} кошельков ({plan.reason})", file=file)
+    else:
+        print(f"Снимок: запрашиваются {len(plan.query)} из {total} кошельков, "
+              f"остальные без переводов с прошлого запуска (высота {plan.height})", file=file)
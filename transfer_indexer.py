@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Локальный индекс переводов ngonka, касающихся наших кошельков.
+
+Индексатор идет по блокам (block + block_results) и сохраняет в SQLite
+переводы из событий transfer, где отправитель или получатель - кошелек из
+списка; продолжает с последней проиндексированной высоты. История до
+начала индексации догружается через tx_search по каждому кошельку.
+Выплаты модулей вне транзакций (события блока) тоже попадают в индекс
+с пустым txhash.
+
+    ./transfer_indexer.py sync --wallets wallets.txt [--from-height H] [--follow]
+    ./transfer_indexer.py backfill --wallets wallets.txt --from-height H [--to-height H2]
+    ./transfer_indexer.py received gonka1... --epoch 120
+    ./transfer_indexer.py reconcile payments.txt [--sender gonka1...] [--min-height H]
+
+По умолчанию база лежит в ~/.cache/gonka/transfers.sqlite
+(каталог задается переменной окружения GONKA_CACHE_DIR).
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from chain_cache import ChainCache, DEFAULT_CACHE_DIR
+from gonka_client import GonkaClient, ChainQueryError
+from verify_transactions import parse_result_line, gonka_to_ngonka, format_gonka
+
+NODE_URL = "http://net2.gonka.top:8000"
+INDEX_FILENAME = "transfers.sqlite"
+SYNC_WINDOW = 100  # блоков за один шаг sync (одна транзакция SQLite)
+FOLLOW_INTERVAL = 5  # сек между проверками новых блоков в --follow
+
+# Цвета для вывода
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    height INTEGER NOT NULL,
+    txhash TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (height, txhash, idx)
+);
+CREATE INDEX IF NOT EXISTS transfers_recipient ON transfers (recipient, height);
+CREATE INDEX IF NOT EXISTS transfers_sender ON transfers (sender, height);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def default_index_path():
+    cache_dir = os.environ.get("GONKA_CACHE_DIR") or DEFAULT_CACHE_DIR
+    return os.path.join(cache_dir, INDEX_FILENAME)
+
+
+def numbered(transfers):
+    """
+    Номер каждого перевода внутри своей транзакции (или событий блока): [(idx, Transfer)]
+
+    Номер считается по полному списку переводов транзакции, поэтому sync
+    и backfill дают одинаковые ключи и дубли отбрасываются.
+    """
+    counters = {}
+    result = []
+    for t in transfers:
+        key = (t.height, t.txhash)
+        counters[key] = counters.get(key, -1) + 1
+        result.append((counters[key], t))
+    return result
+
+
+def read_wallets(path):
+    """Адреса (первое слово строки), пустые строки и # пропускаются"""
+    with open(path, "r") as f:
+        return [line.split()[0] for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+class TransferIndex:
+    """
+    Таблица переводов и высота, до которой индекс полон
+
+    Одно соединение SQLite на объект, доступ из потоков сериализуется
+    блокировкой (как ChainCache).
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _state(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def last_height(self):
+        """Последняя проиндексированная высота или None"""
+        return self._state("last_height")
+
+    def first_height(self):
+        """С этой высоты индекс полон (начало sync или backfill) или None"""
+        return self._state("first_height")
+
+    def extend_back(self, height):
+        """Индекс полон начиная с height (после sync с нее или backfill до начала sync)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO state (key, value) VALUES ('first_height', ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = MIN(value, excluded.value)", (height,)
+            )
+            self._conn.commit()
+
+    def add(self, transfers, last_height=None):
+        """
+        Запись переводов одной транзакцией SQLite
+
+        Args:
+            transfers: [(idx, gonka_client.Transfer)] из numbered()
+            last_height: если задана - индекс полон до этой высоты
+        """
+        rows = [(t.height, t.txhash, idx, t.sender, t.recipient, t.amount) for idx, t in transfers]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO transfers (height, txhash, idx, sender, recipient, amount) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            if last_height is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES ('last_height', ?)", (last_height,)
+                )
+            self._conn.commit()
+
+    def received(self, address, min_height, max_height=None):
+        """Переводы на address в [min_height, max_height): [(height, txhash, sender, amount)]"""
+        sql = "SELECT height, txhash, sender, amount FROM transfers WHERE recipient = ? AND height >= ?"
+        params = [address, min_height]
+        if max_height is not None:
+            sql += " AND height < ?"
+            params.append(max_height)
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY height, txhash, idx", params).fetchall()
+
+    def received_amounts(self, addresses, min_height=0, sender=None):
+        """Все переводы на адреса: {получатель: [(height, txhash, amount)]}"""
+        sql = "SELECT recipient, height, txhash, amount FROM transfers WHERE height >= ?"
+        params = [min_height]
+        if sender:
+            sql += " AND sender = ?"
+            params.append(sender)
+        wanted = set(addresses)
+        result = {}
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY height, txhash, idx", params).fetchall()
+        for recipient, height, txhash, amount in rows:
+            if recipient in wanted:
+                result.setdefault(recipient, []).append((height, txhash, amount))
+        return result
+
+
+# --- Индексация ---
+
+def sync(index, client, wallets, from_height=None, workers=16, follow=False):
+    """Индексация блоков от последней высоты (или from_height) до текущей"""
+    wanted = set(wallets)
+    start = index.last_height()
+    start = start + 1 if start is not None else from_height
+    if start is None:
+        start = client.latest_height()
+        print(f"Индекс пуст, начинаем с текущей высоты {start} (историю догружает backfill)")
+    if index.last_height() is None:
+        index.extend_back(start)
+
+    def block_transfers(height):
+        return [(idx, t) for idx, t in numbered(client.get_block_transfers(height))
+                if t.sender in wanted or t.recipient in wanted]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while True:
+            latest = client.latest_height()
+            while start <= latest:
+                end = min(latest, start + SYNC_WINDOW - 1)
+                found = [t for batch in executor.map(block_transfers, range(start, end + 1)) for t in batch]
+                index.add(found, last_height=end)
+                print(f"Блоки {start}-{end}: переводов наших кошельков {len(found)}", file=sys.stderr)
+                start = end + 1
+            if not follow:
+                return
+            time.sleep(FOLLOW_INTERVAL)
+
+
+def backfill(index, client, wallets, from_height, to_height=None, workers=16):
+    """
+    История переводов кошельков через tx_search (последняя высота индекса не меняется)
+
+    Переводы модулей вне транзакций tx_search не находит; для них нужен
+    sync с --from-height на пустом индексе.
+    """
+    heights = f"tx.height>={from_height}"
+    if to_height is not None:
+        heights += f" AND tx.height<={to_height}"
+
+    wanted = set(wallets)
+
+    def wallet_transfers(address):
+        seen = {}
+        found = []
+        for role in ("recipient", "sender"):
+            # search_transfers отдает все переводы найденной транзакции; транзакция,
+            # найденная по обеим ролям, берется один раз
+            for t in client.search_transfers(f"transfer.{role}='{address}' AND {heights}"):
+                if seen.setdefault((t.height, t.txhash), role) == role:
+                    found.append(t)
+        return address, [(idx, t) for idx, t in numbered(found) if t.sender in wanted or t.recipient in wanted]
+
+    total = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for address, found in executor.map(wallet_transfers, wallets):
+            # Переводы между двумя нашими кошельками находятся дважды, дубли отбрасывает ключ таблицы
+            index.add(found)
+            total += len(found)
+            print(f"{address}: переводов {len(found)}", file=sys.stderr)
+    first = index.first_height()
+    if first is not None and (to_height is None or to_height >= first - 1):
+        index.extend_back(from_height)
+    return total
+
+
+# --- Запросы к индексу ---
+
+def epoch_heights(client, cache, epoch):
+    """
+    Высоты эпохи [начало, начало следующей); для текущей эпохи конец None
+
+    Начала завершенных эпох берутся из chain_cache и сохраняются в него.
+    """
+    def start_of(epoch_id, final):
+        height = cache.get_epoch_start(epoch_id) if final else None
+        if height is None:
+            height = client.get_epoch_participants(epoch_id).get("poc_start_block_height")
+            if height is None:
+                raise ChainQueryError(f"нет высоты начала эпохи {epoch_id}")
+            height = int(height)
+            if final:
+                cache.put_epoch_start(epoch_id, height)
+        return height
+
+    current = int(client.get_epoch_participants().get("epoch_id") or 0)
+    if epoch > current:
+        raise ChainQueryError(f"эпоха {epoch} еще не началась (текущая {current})")
+    start = start_of(epoch, epoch < current)
+    end = start_of(epoch + 1, epoch + 1 < current) if epoch < current else None
+    return start, end
+
+
+def reconcile(index, entries, sender=None, min_height=0):
+    """
+    Сверка выплат с индексом
+
+    Каждой строке сопоставляется свой перевод на адрес с той же суммой
+    (два одинаковых платежа требуют двух переводов).
+
+    Returns:
+        [(адрес, сумма, найденный (height, txhash) или None, суммы переводов на адрес)]
+    """
+    received = index.received_amounts([e[0] for e in entries], min_height, sender)
+    used = set()
+    results = []
+    for address, amount_str in entries:
+        expected = gonka_to_ngonka(amount_str)
+        match = None
+        for height, txhash, amount in received.get(address, []):
+            if amount == expected and (height, txhash, address, amount) not in used:
+                match = (height, txhash)
+                used.add((height, txhash, address, amount))
+                break
+        results.append((address, amount_str, match, [a for _, _, a in received.get(address, [])]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный индекс переводов наших кошельков")
+    parser.add_argument("--index-path", help="файл индекса (по умолчанию $GONKA_CACHE_DIR или ~/.cache/gonka)")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="параллельных запросов")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sync_parser = commands.add_parser("sync", help="индексация новых блоков")
+    sync_parser.add_argument("--wallets", required=True, help="файл с адресами")
+    sync_parser.add_argument("--from-height", type=int, help="с какой высоты начинать пустой индекс")
+    sync_parser.add_argument("--follow", action="store_true", help="после догона ждать новые блоки")
+
+    backfill_parser = commands.add_parser("backfill", help="история кошельков через tx_search")
+    backfill_parser.add_argument("--wallets", required=True, help="файл с адресами")
+    backfill_parser.add_argument("--from-height", type=int, required=True)
+    backfill_parser.add_argument("--to-height", type=int)
+
+    received_parser = commands.add_parser("received", help="что кошелек получил за эпоху")
+    received_parser.add_argument("address")
+    received_parser.add_argument("--epoch", type=int, required=True)
+
+    reconcile_parser = commands.add_parser("reconcile", help="сверка файла выплат с индексом")
+    reconcile_parser.add_argument("payments_file", help="файл 'адрес сумма' или результат mass_send_gonka.py")
+    reconcile_parser.add_argument("--sender", help="учитывать только переводы с этого адреса")
+    reconcile_parser.add_argument("--min-height", type=int, default=0, help="учитывать переводы с этой высоты")
+    args = parser.parse_args()
+
+    if args.node:
+        client = GonkaClient(args.node, pool_size=args.workers)
+    else:
+        client = GonkaClient.from_config(NODE_URL, pool_size=args.workers)
+
+    try:
+        with TransferIndex(args.index_path) as index:
+            if args.command == "sync":
+                sync(index, client, read_wallets(args.wallets), args.from_height, args.workers, args.follow)
+                print(f"Индекс полон до высоты {index.last_height()}")
+            elif args.command == "backfill":
+                total = backfill(index, client, read_wallets(args.wallets), args.from_height, args.to_height,
+                                 args.workers)
+                print(f"Загружено переводов: {total}")
+            elif args.command == "received":
+                with ChainCache() as cache:
+                    start, end = epoch_heights(client, cache, args.epoch)
+                first, last = index.first_height(), index.last_height()
+                if last is None or start < first or (end or client.latest_height() + 1) - 1 > last:
+                    print(f"{YELLOW}Внимание: индекс полон только для блоков {first}-{last}{NC}", file=sys.stderr)
+                rows = index.received(args.address, start, end)
+                for height, txhash, sender, amount in rows:
+                    print(f"{height} {txhash or '(блок)'} {sender} {format_gonka(amount)}")
+                total = sum(row[3] for row in rows)
+                end_str = end - 1 if end is not None else "..."
+                print(f"Эпоха {args.epoch} (блоки {start}-{end_str}): получено {format_gonka(total)} GONKA, "
+                      f"переводов {len(rows)}")
+            else:
+                entries = []
+                with open(args.payments_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        parsed = parse_result_line(line)
+                        if parsed and not parsed[0].startswith("#"):
+                            entries.append((parsed[0], parsed[1]))
+                found = 0
+                for address, amount_str, match, amounts in reconcile(index, entries, args.sender, args.min_height):
+                    if match:
+                        found += 1
+                        print(f"{address} {amount_str} {GREEN}ok{NC} height: {match[0]} txhash: {match[1]}")
+                    elif amounts:
+                        got = ", ".join(format_gonka(a) for a in amounts)
+                        print(f"{address} {amount_str} {YELLOW}Error: сумма не совпадает (получено {got}){NC}")
+                    else:
+                        print(f"{address} {amount_str} {RED}Error: перевод не найден{NC}")
+                print(f"Найдено: {found} из {len(entries)}")
+    except FileNotFoundError as e:
+        print(f"{RED}Ошибка: файл {e.filename} не найден{NC}")
+        return 1
+    except ChainQueryError as e:
+        print(f"{RED}Ошибка: {e}{NC}")
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Проверка транзакций в блокчейне gonka.ai (замена verify_transactions_short.sh).
+
+Принимает тот же файл "адрес сумма ok txhash: ХЕШ", загружает транзакции
+параллельно через общий клиент или пачкой через tx_search по отправителю
+и сверяет получателя и сумму в точных целых ngonka.
+
+Использование: ./verify_transactions.py <файл_с_транзакциями> [--sender АДРЕС --min-height H]
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+from gonka_client import GonkaClient, ChainQueryError, NGONKA_PER_GONKA
+
+NODE_URL = "http://net2.gonka.top:8000"
+
+# Цвета для вывода
+RED = "\033[0;31m"
+GREEN = "\033[0;32m"
+YELLOW = "\033[1;33m"
+NC = "\033[0m"
+
+OK = "ok"
+MISMATCH = "mismatch"
+FAILED = "failed"
+
+
+def parse_result_line(line):
+    """
+    Разбор строки результата mass_send_gonka.py
+
+    Returns:
+        (адрес, сумма, статус, txhash) или None для пустой строки;
+        txhash равен None, если его нет в строке
+    """
+    parts = line.split()
+    if not parts:
+        return None
+    address = parts[0]
+    amount = parts[1] if len(parts) > 1 else ""
+    status = parts[2] if len(parts) > 2 else ""
+    txhash = None
+    if "txhash:" in parts:
+        i = parts.index("txhash:")
+        if i + 1 < len(parts):
+            txhash = parts[i + 1].upper()
+    return address, amount, status, txhash
+
+
+def gonka_to_ngonka(amount_str):
+    """Точная конвертация строки GONKA в ngonka, None если формат неверный"""
+    try:
+        value = Decimal(amount_str) * NGONKA_PER_GONKA
+    except InvalidOperation:
+        return None
+    if value != value.to_integral_value():
+        return None
+    return int(value)
+
+
+def format_gonka(amount_ngonka):
+    """Сумма в GONKA без потери точности, минимум 2 знака после точки"""
+    value = Decimal(amount_ngonka) / NGONKA_PER_GONKA
+    text = f"{value:f}"
+    whole, _, frac = text.partition(".")
+    frac = frac.rstrip("0").ljust(2, "0")
+    return f"{whole}.{frac}"
+
+
+def check_payout(address, expected_str, tx):
+    """
+    Сверка одной выплаты с транзакцией
+
+    Returns:
+        (результат, фактическая сумма в GONKA или None, сообщение)
+    """
+    if tx is None:
+        return FAILED, None, "ОШИБКА: Транзакция не найдена"
+    if tx.code != 0:
+        return FAILED, None, f"ОШИБКА: code={tx.code}"
+
+    amounts = [amount for recipient, amount in tx.transfers() if recipient == address]
+    if not amounts:
+        return FAILED, None, "ОШИБКА: Адрес получателя не совпадает"
+
+    expected = gonka_to_ngonka(expected_str)
+    if expected is not None and expected in amounts:
+        return OK, format_gonka(expected), "OK: Суммы совпадают"
+
+    return MISMATCH, format_gonka(amounts[0]), f"ОШИБКА: Ожидалось {expected_str} GONKA"
+
+
+def fetch_txs(client, txhashes, workers=16):
+    """Параллельная загрузка транзакций по хешам"""
+
+    def fetch(txhash):
+        try:
+            return client.get_tx(txhash)
+        except ChainQueryError as e:
+            print(f"Ошибка запроса {txhash[:10]}...: {e}", file=sys.stderr)
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return dict(zip(txhashes, executor.map(fetch, txhashes)))
+
+
+def search_sender_txs(client, sender, min_height, max_height=None):
+    """Все транзакции отправителя в диапазоне высот одним tx_search"""
+    query = f"message.sender='{sender}' AND tx.height>={min_height}"
+    if max_height is not None:
+        query += f" AND tx.height<={max_height}"
+    return {tx.txhash: tx for tx in client.search_txs(query)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Проверка транзакций в gonka.ai")
+    parser.add_argument("tx_file", help="файл: адрес сумма статус txhash: хеш")
+    parser.add_argument("--node", help="адрес ноды (по умолчанию пул из gonka_nodes.txt)")
+    parser.add_argument("-j", "--workers", type=int, default=16, help="число параллельных запросов")
+    parser.add_argument("--sender", help="адрес отправителя для пакетного поиска через tx_search")
+    parser.add_argument("--min-height", type=int, help="нижняя высота для --sender")
+    parser.add_argument("--max-height", type=int, help="верхняя высота для --sender")
+    args = parser.parse_args()
+    if args.sender and args.min_height is None:
+        parser.error("--sender требует --min-height")
+
+    try:
+        with open(args.tx_file, "r", encoding="utf-8") as f:
+            entries = [e for e in (parse_result_line(line) for line in f) if e]
+    except FileNotFoundError:
+        print(f"{RED}Ошибка: файл {args.tx_file} не найден{NC}")
+        return 1
+
+    print("Проверка транзакций в gonka.ai")
+    print("======================================")
+
+    if args.node:
+        client = GonkaClient(args.node, pool_size=args.workers)
+    else:
+        client = GonkaClient.from_config(NODE_URL, pool_size=args.workers)
+    txhashes = list(dict.fromkeys(e[3] for e in entries if e[3]))
+
+    txs = {}
+    if args.sender:
+        try:
+            txs = search_sender_txs(client, args.sender, args.min_height, args.max_height)
+        except ChainQueryError as e:
+            print(f"{YELLOW}tx_search недоступен, загрузка по хешам: {e}{NC}", file=sys.stderr)
+    missing = [h for h in txhashes if h not in txs]
+    txs.update(fetch_txs(client, missing, args.workers))
+
+    counts = {OK: 0, MISMATCH: 0, FAILED: 0}
+    colors = {OK: GREEN, MISMATCH: YELLOW, FAILED: RED}
+
+    for number, (address, amount, status, txhash) in enumerate(entries, 1):
+        txhash_short = (txhash or "")[:10]
+        result, actual, message = check_payout(address, amount, txs.get(txhash) if txhash else None)
+        counts[result] += 1
+        actual_str = f"{actual} GONKA " if actual else ""
+        print(f"#{number} Tx: {txhash_short}... {actual_str}{colors[result]}{message}{NC}")
+
+    # Итоговая статистика
+    print("")
+    print("======================================")
+    print(f"Всего: {len(entries)} | Успешно: {counts[OK]} | Не совпадают: {counts[MISMATCH]} | Ошибки: {counts[FAILED]}")
+    print("======================================")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,7 +17,8 @@ if [ $# -eq 0 ]; then
 fi
 
 INPUT_FILE=$1
-NODE="http://net2.gonka.top:8000/chain-rpc/"
+# Лучшая нода из gonka_nodes.txt, при ошибке - net2
+NODE="$(python3 "$(dirname "$0")/node_pool.py" --best 2>/dev/null || echo "http://net2.gonka.top:8000")/chain-rpc/"
 INFERENCED="/home/mitch/Crypto/gonka.ai/inferenced"
 
 # Проверка существования файла
@@ -42,11 +43,14 @@ get_tx_info() {
 }
 
 # Функция для извлечения суммы из транзакции
+# В пакетной транзакции (mass_send_gonka.py --batch) берется сообщение для нужного получателя
 extract_amount() {
     local tx_json=$1
+    local address=$2
     
     # Извлекаем сумму напрямую из сообщения
-    local amount_raw=$(echo "$tx_json" | jq -r '.tx.body.messages[0].amount[0].amount // empty')
+    local amount_raw=$(echo "$tx_json" | jq -r --arg addr "$address" \
+        '[.tx.body.messages[] | select(.to_address == $addr)][0].amount[0].amount // empty')
     
     if [ -n "$amount_raw" ]; then
         # Конвертируем и форматируем с ведущим нулем
@@ -64,9 +68,12 @@ extract_amount() {
 }
 
 # Функция для извлечения адреса получателя
+# Возвращает ожидаемый адрес, если он есть среди получателей транзакции
 get_recipient() {
     local tx_json=$1
-    echo "$tx_json" | jq -r '.tx.body.messages[0].to_address // empty'
+    local address=$2
+    echo "$tx_json" | jq -r --arg addr "$address" \
+        '[.tx.body.messages[].to_address] | if index($addr) != null then $addr else (.[0] // empty) end'
 }
 
 # Функция для извлечения адреса отправителя
@@ -116,8 +123,8 @@ while IFS= read -r line; do
     fi
     
     # Извлекаем реальную сумму и адреса
-    actual_amount=$(extract_amount "$tx_data")
-    recipient=$(get_recipient "$tx_data")
+    actual_amount=$(extract_amount "$tx_data" "$address")
+    recipient=$(get_recipient "$tx_data" "$address")
     
     # Проверка соответствия получателя
     if [ "$recipient" != "$address" ]; then